@@ -0,0 +1,46 @@
+from django.apps import AppConfig
+
+
+def warm_up():
+    # Pays the one-off costs of the first request at startup: URLconf and
+    # views, serializer fields, password validators, hashers and templates.
+    from django.contrib.auth.hashers import get_hashers
+    from django.contrib.auth.password_validation import get_default_password_validators
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    from authentic.authentication.keys import get_token_backend
+    from authentic.conf import settings
+
+    get_resolver().url_patterns
+    for serializer_class in set(settings.ACTION_SERIALIZERS.values()):
+        serializer_class().fields
+
+    get_default_password_validators()
+    get_hashers()
+    get_token_backend().get_leeway()
+
+    for email_class in settings.EMAIL.values():
+        template_name = getattr(email_class, "template_name", None)
+        if template_name:
+            get_template(template_name)
+
+
+class AuthenticConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "authentic"
+
+    def ready(self):
+        from rest_framework_simplejwt.tokens import Token
+
+        from authentic import checks  # noqa: F401
+        from authentic.authentication.keys import TokenBackendProxy
+        from authentic.conf import settings
+        from authentic.signals import connect_signals
+
+        settings.compile()
+        connect_signals()
+        Token._token_backend = TokenBackendProxy()
+
+        if settings.WARM_UP:
+            warm_up()
@@ -0,0 +1,20 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path("contas/", async_views.AsyncUserListView.as_view()),
+    path("contas/lote/", async_views.AsyncUserBulkView.as_view()),
+    path("contas/exportar/", async_views.AsyncUserExportView.as_view()),
+    path("contas/criar/", async_views.AsyncRegisterView.as_view()),
+    path("contas/ativacao/", async_views.AsyncActivationView.as_view()),
+    path(
+        "contas/ativacao/reenviar/",
+        async_views.AsyncResendActivationView.as_view(),
+    ),
+    path("contas/recuperar/senha/", async_views.AsyncRecoverPasswordView.as_view()),
+    path(
+        "contas/recuperar/senha/trocar/",
+        async_views.AsyncChangePasswordView.as_view(),
+    ),
+    path("contas/<str:pk>/", async_views.AsyncUserDetailView.as_view()),
+]
@@ -0,0 +1,238 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError
+from django.http import Http404
+from django.utils.timezone import now
+from rest_framework import exceptions, status
+
+from authentic import utils
+from authentic.conf import settings
+from authentic.utils import hashing, metrics
+from authentic.utils.asynchronous import AsyncAPIView, json_response
+from authentic.serializers import get_user_fields
+from authentic.utils.dispatch import send_email
+from authentic.utils.export import aiterate, export_response
+from authentic.utils.reads import JSONBytesResponse, get_read_plan, values_queryset
+from authentic.views import UserViewSet
+
+User = settings.USER_MODEL
+
+
+async def asend_email(email_class, request, context, to):
+    await sync_to_async(send_email, thread_sensitive=False)(
+        email_class, request, context, to
+    )
+
+
+class AsyncUserView(AsyncAPIView):
+    action = None
+    authentication_classes = settings.AUTHENTICATION.authentic
+
+    @property
+    def viewset(self):
+        # Serializer and permission selection stay in one place, the sync
+        # viewset, so both stacks always behave the same way.
+        if getattr(self, "_viewset", None) is None:
+            self._viewset = UserViewSet(
+                action=self.action,
+                request=self.request,
+                format_kwarg=None,
+                args=self.args,
+                kwargs=self.kwargs,
+            )
+        return self._viewset
+
+    def get_permissions(self):
+        return self.viewset.get_permissions()
+
+    def get_throttles(self):
+        return self.viewset.get_throttles()
+
+    def get_serializer(self, *args, **kwargs):
+        return self.viewset.get_serializer(*args, **kwargs)
+
+    def get_read_plan(self):
+        if not settings.FAST_READS:
+            return None
+        return get_read_plan(
+            self.viewset.get_serializer_class(),
+            get_user_fields(),
+            only=self.viewset.get_requested_fields(),
+        )
+
+    async def get_valid_serializer(self, *args, **kwargs):
+        serializer = self.get_serializer(*args, **kwargs)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        return serializer
+
+    async def get_object(self):
+        try:
+            user = await self.viewset.get_queryset().aget(pk=self.kwargs["pk"])
+        except (User.DoesNotExist, DjangoValidationError, ValueError, TypeError):
+            # Malformed primary keys, e.g. for a UUIDField, are not found.
+            raise Http404
+        self.check_object_permissions(self.request, user)
+        return user
+
+
+class AsyncUserListView(AsyncUserView):
+    action = "list"
+
+    async def get(self, request, *args, **kwargs):
+        paginator = self.viewset.paginator
+        queryset = self.viewset.filter_queryset(self.viewset.get_queryset())
+        plan = self.get_read_plan()
+        if plan is not None:
+            page = await sync_to_async(paginator.paginate_queryset)(
+                values_queryset(queryset, plan), request, view=self.viewset
+            )
+            data = [plan.to_representation(row) for row in page]
+            return JSONBytesResponse(paginator.get_paginated_response(data).data)
+
+        page = await sync_to_async(paginator.paginate_queryset)(
+            queryset, request, view=self.viewset
+        )
+        serializer = self.get_serializer(page, many=True)
+        return json_response(paginator.get_paginated_response(serializer.data).data)
+
+
+class AsyncUserDetailView(AsyncUserView):
+    actions = {
+        "GET": "retrieve",
+        "PUT": "update",
+        "PATCH": "partial_update",
+        "DELETE": "destroy",
+    }
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.action = self.actions.get(request.method)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        rendered = self.viewset.get_cached_response()
+        if rendered is None:
+            user = await self.get_object()
+            rendered = self.viewset.render_user(user, self.get_read_plan())
+        return rendered.respond(request)
+
+    async def put(self, request, *args, **kwargs):
+        user = await self.get_object()
+        serializer = await self.get_valid_serializer(
+            user, data=request.data, partial=self.action == "partial_update"
+        )
+        for attr, value in serializer.validated_data.items():
+            setattr(user, attr, value)
+        await user.asave()
+        return json_response(self.get_serializer(user).data)
+
+    patch = put
+
+    async def delete(self, request, *args, **kwargs):
+        user = await self.get_object()
+        await user.adelete()
+        return json_response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncUserBulkView(AsyncUserView):
+    action = "bulk"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = await self.get_valid_serializer(data=request.data)
+        data = await sync_to_async(self.viewset.run_bulk)(serializer.validated_data)
+        return json_response(data)
+
+
+class AsyncUserExportView(AsyncUserView):
+    action = "export"
+
+    async def get(self, request, *args, **kwargs):
+        output, compress = self.viewset.get_export_format()
+        chunks = self.viewset.get_export_chunks(output, compress)
+        return export_response(aiterate(chunks), output, compress)
+
+
+class AsyncRegisterView(AsyncUserView):
+    action = "register"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = await self.get_valid_serializer(data=request.data)
+        validated_data = dict(serializer.validated_data)
+        password = await sync_to_async(hashing.make_password, thread_sensitive=False)(
+            validated_data.pop("password")
+        )
+        try:
+            # Through the model manager, like the sync registration.
+            user = await sync_to_async(hashing.create_user)(
+                User.objects, password, **validated_data, is_active=False
+            )
+        except IntegrityError:
+            raise exceptions.ValidationError(
+                settings.MESSAGES.errors.CANNOT_CREATE_USER_ERROR,
+                code="cannot_create_user",
+            )
+        serializer.instance = user
+        metrics.inc("authentic_registrations_total")
+
+        if settings.EMAIL_ACTIVATION:
+            await asend_email(
+                settings.EMAIL.activation,
+                request._request,
+                {"user": user},
+                [utils.get_user_email(user)],
+            )
+        return json_response(serializer.data, status.HTTP_201_CREATED)
+
+
+class AsyncActivationView(AsyncUserView):
+    action = "activation"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = await self.get_valid_serializer(data=request.data)
+        user = serializer.user
+        user.is_active = True
+        await user.asave(update_fields=["is_active"])
+        return json_response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncEmailView(AsyncUserView):
+    enabled_setting = None
+    email_name = None
+
+    async def post(self, request, *args, **kwargs):
+        serializer = await self.get_valid_serializer(data=request.data)
+        user = serializer.user
+        if getattr(settings, self.enabled_setting):
+            await asend_email(
+                getattr(settings.EMAIL, self.email_name),
+                request._request,
+                {"user": user},
+                [utils.get_user_email(user)],
+            )
+        return json_response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncResendActivationView(AsyncEmailView):
+    action = "resend_activation"
+    enabled_setting = "EMAIL_ACTIVATION"
+    email_name = "activation"
+
+
+class AsyncRecoverPasswordView(AsyncEmailView):
+    action = "recover_password"
+    enabled_setting = "EMAIL_RECOVER_PASSWORD"
+    email_name = "recover_password"
+
+
+class AsyncChangePasswordView(AsyncUserView):
+    action = "change_password"
+
+    async def post(self, request, *args, **kwargs):
+        serializer = await self.get_valid_serializer(data=request.data)
+        user = serializer.user
+        await sync_to_async(hashing.set_password, thread_sensitive=False)(
+            user, serializer.data["new_password"]
+        )
+        if hasattr(user, "last_login"):
+            user.last_login = now()
+        await user.asave()
+        return json_response(status_code=status.HTTP_204_NO_CONTENT)
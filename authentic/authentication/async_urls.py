@@ -0,0 +1,11 @@
+from django.urls import path
+from . import async_views, views
+
+urlpatterns = [
+    path("entrar/", async_views.AsyncTokenObtainPairView.as_view()),
+    path("verificar/", async_views.AsyncTokenVerifyView.as_view()),
+    path("verificar/lote/", async_views.AsyncTokenBatchVerifyView.as_view()),
+    path("renovar/", async_views.AsyncTokenRefreshView.as_view()),
+    path("sair/", async_views.AsyncLogoutView.as_view()),
+    path(".well-known/jwks.json", views.JWKSView.as_view()),
+]
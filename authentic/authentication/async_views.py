@@ -0,0 +1,178 @@
+from asgiref.sync import sync_to_async
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+from rest_framework import exceptions, status
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from authentic.authentication.cache import coalesce_refresh
+from authentic.authentication.revocation import acheck_token, revoke_token
+from authentic.authentication.views import (
+    get_data,
+    get_logout_tokens,
+    set_auth_cookie,
+    verify_tokens,
+)
+from authentic.conf import settings
+from authentic.throttling import get_throttle_classes
+from authentic.utils import metrics, timing
+from authentic.utils.asynchronous import (
+    AsyncAPIView,
+    aauthenticate_user,
+    json_response,
+    run_serializer,
+    uses_token_blacklist,
+)
+
+
+class AsyncTokenViewBase(AsyncAPIView):
+    serializer_class = None
+    www_authenticate_realm = "api"
+
+    def get_authenticate_header(self, request):
+        return '{} realm="{}"'.format(AUTH_HEADER_TYPES[0], self.www_authenticate_realm)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("context", {"request": self.request, "view": self})
+        return import_string(self.serializer_class)(*args, **kwargs)
+
+    async def validate(self, serializer):
+        try:
+            await run_serializer(serializer)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        return serializer.validated_data
+
+
+class AsyncTokenObtainPairView(AsyncTokenViewBase):
+    serializer_class = api_settings.TOKEN_OBTAIN_SERIALIZER
+
+    def get_throttles(self):
+        throttle_classes = get_throttle_classes("login", settings.THROTTLES.login)
+        return [throttle() for throttle in throttle_classes]
+
+    async def post(self, request, *args, **kwargs):
+        with metrics.track("authentic_logins_total", "entrar"):
+            return await self.obtain(request)
+
+    async def obtain(self, request):
+        serializer = self.get_serializer(data=get_data(request))
+        # Field level validation only, the credentials are checked below
+        # without leaving the event loop for the user lookup.
+        attrs = serializer.to_internal_value(serializer.initial_data)
+
+        user = await aauthenticate_user(
+            request,
+            **{
+                serializer.username_field: attrs[serializer.username_field],
+                "password": attrs["password"],
+            },
+        )
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise exceptions.AuthenticationFailed(
+                serializer.error_messages["no_active_account"],
+                "no_active_account",
+            )
+
+        with timing.phase("token"):
+            if uses_token_blacklist():
+                refresh = await sync_to_async(serializer.get_token)(user)
+            else:
+                refresh = serializer.get_token(user)
+            data = {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+        if api_settings.UPDATE_LAST_LOGIN:
+            await settings.USER_MODEL.objects.filter(pk=user.pk).aupdate(
+                last_login=now()
+            )
+
+        response = json_response(data)
+        set_auth_cookie(response, "access", data["access"])
+        set_auth_cookie(response, "refresh", data["refresh"])
+        return response
+
+
+class AsyncTokenRefreshView(AsyncTokenViewBase):
+    serializer_class = api_settings.TOKEN_REFRESH_SERIALIZER
+
+    def refresh(self, serializer):
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        return serializer.validated_data
+
+    async def post(self, request, *args, **kwargs):
+        with metrics.track("authentic_refreshes_total", "renovar"):
+            return await self.refresh_response(request)
+
+    async def refresh_response(self, request):
+        data = get_data(request)
+        refresh_token = request.COOKIES.get("refresh")
+
+        if refresh_token:
+            data["refresh"] = refresh_token
+        if settings.TOKEN_REVOCATION:
+            await acheck_token(data.get("refresh"))
+
+        serializer = self.get_serializer(data=data)
+        if settings.REFRESH_COALESCING:
+            validated_data = await sync_to_async(coalesce_refresh)(
+                data.get("refresh"), lambda: self.refresh(serializer)
+            )
+        else:
+            validated_data = await self.validate(serializer)
+
+        response = json_response(validated_data)
+        set_auth_cookie(response, "access", validated_data["access"])
+        return response
+
+
+class AsyncTokenVerifyView(AsyncTokenViewBase):
+    serializer_class = api_settings.TOKEN_VERIFY_SERIALIZER
+
+    async def post(self, request, *args, **kwargs):
+        with metrics.track("authentic_verifications_total", "verificar"):
+            return await self.verify(request)
+
+    async def verify(self, request):
+        data = get_data(request)
+        access_token = request.COOKIES.get("access")
+
+        if access_token:
+            data["token"] = access_token
+        if settings.TOKEN_REVOCATION:
+            await acheck_token(data.get("token"))
+
+        return json_response(await self.validate(self.get_serializer(data=data)))
+
+
+class AsyncTokenBatchVerifyView(AsyncAPIView):
+    authentication_classes = ()
+    permission_classes = settings.PERMISSIONS.verify_batch
+
+    async def post(self, request, *args, **kwargs):
+        serializer = settings.SERIALIZERS.verify_batch(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tokens = serializer.validated_data["tokens"]
+        if settings.TOKEN_REVOCATION:
+            # One thread hop for the whole batch, the revocation list may
+            # need a sync with its store.
+            results = await sync_to_async(verify_tokens)(tokens)
+        else:
+            results = verify_tokens(tokens)
+        return json_response({"results": results})
+
+
+class AsyncLogoutView(AsyncAPIView):
+    async def get(self, request, *args, **kwargs):
+        if settings.TOKEN_REVOCATION:
+            for token in get_logout_tokens(request):
+                await sync_to_async(revoke_token)(token)
+
+        response = json_response(status_code=status.HTTP_204_NO_CONTENT)
+        response.delete_cookie("access")
+        response.delete_cookie("refresh")
+
+        return response
@@ -1,22 +1,121 @@
+from django.utils.translation import gettext_lazy as _
+from authentic.authentication.cache import (
+    cache_user,
+    get_cached_user,
+    get_validated_token,
+)
+from authentic.authentication.revocation import acheck_token, check_token
 from authentic.conf import settings
+from authentic.utils import metrics, timing
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
 
 class AuthenticJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
         try:
-            header = self.get_header(request)
-            if header is None:
-                raw_token = request.COOKIES.get(settings.AUTH_COOKIE)
-            else:
-                raw_token = self.get_raw_token(header)
+            validated_token = self.get_request_token(request)
+            if validated_token is None:
+                return None
+            if settings.TOKEN_REVOCATION:
+                with timing.phase("revocation"):
+                    check_token(validated_token)
+
+            return self.get_user(validated_token), validated_token
+        except AuthenticationFailed as e:
+            # Anonymous as far as DRF is concerned, but worth counting.
+            metrics.inc(
+                "authentic_authentication_failures_total", code=metrics.error_code(e)
+            )
+            return None
 
-            if raw_token is None:
+    async def aauthenticate(self, request):
+        try:
+            validated_token = self.get_request_token(request)
+            if validated_token is None:
                 return None
+            if settings.TOKEN_REVOCATION:
+                with timing.phase("revocation"):
+                    await acheck_token(validated_token)
+
+            return await self.aget_user(validated_token), validated_token
+        except AuthenticationFailed as e:
+            # Anonymous as far as DRF is concerned, but worth counting.
+            metrics.inc(
+                "authentic_authentication_failures_total", code=metrics.error_code(e)
+            )
+            return None
 
-            validated_token = self.get_validated_token(raw_token)
+    def get_request_token(self, request):
+        header = self.get_header(request)
+        if header is None:
+            raw_token = request.COOKIES.get(settings.AUTH_COOKIE)
+        else:
+            raw_token = self.get_raw_token(header)
 
-            return self.get_user(validated_token), validated_token
-        except AuthenticationFailed:
+        if raw_token is None:
             return None
+
+        with timing.phase("jwt"):
+            return self.get_validated_token(raw_token)
+
+    def get_validated_token(self, raw_token):
+        if not settings.TOKEN_CACHE:
+            return super().get_validated_token(raw_token)
+        return get_validated_token(raw_token, super().get_validated_token)
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = get_cached_user(user_id) if settings.USER_CACHE else None
+        if user is not None:
+            return self.check_user(user, validated_token)
+
+        try:
+            with timing.phase("user"):
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_user(user, validated_token, cache_as=user_id)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = get_cached_user(user_id) if settings.USER_CACHE else None
+        if user is not None:
+            return self.check_user(user, validated_token)
+
+        try:
+            with timing.phase("user"):
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_user(user, validated_token, cache_as=user_id)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token, cache_as=None):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        if cache_as is not None and settings.USER_CACHE:
+            cache_user(cache_as, user)
+        return user
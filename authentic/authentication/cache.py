@@ -0,0 +1,145 @@
+import copy
+import hashlib
+import time
+
+from django.test.signals import setting_changed
+
+from authentic.authentication.keys import get_token_backend
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+from authentic.utils.cache import LRUCache, build_cache
+from authentic.utils.singleflight import SingleFlight
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+_user_cache = None
+_token_cache = None
+_negative_token_cache = None
+_refresh_flight = None
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = build_cache(
+            settings.USER_CACHE_BACKEND,
+            prefix="authentic:user",
+            max_size=settings.USER_CACHE_MAX_SIZE,
+            ttl=settings.USER_CACHE_TTL,
+        )
+    return _user_cache
+
+
+def get_cached_user(user_id):
+    user = get_user_cache().get(str(user_id))
+    # Each request gets its own instance, so a view mutating request.user
+    # never leaks into the cached copy.
+    return copy.copy(user) if user is not None else None
+
+
+def cache_user(user_id, user):
+    get_user_cache().set(str(user_id), user)
+
+
+def invalidate_user(sender, instance, **kwargs):
+    # Keyed like the authenticator: by simplejwt's USER_ID_FIELD, the value
+    # of the token's user id claim.
+    invalidate_users([getattr(instance, api_settings.USER_ID_FIELD)])
+
+
+def invalidate_users(user_ids):
+    """
+    Drops the cached users whose simplejwt USER_ID_FIELD values are
+    ``user_ids``. The cache is built on demand: with a shared backend,
+    another process may have cached them even if this one never
+    authenticated anyone.
+    """
+    if not settings.USER_CACHE:
+        return
+    get_user_cache().delete_many([str(user_id) for user_id in user_ids])
+
+
+def user_cache_stats() -> dict:
+    return get_user_cache().stats()
+
+
+def get_token_caches():
+    global _token_cache, _negative_token_cache
+    if _token_cache is None:
+        max_size = settings.TOKEN_CACHE_MAX_SIZE
+        _token_cache = LRUCache(max_size=max_size)
+        _negative_token_cache = LRUCache(
+            max_size=max_size, ttl=settings.TOKEN_CACHE_NEGATIVE_TTL
+        )
+    return _token_cache, _negative_token_cache
+
+
+def token_digest(raw_token) -> str:
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.sha256(raw_token).hexdigest()
+
+
+def get_validated_token(raw_token, validate):
+    positive, negative = get_token_caches()
+    key = token_digest(raw_token)
+
+    validated_token = positive.get(key)
+    if validated_token is not None:
+        return validated_token
+
+    detail = negative.get(key)
+    if detail is not None:
+        raise InvalidToken(detail)
+
+    try:
+        validated_token = validate(raw_token)
+    except InvalidToken as e:
+        negative.set(key, e.detail)
+        raise
+
+    # Never keep a token past its own expiration.
+    exp = validated_token.get("exp")
+    if exp is not None:
+        positive.set(key, validated_token, ttl=exp - time.time())
+    return validated_token
+
+
+def token_cache_stats() -> dict:
+    positive, negative = get_token_caches()
+    return {"valid": positive.stats(), "invalid": negative.stats()}
+
+
+def get_refresh_flight():
+    global _refresh_flight
+    if _refresh_flight is None:
+        _refresh_flight = SingleFlight(
+            settings.REFRESH_COALESCING_WINDOW,
+            alias=settings.REFRESH_COALESCING_CACHE_BACKEND,
+            prefix="authentic:refresh",
+            timeout=settings.REFRESH_COALESCING_TIMEOUT,
+        )
+    return _refresh_flight
+
+
+def coalesce_refresh(raw_token, refresh):
+    # Keyed by the jti of a correctly signed token only, the blacklist is
+    # not checked here since the first caller may have just rotated it.
+    try:
+        jti = get_token_backend().decode(raw_token)[api_settings.JTI_CLAIM]
+    except (TokenBackendError, KeyError, TypeError):
+        return refresh()
+    return get_refresh_flight().do(jti, lambda: dict(refresh()))
+
+
+def reset_caches(*args, **kwargs):
+    global _user_cache, _token_cache, _negative_token_cache, _refresh_flight
+    if kwargs.get("setting", AUTHENTIC_SETTINGS_NAMESPACE) == (
+        AUTHENTIC_SETTINGS_NAMESPACE
+    ):
+        _user_cache = None
+        _token_cache = None
+        _negative_token_cache = None
+        _refresh_flight = None
+
+
+setting_changed.connect(reset_caches)
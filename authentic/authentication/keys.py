@@ -0,0 +1,189 @@
+import hashlib
+import json
+
+import jwt
+from django.core.exceptions import ImproperlyConfigured
+from django.test.signals import setting_changed
+from django.utils.translation import gettext_lazy as _
+from jwt import InvalidTokenError, algorithms
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend as default_token_backend
+
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+
+SIGNING_ALGORITHMS = {
+    "HS256",
+    "HS384",
+    "HS512",
+    "RS256",
+    "RS384",
+    "RS512",
+    "ES256",
+    "ES384",
+    "ES512",
+    "EdDSA",
+}
+
+_token_backend = None
+
+
+class SigningKey:
+    def __init__(
+        self, kid: str, algorithm: str, signing_key=None, verifying_key=None, sign=True
+    ):
+        if algorithm not in SIGNING_ALGORITHMS:
+            raise ImproperlyConfigured(
+                f"Signing key {kid!r}: unsupported algorithm {algorithm!r}."
+            )
+        if algorithm in algorithms.requires_cryptography and not algorithms.has_crypto:
+            raise ImproperlyConfigured(
+                f"Signing key {kid!r}: cryptography must be installed to use "
+                f"{algorithm}."
+            )
+        if signing_key is None and (sign or verifying_key is None):
+            raise ImproperlyConfigured(f"Signing key {kid!r} has no signing_key.")
+
+        self.kid = kid
+        self.algorithm = algorithm
+        self.sign = sign
+        self.symmetric = algorithm.startswith("HS")
+
+        # Parsing a PEM costs more than verifying a signature, keys are
+        # prepared once here and not by PyJWT on every token.
+        prepare_key = jwt.get_algorithm_by_name(algorithm).prepare_key
+        self.signing_key = prepare_key(signing_key) if signing_key else None
+        if self.symmetric:
+            self.verifying_key = self.signing_key
+        elif verifying_key is not None:
+            self.verifying_key = prepare_key(verifying_key)
+        else:
+            self.verifying_key = self.signing_key.public_key()
+
+    def to_jwk(self) -> dict:
+        jwk = jwt.get_algorithm_by_name(self.algorithm).to_jwk(
+            self.verifying_key, as_dict=True
+        )
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class KeyRing:
+    """
+    The keys of AUTHENTIC["SIGNING_KEYS"]. Tokens are signed with the first
+    key whose ``sign`` is true and verified with whichever key their ``kid``
+    header names, so a key stays valid for as long as it is listed.
+    """
+
+    def __init__(self, keys):
+        self.keys = {}
+        for key in keys:
+            if key.kid in self.keys:
+                raise ImproperlyConfigured(f"Duplicate signing key id {key.kid!r}.")
+            self.keys[key.kid] = key
+
+        self.signing_key = next((key for key in keys if key.sign), None)
+        if self.signing_key is None:
+            raise ImproperlyConfigured("SIGNING_KEYS has no key to sign with.")
+
+        # Secrets of HMAC keys are never published.
+        self.jwks = {"keys": [key.to_jwk() for key in keys if not key.symmetric]}
+        self.jwks_body = json.dumps(self.jwks, separators=(",", ":")).encode()
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_body).hexdigest()[:32]}"'
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+class KeyRingTokenBackend(TokenBackend):
+    def __init__(self, keyring: KeyRing):
+        super().__init__(
+            api_settings.ALGORITHM,
+            api_settings.SIGNING_KEY,
+            api_settings.VERIFYING_KEY,
+            api_settings.AUDIENCE,
+            api_settings.ISSUER,
+            api_settings.JWK_URL,
+            api_settings.LEEWAY,
+            api_settings.JSON_ENCODER,
+        )
+        self.keyring = keyring
+
+    def encode(self, payload: dict) -> str:
+        key = self.keyring.signing_key
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            key.signing_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify: bool = True) -> dict:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except InvalidTokenError as ex:
+            raise TokenBackendError(_("Token is invalid or expired")) from ex
+
+        if not verify:
+            return super().decode(token, verify)
+        if kid is None:
+            # Tokens without a kid were signed with the simplejwt key before
+            # SIGNING_KEYS was set. Accepted until LEGACY_UNKEYED_TOKENS is
+            # switched off, once the refresh lifetime has passed.
+            if not settings.LEGACY_UNKEYED_TOKENS:
+                raise TokenBackendError(_("Token is invalid or expired"))
+            return super().decode(token, verify)
+
+        key = self.keyring.get(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid or expired"))
+        try:
+            return jwt.decode(
+                token,
+                key.verifying_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={"verify_aud": self.audience is not None},
+            )
+        except InvalidTokenError as ex:
+            raise TokenBackendError(_("Token is invalid or expired")) from ex
+
+
+class TokenBackendProxy:
+    # Installed as simplejwt's Token._token_backend, so every token class
+    # follows SIGNING_KEYS, including after the settings change.
+    def __getattr__(self, name):
+        return getattr(get_token_backend(), name)
+
+
+def get_token_backend():
+    global _token_backend
+    if _token_backend is None:
+        if settings.SIGNING_KEYS:
+            keyring = KeyRing([SigningKey(**key) for key in settings.SIGNING_KEYS])
+            _token_backend = KeyRingTokenBackend(keyring)
+        else:
+            _token_backend = default_token_backend
+    return _token_backend
+
+
+def get_keyring():
+    return getattr(get_token_backend(), "keyring", None)
+
+
+def reset_token_backend(*args, **kwargs):
+    global _token_backend
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        _token_backend = None
+
+
+setting_changed.connect(reset_token_backend)
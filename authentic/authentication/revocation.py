@@ -0,0 +1,253 @@
+import math
+import threading
+import time
+from hashlib import blake2b
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.test.signals import setting_changed
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from authentic.authentication.keys import get_token_backend
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+
+_revocations = None
+_revocations_lock = threading.Lock()
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.capacity = capacity
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, key: str):
+        # Double hashing over one digest instead of k independent hashes.
+        digest = int.from_bytes(blake2b(key.encode(), digest_size=16).digest(), "big")
+        return digest >> 64, (digest & 0xFFFFFFFFFFFFFFFF) | 1
+
+    def add(self, key: str):
+        h1, h2 = self._hashes(key)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        # Most keys are absent and return after the first probe or two.
+        h1, h2 = self._hashes(key)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class BaseRevocationStore:
+    def revoke(self, jti: str, exp: float):
+        raise NotImplementedError
+
+    def is_revoked(self, jti: str) -> bool:
+        raise NotImplementedError
+
+    def changes(self, cursor):
+        """
+        Returns the jtis revoked after ``cursor`` that have not expired yet,
+        and the cursor to pass on the next call.
+        """
+        raise NotImplementedError
+
+
+class CacheRevocationStore(BaseRevocationStore):
+    batch_size = 1000
+
+    def __init__(self, alias: str = None, prefix: str = "authentic:revoked"):
+        self.cache = caches[alias or settings.TOKEN_REVOCATION_CACHE_BACKEND]
+        self.prefix = prefix
+        self.pending = ()
+
+    def revoke(self, jti: str, exp: float):
+        timeout = exp - time.time()
+        if timeout <= 0:
+            return
+        self.cache.set(f"{self.prefix}:jti:{jti}", exp, timeout)
+        self.cache.add(f"{self.prefix}:version", 0, None)
+        version = self.cache.incr(f"{self.prefix}:version")
+        self.cache.set(f"{self.prefix}:log:{version}", jti, timeout)
+
+    def is_revoked(self, jti: str) -> bool:
+        return self.cache.get(f"{self.prefix}:jti:{jti}") is not None
+
+    def changes(self, cursor):
+        cursor = cursor or 0
+        version = self.cache.get(f"{self.prefix}:version", 0)
+        # An entry may be missing because another worker has bumped the
+        # version but not written it yet, those are retried once.
+        numbers = [*self.pending, *range(cursor + 1, version + 1)]
+        entries = []
+        missing = []
+        for start in range(0, len(numbers), self.batch_size):
+            keys = {
+                f"{self.prefix}:log:{number}": number
+                for number in numbers[start : start + self.batch_size]
+            }
+            found = self.cache.get_many(keys)
+            entries += found.values()
+            missing += [number for key, number in keys.items() if key not in found]
+        self.pending = tuple(number for number in missing if number > cursor)
+        return entries, max(cursor, version)
+
+
+class DatabaseRevocationStore(BaseRevocationStore):
+    def __init__(self):
+        from authentic.models import RevokedToken
+
+        self.model = RevokedToken
+
+    def revoke(self, jti: str, exp: float):
+        self.model.objects.get_or_create(
+            jti=jti, defaults={"expires_at": datetime_from_epoch(exp)}
+        )
+
+    def is_revoked(self, jti: str) -> bool:
+        return self.model.objects.filter(jti=jti, expires_at__gt=now()).exists()
+
+    def changes(self, cursor):
+        cursor = cursor or 0
+        entries = []
+        for pk, jti in (
+            self.model.objects.filter(pk__gt=cursor, expires_at__gt=now())
+            .order_by("pk")
+            .values_list("pk", "jti")
+            .iterator(chunk_size=10000)
+        ):
+            cursor = pk
+            entries.append(jti)
+        return entries, cursor
+
+    def purge(self):
+        self.model.objects.filter(expires_at__lte=now()).delete()
+
+
+class RevocationList:
+    # The Bloom filter answers "not revoked" for almost every request
+    # without any I/O, only its positives are confirmed against the store.
+    # Revocations made by other processes are picked up every
+    # sync_interval seconds.
+    def __init__(self, store, capacity: int, error_rate: float, sync_interval=1):
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.cursor = None
+        self.next_sync = 0
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: float):
+        self.store.revoke(jti, exp)
+        self.bloom.add(jti)
+
+    def needs_sync(self) -> bool:
+        return time.monotonic() >= self.next_sync
+
+    def sync(self):
+        # Only the first sync waits, later ones are skipped while another
+        # thread is already syncing.
+        if not self._lock.acquire(blocking=self.cursor is None):
+            return
+        try:
+            entries, self.cursor = self.store.changes(self.cursor)
+            bloom = self.bloom
+            if bloom.count + len(entries) > bloom.capacity:
+                # Expired entries are never removed from a Bloom filter,
+                # start over from the live ones once it is full.
+                if hasattr(self.store, "purge"):
+                    self.store.purge()
+                entries, self.cursor = self.store.changes(None)
+                self.capacity = max(self.capacity, 2 * len(entries))
+                bloom = BloomFilter(self.capacity, self.error_rate)
+            for jti in entries:
+                bloom.add(jti)
+            self.bloom = bloom
+            self.next_sync = time.monotonic() + self.sync_interval
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jti: str) -> bool:
+        if self.needs_sync():
+            self.sync()
+        return jti in self.bloom and self.store.is_revoked(jti)
+
+    async def ais_revoked(self, jti: str) -> bool:
+        if self.needs_sync() or jti in self.bloom:
+            return await sync_to_async(self.is_revoked)(jti)
+        return False
+
+
+def get_revocations():
+    global _revocations
+    if _revocations is None:
+        with _revocations_lock:
+            if _revocations is None:
+                _revocations = RevocationList(
+                    settings.REVOCATION.store(),
+                    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+                    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+                    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+                )
+    return _revocations
+
+
+def revoke_token(raw_token) -> bool:
+    try:
+        token = UntypedToken(raw_token)
+    except TokenError:
+        return False
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti is None:
+        return False
+    get_revocations().revoke(jti, token["exp"])
+    return True
+
+
+def get_jti(token):
+    try:
+        return token.get(api_settings.JTI_CLAIM)
+    except AttributeError:
+        # Raw token, its signature is checked by the caller.
+        try:
+            payload = get_token_backend().decode(token, verify=False)
+        except Exception:
+            return None
+        return payload.get(api_settings.JTI_CLAIM)
+
+
+def check_token(token):
+    jti = get_jti(token)
+    if jti is not None and get_revocations().is_revoked(jti):
+        raise InvalidToken(_("Token has been revoked"))
+
+
+async def acheck_token(token):
+    jti = get_jti(token)
+    if jti is not None and await get_revocations().ais_revoked(jti):
+        raise InvalidToken(_("Token has been revoked"))
+
+
+def reset_revocations(*args, **kwargs):
+    global _revocations
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        _revocations = None
+
+
+setting_changed.connect(reset_revocations)
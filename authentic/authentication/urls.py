@@ -1,9 +1,17 @@
-from django.urls import path
+from django.urls import include, path
+from authentic.conf import settings
 from . import views
 
 urlpatterns = [
     path("entrar/", views.AuthenticTokenObtainPairView.as_view()),
     path("verificar/", views.AuthenticTokenVerifyView.as_view()),
+    path("verificar/lote/", views.TokenBatchVerifyView.as_view()),
     path("renovar/", views.AuthenticTokenRefreshView.as_view()),
     path("sair/", views.LogoutView.as_view()),
+    path(".well-known/jwks.json", views.JWKSView.as_view()),
 ]
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = [
+        path("", include("authentic.authentication.async_urls")),
+    ]
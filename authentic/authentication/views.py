@@ -1,6 +1,21 @@
+from authentic.authentication.authenticator import AuthenticJWTAuthentication
+from authentic.authentication.cache import coalesce_refresh
+from authentic.authentication.keys import get_keyring
+from authentic.authentication.revocation import check_token, revoke_token
 from authentic.conf import settings
+from authentic.throttling import get_throttle_classes
+from authentic.utils import metrics, timing
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
 from rest_framework import views
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -9,56 +24,72 @@ from rest_framework_simplejwt.views import (
 from rest_framework import status
 
 
+def get_data(request) -> dict:
+    data = request.data
+    return data.dict() if hasattr(data, "dict") else dict(data)
+
+
+def set_auth_cookie(response, key, token):
+    response.set_cookie(
+        key,
+        token,
+        max_age=settings.AUTH_COOKIE_MAX_AGE,
+        path=settings.AUTH_COOKIE_PATH,
+        secure=settings.AUTH_COOKIE_SECURE,
+        httponly=settings.AUTH_COOKIE_HTTP_ONLY,
+        samesite=settings.AUTH_COOKIE_SAMESITE,
+    )
+
+
 class AuthenticTokenObtainPairView(TokenObtainPairView):
+    def get_throttles(self):
+        throttle_classes = get_throttle_classes("login", settings.THROTTLES.login)
+        return [throttle() for throttle in throttle_classes]
+
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        # User lookup, password check and token minting all happen inside
+        # the simplejwt serializer.
+        with metrics.track("authentic_logins_total", "entrar"):
+            with timing.phase("authenticate"):
+                response = super().post(request, *args, **kwargs)
         if response.status_code == 200:
-            access_token = response.data.get("access")
-            refresh_token = response.data.get("refresh")
-            response.set_cookie(
-                "access",
-                access_token,
-                max_age=settings.AUTH_COOKIE_MAX_AGE,
-                path=settings.AUTH_COOKIE_PATH,
-                secure=settings.AUTH_COOKIE_SECURE,
-                httponly=settings.AUTH_COOKIE_HTTP_ONLY,
-                samesite=settings.AUTH_COOKIE_SAMESITE,
-            )
-            response.set_cookie(
-                "refresh",
-                refresh_token,
-                max_age=settings.AUTH_COOKIE_MAX_AGE,
-                path=settings.AUTH_COOKIE_PATH,
-                secure=settings.AUTH_COOKIE_SECURE,
-                httponly=settings.AUTH_COOKIE_HTTP_ONLY,
-                samesite=settings.AUTH_COOKIE_SAMESITE,
-            )
+            set_auth_cookie(response, "access", response.data.get("access"))
+            set_auth_cookie(response, "refresh", response.data.get("refresh"))
 
         return response
 
 
 class AuthenticTokenRefreshView(TokenRefreshView):
+    def refresh(self, data):
+        serializer = self.get_serializer(data=data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        return serializer.validated_data
+
     def post(self, request, *args, **kwargs):
+        with metrics.track("authentic_refreshes_total", "renovar"):
+            return self.refresh_response(request)
+
+    def refresh_response(self, request):
+        data = get_data(request)
         refresh_token = request.COOKIES.get("refresh")
 
         if refresh_token:
-            request.data["refresh"] = refresh_token
-
-        response = super().post(request, *args, **kwargs)
+            data["refresh"] = refresh_token
+        if settings.TOKEN_REVOCATION:
+            check_token(data.get("refresh"))
 
-        if response.status_code == 200:
-            access_token = response.data.get("access")
-
-            response.set_cookie(
-                "access",
-                access_token,
-                max_age=settings.AUTH_COOKIE_MAX_AGE,
-                path=settings.AUTH_COOKIE_PATH,
-                secure=settings.AUTH_COOKIE_SECURE,
-                httponly=settings.AUTH_COOKIE_HTTP_ONLY,
-                samesite=settings.AUTH_COOKIE_SAMESITE,
+        if settings.REFRESH_COALESCING:
+            validated_data = coalesce_refresh(
+                data.get("refresh"), lambda: self.refresh(data)
             )
+        else:
+            validated_data = self.refresh(data)
 
+        response = Response(validated_data, status=status.HTTP_200_OK)
+        set_auth_cookie(response, "access", validated_data.get("access"))
         return response
 
 
@@ -68,12 +99,103 @@ class AuthenticTokenVerifyView(TokenVerifyView):
 
         if access_token:
             request.data["token"] = access_token
+        with metrics.track("authentic_verifications_total", "verificar"):
+            if settings.TOKEN_REVOCATION:
+                check_token(request.data.get("token"))
+            return super().post(request, *args, **kwargs)
+
+
+def verify_token(authentication, raw_token) -> dict:
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        if settings.TOKEN_REVOCATION:
+            check_token(validated_token)
+    except AuthenticationFailed as e:
+        detail = (
+            e.detail.get("detail", e.detail) if isinstance(e.detail, dict) else e.detail
+        )
+        return {"valid": False, "detail": str(detail), "code": metrics.error_code(e)}
+
+    return {
+        "valid": True,
+        "token_type": validated_token.get(api_settings.TOKEN_TYPE_CLAIM),
+        "sub": validated_token.get(api_settings.USER_ID_CLAIM),
+        "exp": validated_token.get("exp"),
+    }
+
+
+def verify_tokens(raw_tokens) -> list:
+    """
+    Verifies access tokens the way the authenticator does, through the
+    validated-token cache when TOKEN_CACHE is on. Verdicts are in the order
+    of ``raw_tokens``.
+    """
+    authentication = AuthenticJWTAuthentication()
+    verdicts = {}
+    with metrics.timer("authentic_request_seconds", endpoint="verificar/lote"):
+        for raw_token in raw_tokens:
+            # Gateways often send the same token several times in a batch.
+            if raw_token not in verdicts:
+                verdicts[raw_token] = verify_token(authentication, raw_token)
+
+    results = [verdicts[raw_token] for raw_token in raw_tokens]
+    valid = sum(result["valid"] for result in results)
+    metrics.inc("authentic_verifications_total", valid, outcome="success")
+    metrics.inc(
+        "authentic_verifications_total", len(results) - valid, outcome="failure"
+    )
+    return results
+
+
+class TokenBatchVerifyView(views.APIView):
+    authentication_classes = ()
+    permission_classes = settings.PERMISSIONS.verify_batch
+
+    def post(self, request, *args, **kwargs):
+        serializer = settings.SERIALIZERS.verify_batch(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = verify_tokens(serializer.validated_data["tokens"])
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class JWKSView(views.APIView):
+    # Public keys of SIGNING_KEYS for services verifying tokens locally.
+    # During a rotation the next key is listed (sign: False) before it signs
+    # anything, keep JWKS_MAX_AGE below that overlap.
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        keyring = get_keyring()
+        if keyring is None:
+            body, etag = b'{"keys":[]}', '"empty"'
+        else:
+            body, etag = keyring.jwks_body, keyring.jwks_etag
+
+        # Parses If-None-Match lists, "*" and weak W/ tags.
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={settings.JWKS_MAX_AGE}"
+        return response
 
-        return super().post(request, *args, **kwargs)
+
+def get_logout_tokens(request) -> list:
+    tokens = [request.COOKIES.get("access"), request.COOKIES.get("refresh")]
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is not None:
+        tokens.append(authentication.get_raw_token(header))
+    return [token for token in tokens if token]
 
 
 class LogoutView(views.APIView):
     def get(self, request, *args, **kwargs):
+        if settings.TOKEN_REVOCATION:
+            for token in get_logout_tokens(request):
+                revoke_token(token)
+
         response = Response(status=status.HTTP_204_NO_CONTENT)
         response.delete_cookie("access")
         response.delete_cookie("refresh")
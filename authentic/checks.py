@@ -0,0 +1,97 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+from django.db import connections, router
+
+from authentic.conf import settings
+from authentic.utils.indexes import missing_user_indexes
+
+
+@register(Tags.database)
+def check_user_indexes(app_configs=None, databases=None, **kwargs):
+    """
+    Warns about user list filter, search and ordering columns without an
+    index. Runs on ``migrate`` and ``check --database``.
+    """
+    User = settings.USER_MODEL
+    warnings = []
+    for alias in databases or ():
+        if not router.allow_migrate_model(alias, User):
+            continue
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            tables = connection.introspection.table_names(cursor)
+        if User._meta.db_table not in tables:
+            continue
+        for field in missing_user_indexes(connection, User):
+            warnings.append(
+                Warning(
+                    f"{User._meta.label}.{field.name} is filtered, searched or "
+                    f"ordered by on the user list but has no index in the "
+                    f"{alias!r} database.",
+                    hint=(
+                        "Add db_index=True to the field, or run "
+                        "authentic.utils.indexes.create_user_indexes from a "
+                        "RunPython migration."
+                    ),
+                    obj=User,
+                    id="authentic.W001",
+                )
+            )
+    return warnings
+
+
+@register(Tags.caches)
+def check_revocation_cache(app_configs=None, **kwargs):
+    """
+    Warns when revoked tokens are kept in a cache of the process that
+    revoked them, where other workers never see them.
+    """
+    from authentic.authentication.revocation import CacheRevocationStore
+
+    if not settings.TOKEN_REVOCATION:
+        return []
+    if not issubclass(settings.REVOCATION.store, CacheRevocationStore):
+        return []
+    alias = settings.TOKEN_REVOCATION_CACHE_BACKEND
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [
+        Warning(
+            f"TOKEN_REVOCATION stores revoked tokens in the {alias!r} cache, "
+            f"a LocMemCache local to each process: a token revoked by one "
+            f"worker stays valid on the others.",
+            hint=(
+                "Point TOKEN_REVOCATION_CACHE_BACKEND to a shared cache "
+                "(Redis, Memcached, database) or use the "
+                "DatabaseRevocationStore."
+            ),
+            id="authentic.W002",
+        )
+    ]
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs=None, **kwargs):
+    """
+    Warns when user renderings are cached per process: a save in one
+    worker does not reach the renderings cached by the others.
+    """
+    if not settings.USER_RESPONSE_CACHE:
+        return []
+    alias = settings.USER_RESPONSE_CACHE_BACKEND
+    if alias and not isinstance(caches[alias], LocMemCache):
+        return []
+    return [
+        Warning(
+            "USER_RESPONSE_CACHE keeps user renderings in memory of each "
+            "process: after a save, other workers keep serving the previous "
+            "rendering and answering 304 to its ETag until "
+            "USER_RESPONSE_CACHE_TTL expires.",
+            hint=(
+                "Point USER_RESPONSE_CACHE_BACKEND to a shared cache (Redis, "
+                "Memcached, database)."
+            ),
+            id="authentic.W003",
+        )
+    ]
@@ -1,36 +1,36 @@
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
 from django.apps import apps
 from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
 from django.test.signals import setting_changed
-from django.utils.functional import LazyObject
+from django.utils.functional import LazyObject, empty
 from django.utils.module_loading import import_string
 
 AUTHENTIC_SETTINGS_NAMESPACE = "AUTHENTIC"
 
 
-auth_module, auth_model = django_settings.AUTH_USER_MODEL.split(".")
-
-User = apps.get_model(auth_module, auth_model)
+# Filled from AUTH_USER_MODEL when the settings are first built, importing
+# this module never touches the app registry.
+USER_MODEL_DEFAULTS = {
+    "USER_MODEL": lambda User: User,
+    "USER_ID_FIELD": lambda User: User._meta.pk.name,
+    "LOGIN_FIELD": lambda User: User.USERNAME_FIELD,
+}
 
 
 class ObjDict(dict):
-    def __getattribute__(self, item):
-        try:
-            val = self[item]
-            if isinstance(val, str):
-                val = import_string(val)
-            elif isinstance(val, (list, tuple)):
-                val = [import_string(v) if isinstance(v, str) else v for v in val]
-            self[item] = val
-        except KeyError:
-            val = super().__getattribute__(item)
-
-        return val
+    # Marks a namespace of dotted import paths, resolved when the settings
+    # are compiled.
+    pass
 
 
 default_settings = {
-    "USER_MODEL": User,
-    "USER_ID_FIELD": User._meta.pk.name,
-    "LOGIN_FIELD": User.USERNAME_FIELD,
+    "USER_MODEL": None,
+    "USER_ID_FIELD": None,
+    "LOGIN_FIELD": None,
     "EMAIL_ACTIVATION": True,
     "EMAIL_ACTIVATION_URL": "/contas/ativacao/{uid}/{token}",
     "CHANGE_PASSWORD_URL": "/contas/recuperar/senha/trocar/{uid}/{token}",
@@ -46,14 +46,92 @@ default_settings = {
     "AUTH_COOKIE_SAMESITE": "None",
     "USER_MODEL_FIELDS_HIDDEN": [],
     "PAGE_SIZE": 10,
+    "PAGINATION_STYLE": "limitoffset",
+    "PAGINATION_ORDERING": "pk",
+    "FAST_READS": False,
+    "USER_SEARCH_FIELDS": ("username", "email"),
+    "USER_ORDERING_FIELDS": ("pk", "username", "email", "date_joined"),
+    "PAGINATION_COUNT": "exact",
+    "PAGINATION_COUNT_TTL": 60,
+    "PAGINATION_COUNT_CACHE_BACKEND": None,
+    "PAGINATION_COUNT_ESTIMATE_MIN": 10000,
+    "USER_CACHE": False,
+    "USER_CACHE_BACKEND": None,
+    "USER_CACHE_MAX_SIZE": 1024,
+    "USER_CACHE_TTL": 300,
+    "USER_RESPONSE_CACHE": False,
+    "USER_RESPONSE_CACHE_BACKEND": None,
+    "USER_RESPONSE_CACHE_MAX_SIZE": 1024,
+    "USER_RESPONSE_CACHE_TTL": 300,
+    "TOKEN_CACHE": False,
+    "TOKEN_CACHE_MAX_SIZE": 4096,
+    "TOKEN_CACHE_NEGATIVE_TTL": 5,
+    "EMAIL_DISPATCH_WORKERS": 2,
+    "EMAIL_DISPATCH_QUEUE_SIZE": 1000,
+    "EMAIL_DISPATCH_BATCH_SIZE": 50,
+    "EMAIL_DISPATCH_BACKPRESSURE": "sync",
+    "EMAIL_DISPATCH_TIMEOUT": 5,
+    "PASSWORD_POOL": None,
+    "PASSWORD_POOL_SIZE": None,
+    "PASSWORD_POOL_QUEUE_DEPTH": 0,
+    "PASSWORD_POOL_TIMEOUT": 30,
+    "ASYNC_VIEWS": False,
+    "WARM_UP": False,
+    "TOKEN_REVOCATION": False,
+    "TOKEN_REVOCATION_CACHE_BACKEND": "default",
+    "TOKEN_REVOCATION_CAPACITY": 1000000,
+    "TOKEN_REVOCATION_ERROR_RATE": 0.001,
+    "TOKEN_REVOCATION_SYNC_INTERVAL": 1,
+    "REFRESH_COALESCING": False,
+    "REFRESH_COALESCING_WINDOW": 10,
+    "REFRESH_COALESCING_CACHE_BACKEND": None,
+    "REFRESH_COALESCING_TIMEOUT": 5,
+    "THROTTLE_RATES": {
+        "ip": None,
+        "login": None,
+        "email": None,
+    },
+    "THROTTLE_CACHE_BACKEND": None,
+    "THROTTLE_MAX_SIZE": 10000,
+    "SERVER_TIMING": False,
+    "VERIFY_BATCH_MAX_SIZE": 500,
+    "BULK_CHUNK_SIZE": 1000,
+    "BULK_MAX_IDS": 100000,
+    "EXPORT_CHUNK_SIZE": 2000,
+    "LEGACY_LINK_TOKENS": True,
+    "SIGNING_KEYS": [],
+    "LEGACY_UNKEYED_TOKENS": True,
+    "JWKS_MAX_AGE": 3600,
+    "METRICS": False,
+    "METRICS_DIR": None,
+    "METRICS_BUCKETS": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    "QUERY_BUDGETS": {
+        "list": 3,
+        "retrieve": 2,
+        "update": 3,
+        "partial_update": 3,
+        "destroy": 5,
+        # With PASSWORD_POOL, the hash computed beforehand is stored by an
+        # UPDATE after the manager's INSERT.
+        "register": 3,
+        "activation": 2,
+        "resend_activation": 1,
+        "recover_password": 1,
+        "change_password": 2,
+    },
+    "QUERY_BUDGET_RAISE": False,
     "EMAIL": ObjDict(
         {
             "activation": "authentic.utils.email.ActivationEmail",
             "recover_password": "authentic.utils.email.RecoverPasswordEmail",
+            "dispatcher": "authentic.utils.dispatch.SyncEmailDispatcher",
         },
     ),
     "PAGINATION": ObjDict(
-        {"limitoffset": "authentic.utils.pagination.AuthenticPagination"}
+        {
+            "limitoffset": "authentic.utils.pagination.AuthenticPagination",
+            "cursor": "authentic.utils.pagination.AuthenticCursorPagination",
+        }
     ),
     "MESSAGES": ObjDict(
         {
@@ -70,6 +148,13 @@ default_settings = {
             "recover_password": "authentic.serializers.RecoverPasswordSerializer",
             "change_password": "authentic.serializers.ChangePasswordSerializer",
             "change_password_retype": "authentic.serializers.ChangePasswordRetypeSerializer",
+            "verify_batch": "authentic.serializers.TokenBatchVerifySerializer",
+            "bulk": "authentic.serializers.UserBulkSerializer",
+        }
+    ),
+    "FILTERS": ObjDict(
+        {
+            "user": ["authentic.filters.UserFilterBackend"],
         }
     ),
     "PERMISSIONS": ObjDict(
@@ -82,6 +167,31 @@ default_settings = {
             "resend_activation": ["rest_framework.permissions.AllowAny"],
             "recover_password": ["rest_framework.permissions.AllowAny"],
             "change_password": ["rest_framework.permissions.AllowAny"],
+            "verify_batch": ["rest_framework.permissions.AllowAny"],
+            "bulk": ["rest_framework.permissions.IsAdminUser"],
+            "export": ["rest_framework.permissions.IsAdminUser"],
+            "metrics": ["rest_framework.permissions.IsAdminUser"],
+        }
+    ),
+    # None keeps DRF's DEFAULT_THROTTLE_CLASSES, plus the built-in
+    # throttles of authentic.throttling.DEFAULT_THROTTLES. A list replaces
+    # both.
+    "THROTTLES": ObjDict(
+        {
+            "user": None,
+            "login": None,
+            "resend_activation": None,
+            "recover_password": None,
+        }
+    ),
+    "TIMING": ObjDict(
+        {
+            "hook": None,
+        }
+    ),
+    "REVOCATION": ObjDict(
+        {
+            "store": "authentic.authentication.revocation.CacheRevocationStore",
         }
     ),
     "AUTHENTICATION": ObjDict(
@@ -94,6 +204,88 @@ default_settings = {
 }
 
 
+IMPORT_NAMESPACES = frozenset(
+    name for name, value in default_settings.items() if isinstance(value, ObjDict)
+)
+
+ACTION_SETTING_KEYS = {"register": "registration"}
+
+USER_ACTIONS = (
+    "list",
+    "retrieve",
+    "create",
+    "update",
+    "partial_update",
+    "destroy",
+    "register",
+    "activation",
+    "resend_activation",
+    "recover_password",
+    "change_password",
+    "bulk",
+    "export",
+)
+
+
+def resolve(value):
+    if isinstance(value, str):
+        return import_string(value)
+    if isinstance(value, (list, tuple)):
+        return [import_string(v) if isinstance(v, str) else v for v in value]
+    return value
+
+
+class Namespace(Mapping):
+    # Values live in the instance __dict__ so reading them is a plain
+    # attribute lookup.
+    def __init__(self, values=()):
+        self.__dict__.update(values)
+
+    def __getitem__(self, key):
+        return self.__dict__[key]
+
+    def __iter__(self):
+        return iter(self.__dict__)
+
+    def __len__(self):
+        return len(self.__dict__)
+
+    def __setattr__(self, name, value):
+        raise TypeError("Authentic settings are read-only.")
+
+    __delattr__ = __setattr__
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.__dict__!r})"
+
+
+class LazyNamespace(Mapping):
+    # Only used until the snapshot is compiled, resolves on every access
+    # instead of caching so it never mutates shared state.
+    def __init__(self, values=()):
+        object.__setattr__(self, "_values", dict(values))
+
+    def __getattr__(self, item):
+        try:
+            return resolve(self._values[item])
+        except KeyError:
+            raise AttributeError(item) from None
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    __setattr__ = __delattr__ = Namespace.__setattr__
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._values!r})"
+
+
 class Settings:
     def __init__(self, default_settings, explicit_overriden_settings: dict = None):
         if explicit_overriden_settings is None:
@@ -107,23 +299,126 @@ class Settings:
         self._load_default_settings()
         self._override_settings(overriden_settings)
 
+    def __setattr__(self, name, value):
+        if getattr(self, "_compiled", False):
+            raise AttributeError("Compiled authentic settings are read-only.")
+        super().__setattr__(name, value)
+
     def _load_default_settings(self):
+        User = get_user_model()
         for setting_name, setting_value in default_settings.items():
+            if setting_name in USER_MODEL_DEFAULTS and setting_value is None:
+                setting_value = USER_MODEL_DEFAULTS[setting_name](User)
             if setting_name.isupper():
+                if isinstance(setting_value, dict):
+                    setting_value = self._namespace(setting_name, setting_value)
                 setattr(self, setting_name, setting_value)
 
     def _override_settings(self, overriden_settings: dict):
         for setting_name, setting_value in overriden_settings.items():
             value = setting_value
             if isinstance(setting_value, dict):
-                value = getattr(self, setting_name, {})
-                value.update(ObjDict(setting_value))
+                current = getattr(self, setting_name, {})
+                value = self._namespace(setting_name, {**current, **setting_value})
             setattr(self, setting_name, value)
 
+    def _namespace(self, setting_name, values):
+        if setting_name in IMPORT_NAMESPACES:
+            return LazyNamespace(values)
+        return Namespace(values)
+
+    def replace(self, **changes):
+        snapshot = object.__new__(Settings)
+        for setting_name, setting_value in vars(self).items():
+            if setting_name.isupper() and not setting_name.startswith("ACTION_"):
+                object.__setattr__(snapshot, setting_name, setting_value)
+        snapshot._override_settings(changes)
+        return snapshot.compile() if self.compiled else snapshot
+
+    @property
+    def compiled(self) -> bool:
+        return getattr(self, "_compiled", False)
+
+    def compile(self):
+        if self.compiled:
+            return self
+        snapshot = object.__new__(Settings)
+        for setting_name, setting_value in vars(self).items():
+            if isinstance(setting_value, LazyNamespace):
+                setting_value = Namespace(
+                    (key, resolve(value)) for key, value in setting_value.items()
+                )
+            object.__setattr__(snapshot, setting_name, setting_value)
+        snapshot._build_dispatch_tables()
+        object.__setattr__(snapshot, "_compiled", True)
+        return snapshot
+
+    def _build_dispatch_tables(self):
+        serializers = dict.fromkeys(USER_ACTIONS, self.SERIALIZERS.user)
+        permissions = {}
+        authentication = {}
+        throttles = {}
+        for action in USER_ACTIONS:
+            key = ACTION_SETTING_KEYS.get(action, action)
+            if key in self.SERIALIZERS:
+                serializers[action] = self.SERIALIZERS[key]
+            permissions[action] = self.PERMISSIONS.get(key, self.PERMISSIONS.user)
+            authentication[action] = self.AUTHENTICATION.get(
+                key, self.AUTHENTICATION.authentic
+            )
+            throttles[action] = self.THROTTLES.get(key, self.THROTTLES.user)
+        if self.USER_CREATE_PASSWORD_RETYPE:
+            serializers["register"] = self.SERIALIZERS.registration_retype
+        if self.CHANGE_PASSWORD_RETYPE:
+            serializers["change_password"] = self.SERIALIZERS.change_password_retype
+
+        self.ACTION_SERIALIZERS = MappingProxyType(serializers)
+        self.ACTION_PERMISSIONS = MappingProxyType(permissions)
+        self.ACTION_AUTHENTICATION = MappingProxyType(authentication)
+        self.ACTION_THROTTLES = MappingProxyType(throttles)
+
+
+# The snapshot a thread is compiling, see LazySettings.build.
+_building = threading.local()
+
 
 class LazySettings(LazyObject):
     def _setup(self, explicit_overriden_settings=None):
-        self._wrapped = Settings(default_settings, explicit_overriden_settings)
+        snapshot = Settings(default_settings, explicit_overriden_settings)
+        if apps.ready:
+            snapshot = self.build(snapshot)
+        self._wrapped = snapshot
+
+    def compile(self):
+        snapshot = self._wrapped
+        if snapshot is empty:
+            snapshot = Settings(default_settings)
+        self._wrapped = self.build(snapshot)
+
+    def build(self, snapshot):
+        # Modules imported while resolving dotted paths read the snapshot
+        # being compiled from this thread. Every other thread keeps reading
+        # the previous, complete one until the compiled one is assigned.
+        previous = getattr(_building, "snapshot", None)
+        _building.snapshot = snapshot
+        try:
+            return snapshot.compile()
+        finally:
+            _building.snapshot = previous
+
+    def __getattr__(self, name):
+        snapshot = getattr(_building, "snapshot", None)
+        if snapshot is not None:
+            return getattr(snapshot, name)
+        return super().__getattr__(name)
+
+    def __setattr__(self, name, value):
+        if name == "_wrapped":
+            super().__setattr__(name, value)
+            return
+        if self._wrapped is empty:
+            self._setup()
+        self._wrapped = self._wrapped.replace(**{name: value})
 
 
 settings = LazySettings()
@@ -1,4 +1,6 @@
 from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
 
 
 class AuthenticMessages:
@@ -7,5 +9,16 @@ class AuthenticMessages:
     CANNOT_CREATE_USER_ERROR = _("Unable to create account.")
     INVALID_UID_ERROR = _("Invalid uid.")
     INVALID_TOKEN_ERROR = _("Invalid TOKEN.")
+    UNKNOWN_FIELDS_ERROR = _("Unknown fields: {fields}.")
+    INVALID_FILTER_ERROR = _("Invalid value for {param}.")
+    INVALID_ORDERING_ERROR = _("Cannot order by {field}.")
+    BULK_TARGET_ERROR = _("Send either ids or filter.")
     ALREADY_ACTIVATED = _("User is already validated.")
     USER_NOT_EXISTS = _("Email is not exists.")
+    SERVICE_UNAVAILABLE = _("Service temporarily unavailable, try again later.")
+
+
+class ServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = AuthenticMessages.SERVICE_UNAVAILABLE
+    default_code = "service_unavailable"
@@ -0,0 +1,168 @@
+import sys
+from datetime import datetime, time
+
+from django.conf import settings as django_settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from authentic.conf import settings
+
+BOOLEAN_VALUES = {"true": True, "1": True, "false": False, "0": False}
+
+# The column ?date_joined_after= (inclusive) and ?date_joined_before=
+# (exclusive) compare against.
+DATE_FILTER_FIELD = "date_joined"
+
+
+def has_field(model, name: str) -> bool:
+    if name == "pk":
+        return True
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def filtered_fields() -> set:
+    """The columns ?is_active=, ?date_joined_*= and ?search= compare against."""
+    return {"is_active", DATE_FILTER_FIELD, *settings.USER_SEARCH_FIELDS}
+
+
+def prefix_upper_bound(prefix: str):
+    """
+    The smallest string greater than every string starting with ``prefix``,
+    None when every string past ``prefix`` starts with it.
+    """
+    while prefix:
+        last = ord(prefix[-1]) + 1
+        if 0xD800 <= last <= 0xDFFF:
+            last = 0xE000
+        if last <= sys.maxunicode:
+            return prefix[:-1] + chr(last)
+        prefix = prefix[:-1]
+    return None
+
+
+def prefix_q(field: str, prefix: str) -> Q:
+    # "col >= 'ab' AND col < 'ac'" narrows a btree index scan. It is only a
+    # prefix match under code point ordering, under linguistic collations
+    # (en_US.UTF-8 on PostgreSQL) it also holds rows not starting with the
+    # prefix, so the startswith keeps the result exact.
+    q = Q(**{f"{field}__gte": prefix}) & Q(**{f"{field}__startswith": prefix})
+    upper = prefix_upper_bound(prefix)
+    if upper is not None:
+        q &= Q(**{f"{field}__lt": upper})
+    return q
+
+
+def invalid(param: str):
+    message = settings.MESSAGES.errors.INVALID_FILTER_ERROR
+    return ValidationError({param: [message.format(param=param)]})
+
+
+def parse_boolean(param: str, value: str) -> bool:
+    try:
+        return BOOLEAN_VALUES[value.lower()]
+    except KeyError:
+        raise invalid(param) from None
+
+
+def parse_moment(param: str, value: str) -> datetime:
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.combine(day, time.min)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise invalid(param)
+    if django_settings.USE_TZ and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_users(queryset, params):
+    """
+    Applies the is_active, date_joined_after, date_joined_before and search
+    entries of ``params`` to ``queryset``.
+    """
+    model = queryset.model
+
+    value = params.get("is_active")
+    if value and has_field(model, "is_active"):
+        queryset = queryset.filter(is_active=parse_boolean("is_active", value))
+
+    if has_field(model, DATE_FILTER_FIELD):
+        for suffix, lookup in (("after", "gte"), ("before", "lt")):
+            param = f"{DATE_FILTER_FIELD}_{suffix}"
+            value = params.get(param)
+            if value:
+                moment = parse_moment(param, value)
+                queryset = queryset.filter(**{f"{DATE_FILTER_FIELD}__{lookup}": moment})
+
+    value = params.get("search")
+    if value:
+        q = Q()
+        for field in settings.USER_SEARCH_FIELDS:
+            if has_field(model, field):
+                q |= prefix_q(field, value)
+        queryset = queryset.filter(q)
+    return queryset
+
+
+class UserFilterBackend(BaseFilterBackend):
+    """
+    ?is_active=, ?date_joined_after=, ?date_joined_before=, prefix
+    ?search= on USER_SEARCH_FIELDS and ?ordering= on USER_ORDERING_FIELDS,
+    applied to the user list only. Every predicate is a comparison on a
+    single column so the indexes verified by ``authentic.checks`` serve it.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, "action", None) != "list":
+            return queryset
+
+        params = request.query_params
+        queryset = filter_users(queryset, params)
+
+        if "ordering" in params:
+            ordering = self.get_ordering(request, queryset, view)
+            queryset = queryset.order_by(*ordering)
+            # Sparse fieldsets load only some columns, pagination reads the
+            # ordering ones from the last row.
+            names, defer = queryset.query.deferred_loading
+            if names and not defer:
+                queryset = queryset.only(
+                    *names, *(name.lstrip("-") for name in ordering)
+                )
+        return queryset
+
+    def get_ordering(self, request, queryset, view):
+        """
+        The ordering of ?ordering=, a comma separated list of
+        USER_ORDERING_FIELDS optionally prefixed with "-", always including
+        the primary key so pages never overlap.
+        """
+        value = request.query_params.get("ordering")
+        if not value:
+            return (settings.PAGINATION_ORDERING,)
+
+        ordering = []
+        for name in value.split(","):
+            name = name.strip()
+            field = name.lstrip("-")
+            if field not in settings.USER_ORDERING_FIELDS or not has_field(
+                queryset.model, field
+            ):
+                message = settings.MESSAGES.errors.INVALID_ORDERING_ERROR
+                raise ValidationError({"ordering": [message.format(field=field)]})
+            ordering.append(name)
+        if "pk" not in (name.lstrip("-") for name in ordering):
+            ordering.append("pk")
+        return tuple(ordering)
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("jti", models.CharField(max_length=255, unique=True)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
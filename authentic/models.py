@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -1,23 +1,53 @@
+from functools import lru_cache
 from django.forms import ValidationError
 from rest_framework import serializers
 from rest_framework.settings import api_settings
 from django.core import exceptions as django_exceptions
 from django.contrib.auth import get_user_model
-from django.contrib.auth.password_validation import validate_password
 from authentic.conf import settings
 from django.db import IntegrityError, transaction
 from authentic.utils import get_allowed_fields
-from authentic.utils import decode_uid
-from django.contrib.auth.tokens import default_token_generator
+from authentic.utils import decode_pk
+from authentic.utils import hashing
+from authentic.utils import timing
+from authentic.utils.tokens import link_token_generator
 
 User = get_user_model()
 
 
+@lru_cache(maxsize=None)
+def _allowed_fields(model, hidden_fields: tuple) -> tuple:
+    return get_allowed_fields(model, list(hidden_fields))
+
+
+def get_user_fields() -> tuple:
+    return _allowed_fields(User, tuple(settings.USER_MODEL_FIELDS_HIDDEN))
+
+
 class UserSerializer(serializers.ModelSerializer):
+    # Fields are computed on first use instead of at class definition, so
+    # importing this module does not depend on the settings being loaded.
+    # ``fields`` restricts them further, see UserViewSet.get_requested_fields.
     class Meta:
         model = User
-        fields = get_allowed_fields(User, settings.USER_MODEL_FIELDS_HIDDEN)
-        read_only_fields = get_allowed_fields(User, settings.USER_MODEL_FIELDS_HIDDEN)
+
+    def __init__(self, *args, fields=None, **kwargs):
+        self.requested_fields = fields
+        super().__init__(*args, **kwargs)
+
+    def get_field_names(self, declared_fields, info):
+        if self.requested_fields is not None:
+            return self.requested_fields
+        return get_user_fields()
+
+    def get_extra_kwargs(self):
+        extra_kwargs = super().get_extra_kwargs()
+        for field_name in get_user_fields():
+            extra_kwargs[field_name] = {
+                **extra_kwargs.get(field_name, {}),
+                "read_only": True,
+            }
+        return extra_kwargs
 
 
 class UserCreateMixin:
@@ -29,14 +59,22 @@ class UserCreateMixin:
         return user
 
     def perform_create(self, validated_data):
+        if settings.SEND_ACTIVATION_EMAIL:
+            validated_data["is_active"] = False
+
+        if hashing.get_pool() is not None:
+            # Hash on the pool before opening the transaction and store the
+            # hash directly, create_user() would hash the password again.
+            password = hashing.make_password(validated_data.pop("password"))
+            with timing.phase("create_user"):
+                return hashing.create_user(User.objects, password, **validated_data)
+
         with transaction.atomic():
             # For custom accounts with  FK,ManyToMany and other relations
             # models, remember to set they null=True
             # the atomic create will not return a especific error
-            user = User.objects.create_user(**validated_data)
-            if settings.SEND_ACTIVATION_EMAIL:
-                user.is_active = False
-                user.save(update_fields=["is_active"])
+            with timing.phase("create_user"):
+                user = User.objects.create_user(**validated_data)
         return user
 
 
@@ -56,7 +94,7 @@ class UserCreateSerializer(UserCreateMixin, serializers.ModelSerializer):
         password = attrs.get("password")
 
         try:
-            validate_password(password, user)
+            hashing.validate_password(password, user)
         except django_exceptions.ValidationError as e:
             serializer_error = serializers.as_serializer_error(e)
             raise serializers.ValidationError(
@@ -100,25 +138,30 @@ class UidTokenActivationSerializer(serializers.Serializer):
     }
 
     def validate(self, attrs):
-        validated_data = super().validate(attrs)
+        uid, token = attrs["uid"], attrs["token"]
+        # Malformed, forged and expired links are rejected before the query,
+        # and the new password of ChangePasswordSerializer is validated
+        # against the user the link is for.
         try:
-            uid = decode_uid(self.initial_data.get("uid", ""))
-            self.user = User.objects.get(pk=uid)
+            pk = decode_pk(uid, User)
+        except (ValueError, TypeError):
+            self.fail_field("uid", "uid_error")
+        if not link_token_generator.check_link(uid, token):
+            self.fail_field("token", "token_error")
+
+        try:
+            with timing.phase("user"):
+                self.user = User.objects.get(pk=pk)
         except (User.DoesNotExist, ValueError, TypeError, OverflowError):
-            key_error = "uid_error"
-            raise ValidationError(
-                {"uid": [self.error_messages[key_error]]}, code=key_error
-            )
-        is_token_valid = default_token_generator.check_token(
-            self.user, self.initial_data.get("token", "")
+            self.fail_field("uid", "uid_error")
+        if not link_token_generator.check_token(self.user, token):
+            self.fail_field("token", "token_error")
+        return super().validate(attrs)
+
+    def fail_field(self, field_name, key_error):
+        raise ValidationError(
+            {field_name: [self.error_messages[key_error]]}, code=key_error
         )
-        if is_token_valid:
-            return validated_data
-        else:
-            key_error = "token_error"
-            raise ValidationError(
-                {"token": [self.error_messages[key_error]]}, code=key_error
-            )
 
 
 class ResendActivationEmailSerializer(serializers.Serializer):
@@ -132,14 +175,15 @@ class ResendActivationEmailSerializer(serializers.Serializer):
     def validate(self, attrs):
         valited_data = super().validate(attrs)
 
-        user = User.objects.filter(email=valited_data.get("email"))
+        with timing.phase("user"):
+            self.user = User.objects.filter(email=valited_data.get("email")).first()
 
-        if not user.exists():
+        if self.user is None:
             raise serializers.ValidationError(
                 {"email": [self.error_messages["wrong_email"]]}
             )
 
-        if user.first().is_active:
+        if self.user.is_active:
             raise ValidationError({"email": [self.error_messages["is_validated"]]})
 
         return valited_data
@@ -153,9 +197,10 @@ class RecoverPasswordSerializer(serializers.Serializer):
     def validate(self, attrs):
         validated_data = super().validate(attrs)
 
-        user = User.objects.filter(email=validated_data.get("email"))
+        with timing.phase("user"):
+            self.user = User.objects.filter(email=validated_data.get("email")).first()
 
-        if not user.exists():
+        if self.user is None:
             raise serializers.ValidationError(
                 {"email": [self.error_messages["wrong_email"]]}
             )
@@ -172,7 +217,7 @@ class PasswordSerializer(serializers.Serializer):
         assert user is not None
 
         try:
-            validate_password(attrs["new_password"], user)
+            hashing.validate_password(attrs["new_password"], user)
         except django_exceptions.ValidationError as e:
             raise serializers.ValidationError({"new_password": list(e.messages)})
 
@@ -206,3 +251,53 @@ class ChangePasswordRetypeSerializer(
     UidTokenActivationSerializer, PasswordRetypeSerializer
 ):
     pass
+
+
+class TokenBatchVerifySerializer(serializers.Serializer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["tokens"] = serializers.ListField(
+            child=serializers.CharField(),
+            allow_empty=False,
+            max_length=settings.VERIFY_BATCH_MAX_SIZE,
+        )
+
+
+class UserBulkSerializer(serializers.Serializer):
+    FILTERS = ("is_active", "date_joined_after", "date_joined_before", "search")
+
+    operation = serializers.ChoiceField(choices=("activate", "deactivate", "delete"))
+    filter = serializers.DictField(
+        child=serializers.CharField(), required=False, allow_empty=False
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["ids"] = serializers.ListField(
+            child=serializers.CharField(),
+            required=False,
+            allow_empty=False,
+            max_length=settings.BULK_MAX_IDS,
+        )
+
+    def validate_ids(self, ids):
+        try:
+            return [User._meta.pk.to_python(pk) for pk in ids]
+        except django_exceptions.ValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+
+    def validate_filter(self, params):
+        unknown = set(params).difference(self.FILTERS)
+        if unknown:
+            message = settings.MESSAGES.errors.UNKNOWN_FIELDS_ERROR
+            raise serializers.ValidationError(
+                message.format(fields=", ".join(sorted(unknown)))
+            )
+        return params
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                settings.MESSAGES.errors.BULK_TARGET_ERROR, code="bulk_target"
+            )
+        return attrs
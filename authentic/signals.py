@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save
+
+from authentic.authentication.cache import invalidate_user
+from authentic.conf import settings
+from authentic.utils.conditional import invalidate_response
+from authentic.utils.pagination import invalidate_counts
+
+
+def connect_signals():
+    post_save.connect(
+        invalidate_user,
+        sender=settings.USER_MODEL,
+        dispatch_uid="authentic_user_cache_save",
+    )
+    post_delete.connect(
+        invalidate_user,
+        sender=settings.USER_MODEL,
+        dispatch_uid="authentic_user_cache_delete",
+    )
+    post_save.connect(
+        invalidate_counts,
+        sender=settings.USER_MODEL,
+        dispatch_uid="authentic_count_cache_save",
+    )
+    post_delete.connect(
+        invalidate_counts,
+        sender=settings.USER_MODEL,
+        dispatch_uid="authentic_count_cache_delete",
+    )
+    post_save.connect(
+        invalidate_response,
+        sender=settings.USER_MODEL,
+        dispatch_uid="authentic_response_cache_save",
+    )
+    post_delete.connect(
+        invalidate_response,
+        sender=settings.USER_MODEL,
+        dispatch_uid="authentic_response_cache_delete",
+    )
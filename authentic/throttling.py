@@ -0,0 +1,148 @@
+import hashlib
+import threading
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.test.signals import setting_changed
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+from authentic.utils.cache import LRUCache, build_cache
+
+_buckets = None
+_buckets_lock = threading.Lock()
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        _buckets = build_cache(
+            settings.THROTTLE_CACHE_BACKEND,
+            prefix="authentic:throttle",
+            max_size=settings.THROTTLE_MAX_SIZE,
+        )
+    return _buckets
+
+
+def parse_rate(rate):
+    if rate is None:
+        return None, None
+    num, period = rate.split("/")
+    return int(num), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+def take_token(key: str, capacity: int, period: int):
+    """
+    Takes one token from the bucket stored under ``key``, refilled at
+    ``capacity / period`` tokens per second. Returns the number of seconds to
+    wait, None when the request is allowed.
+    """
+    buckets = get_buckets()
+    refill = capacity / period
+    # The in-memory backend is updated atomically. With a shared cache the
+    # read and the write are separate, concurrent workers may both take the
+    # last token: the limit is approximate, never much looser.
+    lock = _buckets_lock if isinstance(buckets, LRUCache) else nullcontext()
+    with lock:
+        now = time.time()
+        tokens, updated_at = buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill)
+        if tokens < 1:
+            return (1 - tokens) / refill
+        buckets.set(key, (tokens - 1, now), ttl=period)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def __init__(self):
+        self.num_requests, self.duration = parse_rate(
+            settings.THROTTLE_RATES.get(self.scope)
+        )
+        self.wait_time = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        self.wait_time = take_token(
+            f"{self.scope}:{key}", self.num_requests, self.duration
+        )
+        return self.wait_time is None
+
+    async def aallow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        if isinstance(get_buckets(), LRUCache):
+            return self.allow_request(request, view)
+        return await sync_to_async(self.allow_request)(request, view)
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPThrottle(TokenBucketThrottle):
+    scope = "ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class DataFieldThrottle(TokenBucketThrottle):
+    field_name = None
+
+    def get_field_name(self):
+        return self.field_name
+
+    def get_key(self, request, view):
+        value = request.data.get(self.get_field_name())
+        if not isinstance(value, str) or not value:
+            return None
+        # Client supplied, hashed to get a valid and bounded cache key.
+        return hashlib.sha256(value.strip().lower().encode()).hexdigest()
+
+
+class LoginThrottle(DataFieldThrottle):
+    scope = "login"
+
+    def get_field_name(self):
+        return settings.LOGIN_FIELD
+
+
+class EmailThrottle(DataFieldThrottle):
+    scope = "email"
+    field_name = "email"
+
+
+DEFAULT_THROTTLES = {
+    "login": (IPThrottle, LoginThrottle),
+    "resend_activation": (IPThrottle, EmailThrottle),
+    "recover_password": (IPThrottle, EmailThrottle),
+}
+
+
+def get_throttle_classes(key: str, configured) -> list:
+    """
+    The throttles of the THROTTLES entry ``key`` whose configured value is
+    ``configured``. Unset entries keep DRF's DEFAULT_THROTTLE_CLASSES, so a
+    global throttle still applies, and add the built-in ones of ``key``.
+    """
+    if configured is not None:
+        return configured
+    return [*api_settings.DEFAULT_THROTTLE_CLASSES, *DEFAULT_THROTTLES.get(key, ())]
+
+
+def reset_buckets(*args, **kwargs):
+    global _buckets
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        _buckets = None
+
+
+setting_changed.connect(reset_buckets)
@@ -1,4 +1,5 @@
 from django.urls import include, path
+from authentic.conf import settings
 from . import views
 from rest_framework.routers import DefaultRouter
 
@@ -9,3 +10,13 @@ router.register("contas", views.UserViewSet)
 urlpatterns = [
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = [
+        path("", include("authentic.async_urls")),
+    ]
+
+if settings.METRICS:
+    urlpatterns += [
+        path("metricas/", views.MetricsView.as_view()),
+    ]
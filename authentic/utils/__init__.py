@@ -1,5 +1,7 @@
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.core.exceptions import ValidationError
+from django.db.models import UUIDField
 from uuid import UUID
 
 
@@ -11,13 +13,24 @@ def encode_uid(pk):
         return force_str(urlsafe_base64_encode(force_bytes(pk)))
 
 
-def decode_uid(uid):
+def decode_pk(uid, model):
+    """
+    Decodes ``uid`` into a value of ``model``'s primary key, raising
+    ValueError when it cannot be one, so malformed uids never reach the
+    database.
+    """
+    field = model._meta.pk
+    if field.is_relation:
+        field = field.target_field
     uid_bytes = urlsafe_base64_decode(uid)
     try:
-        uid_uuid = UUID(bytes=uid_bytes)
-        return uid_uuid
-    except ValueError:
-        return force_str(uid_bytes)
+        if isinstance(field, UUIDField):
+            if len(uid_bytes) == 16:
+                return UUID(bytes=uid_bytes)
+            return UUID(force_str(uid_bytes))
+        return field.to_python(force_str(uid_bytes))
+    except (ValidationError, UnicodeDecodeError) as e:
+        raise ValueError(uid) from e
 
 
 def get_allowed_fields(cls, fields: list = []) -> tuple:
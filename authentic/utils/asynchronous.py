@@ -0,0 +1,194 @@
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib import auth
+from django.contrib.auth import aauthenticate, get_backends
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_login_failed
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from authentic.conf import settings
+from authentic.utils import timing
+
+
+def uses_token_blacklist() -> bool:
+    return apps.is_installed("rest_framework_simplejwt.token_blacklist")
+
+
+async def run_serializer(serializer):
+    # Serializers that may touch the database are validated on the sync
+    # thread, pure token/field validation stays on the event loop.
+    if uses_token_blacklist():
+        return await sync_to_async(serializer.is_valid)(raise_exception=True)
+    return serializer.is_valid(raise_exception=True)
+
+
+async def aauthenticate_user(request, **credentials):
+    backends = get_backends()
+    if len(backends) != 1 or type(backends[0]) is not ModelBackend:
+        return await aauthenticate(request, **credentials)
+
+    user = await amodel_backend_authenticate(backends[0], **credentials)
+    if user is None and user_login_failed.has_listeners(auth.__name__):
+        # Sent by authenticate() when every backend rejects the credentials.
+        await sync_to_async(user_login_failed.send)(
+            sender=auth.__name__,
+            credentials=auth._clean_credentials(credentials),
+            request=request,
+        )
+    return user
+
+
+async def amodel_backend_authenticate(backend, **credentials):
+    User = settings.USER_MODEL
+    password = credentials.get("password")
+    username = credentials.get(User.USERNAME_FIELD)
+    if username is None or password is None:
+        return None
+
+    try:
+        with timing.phase("user"):
+            user = await User._default_manager.aget(**{User.USERNAME_FIELD: username})
+    except User.DoesNotExist:
+        # Same cost as an existing account, see ModelBackend.authenticate.
+        with timing.phase("hash"):
+            await sync_to_async(User().set_password, thread_sensitive=False)(password)
+        return None
+
+    with timing.phase("hash"):
+        valid = await user.acheck_password(password)
+    if valid and backend.user_can_authenticate(user):
+        return user
+    return None
+
+
+def json_response(data=None, status_code=status.HTTP_200_OK):
+    if data is None:
+        return HttpResponse(status=status_code)
+    return JsonResponse(data, status=status_code, safe=False, encoder=DjangoJSONEncoder)
+
+
+class AsyncAPIView(View):
+    authentication_classes = ()
+    permission_classes = ()
+    throttle_classes = ()
+    parser_classes = (JSONParser, FormParser, MultiPartParser)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Same as APIView: authentication is token based, not session based.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = Request(request, parsers=[parser() for parser in self.parser_classes])
+        self.request = request
+
+        try:
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or not handler:
+                raise exceptions.MethodNotAllowed(request.method)
+            await self.perform_authentication(request)
+            self.check_permissions(request)
+            await self.check_throttles(request)
+            return await handler(request, *args, **kwargs)
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+    def get_authenticators(self):
+        return [authentication() for authentication in self.authentication_classes]
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    def get_throttles(self):
+        return [throttle() for throttle in self.throttle_classes]
+
+    async def perform_authentication(self, request):
+        self.authenticator = None
+        for authenticator in self.get_authenticators():
+            if hasattr(authenticator, "aauthenticate"):
+                result = await authenticator.aauthenticate(request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(request)
+            if result is not None:
+                self.authenticator = authenticator
+                request.user, request.auth = result
+                return
+        request.user = api_settings.UNAUTHENTICATED_USER()
+        request.auth = None
+
+    def get_authenticate_header(self, request):
+        authenticators = self.get_authenticators()
+        if authenticators:
+            return authenticators[0].authenticate_header(request)
+
+    def permission_denied(self, request, message=None, code=None):
+        if self.authentication_classes and self.authenticator is None:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(detail=message, code=code)
+
+    def check_permissions(self, request):
+        for permission in self.get_permissions():
+            if not permission.has_permission(request, self):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    def check_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(request, self, obj):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def check_throttles(self, request):
+        durations = []
+        for throttle in self.get_throttles():
+            if hasattr(throttle, "aallow_request"):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(request, self)
+            if not allowed:
+                durations.append(throttle.wait())
+        if durations:
+            durations = [duration for duration in durations if duration is not None]
+            raise exceptions.Throttled(max(durations, default=None))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound()
+        if not isinstance(exc, exceptions.APIException):
+            raise exc
+
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {"detail": exc.detail}
+
+        status_code = exc.status_code
+        authenticate_header = None
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            authenticate_header = self.get_authenticate_header(self.request)
+            if not authenticate_header:
+                status_code = status.HTTP_403_FORBIDDEN
+
+        response = json_response(data, status_code)
+        if authenticate_header:
+            response["WWW-Authenticate"] = authenticate_header
+        if getattr(exc, "wait", None):
+            response["Retry-After"] = "%d" % exc.wait
+        return response
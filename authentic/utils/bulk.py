@@ -0,0 +1,75 @@
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+
+from authentic.authentication.cache import invalidate_users
+from authentic.utils.conditional import invalidate_responses
+from authentic.utils.pagination import invalidate_counts
+
+UPDATES = {
+    "activate": {"is_active": True},
+    "deactivate": {"is_active": False},
+}
+
+
+def id_chunks(ids, chunk_size: int):
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start : start + chunk_size]
+
+
+def pk_chunks(queryset, chunk_size: int):
+    """
+    The primary keys of ``queryset`` in ascending chunks. Each chunk is read
+    past the last key of the previous one, an index range scan whatever the
+    number of rows already processed.
+    """
+    queryset = queryset.order_by("pk").values_list("pk", flat=True)
+    last = None
+    while True:
+        chunk = queryset if last is None else queryset.filter(pk__gt=last)
+        pks = list(chunk[:chunk_size])
+        if not pks:
+            return
+        yield pks
+        last = pks[-1]
+
+
+def apply_chunk(queryset, operation: str, pks) -> int:
+    target = queryset.filter(pk__in=pks)
+    model = queryset.model
+    with transaction.atomic(using=queryset.db):
+        # The user cache is keyed by simplejwt's USER_ID_FIELD.
+        user_id_field = api_settings.USER_ID_FIELD
+        if user_id_field in ("pk", model._meta.pk.name):
+            user_ids = pks
+        else:
+            user_ids = list(target.values_list(user_id_field, flat=True))
+        if operation == "delete":
+            affected = target.delete()[1].get(model._meta.label, 0)
+        else:
+            values = UPDATES[operation]
+            affected = target.exclude(**values).update(**values)
+    # update() sends no signals, every cache keyed by these users is
+    # dropped here at once.
+    invalidate_users(user_ids)
+    invalidate_responses(pks)
+    return affected
+
+
+def bulk_users(queryset, operation: str, chunks) -> dict:
+    """
+    Runs ``operation`` ("activate", "deactivate" or "delete") on the users
+    of ``queryset`` whose primary keys are in ``chunks``, one transaction
+    per chunk. Chunks already applied stay applied if a later one fails.
+    """
+    progress = []
+    processed = affected = 0
+    for index, pks in enumerate(chunks):
+        count = apply_chunk(queryset, operation, pks)
+        processed += len(pks)
+        affected += count
+        progress.append({"chunk": index, "processed": processed, "affected": count})
+    if affected:
+        # Cached counts include ?is_active= ones.
+        invalidate_counts(queryset.model)
+    return {"operation": operation, "affected": affected, "chunks": progress}
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+
+class LRUCache:
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCache:
+    def __init__(self, alias: str = "default", prefix: str = "authentic", ttl=300):
+        self.cache = caches[alias]
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, key) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key, default=None):
+        value = self.cache.get(self.make_key(key))
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self.cache.set(self.make_key(key), value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key))
+
+    def delete_many(self, keys):
+        self.cache.delete_many([self.make_key(key) for key in keys])
+
+    def clear(self):
+        # Only our own counters are reset, the shared backend may hold
+        # entries of other applications.
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def build_cache(backend: str = None, prefix: str = "authentic", max_size=1024, ttl=300):
+    if backend:
+        return DjangoCache(backend, prefix=prefix, ttl=ttl)
+    return LRUCache(max_size=max_size, ttl=ttl)
@@ -0,0 +1,137 @@
+import hashlib
+import time
+from uuid import uuid4
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.test.signals import setting_changed
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+from authentic.utils.cache import build_cache
+
+_response_cache = None
+
+
+class RenderedUser:
+    """
+    The JSON body of a user detail response with its validators. Only
+    cached renderings carry a Last-Modified, the time they were rendered:
+    saving or deleting the user drops them.
+    """
+
+    __slots__ = ("body", "etag", "last_modified")
+
+    def __init__(self, body: bytes, last_modified: int = None):
+        self.body = body
+        digest = hashlib.md5(body, usedforsecurity=False).hexdigest()
+        self.etag = f'"{digest}"'
+        self.last_modified = last_modified
+
+    def respond(self, request) -> HttpResponse:
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+        if response is None:
+            response = HttpResponse(self.body, content_type="application/json")
+        response["ETag"] = self.etag
+        if self.last_modified is not None:
+            response["Last-Modified"] = http_date(self.last_modified)
+        # Browsers revalidate every time, shared caches never store it.
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ("Authorization", "Cookie"))
+        return response
+
+    def __getstate__(self):
+        return self.body, self.last_modified
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = build_cache(
+            settings.USER_RESPONSE_CACHE_BACKEND,
+            prefix="authentic:response",
+            # A version and the renderings per user.
+            max_size=settings.USER_RESPONSE_CACHE_MAX_SIZE * 2,
+            ttl=settings.USER_RESPONSE_CACHE_TTL,
+        )
+    return _response_cache
+
+
+def version_key(user_pk) -> str:
+    return f"version:{user_pk}"
+
+
+def bump_version(user_pk) -> str:
+    version = uuid4().hex
+    get_response_cache().set(version_key(user_pk), version)
+    return version
+
+
+def get_version(user_pk) -> str:
+    """
+    The current version of the user's renderings. Read before the user is
+    loaded: a save landing in between bumps it, and the rendering of the
+    loaded user is then neither stored nor served.
+    """
+    version = get_response_cache().get(version_key(user_pk))
+    if version is None:
+        version = bump_version(user_pk)
+    return version
+
+
+def get_cached_response(user_pk, variant: str, version: str):
+    # All renderings of a user live under one key, tagged with the version
+    # they were rendered at.
+    renderings = get_response_cache().get(str(user_pk))
+    if renderings is None or renderings["version"] != version:
+        return None
+    return renderings.get(variant)
+
+
+def cache_response(user_pk, variant: str, body: bytes, version: str) -> RenderedUser:
+    rendered = RenderedUser(body, last_modified=int(time.time()))
+    cache = get_response_cache()
+    if cache.get(version_key(user_pk)) != version:
+        return rendered
+    renderings = cache.get(str(user_pk))
+    if renderings is None or renderings["version"] != version:
+        renderings = {"version": version}
+    cache.set(str(user_pk), {**renderings, variant: rendered})
+    return rendered
+
+
+def invalidate_responses(user_pks):
+    # Built on demand, with a shared backend another process may have cached
+    # the users. The bump is repeated once the transaction commits: a read
+    # in between still loads the old rows and tags them with the new version.
+    if not settings.USER_RESPONSE_CACHE:
+        return
+    user_pks = list(user_pks)
+
+    def bump():
+        for user_pk in user_pks:
+            bump_version(user_pk)
+        get_response_cache().delete_many([str(user_pk) for user_pk in user_pks])
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def invalidate_response(sender, instance, **kwargs):
+    invalidate_responses([instance.pk])
+
+
+def reset_response_cache(*args, **kwargs):
+    global _response_cache
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        _response_cache = None
+
+
+setting_changed.connect(reset_response_cache)
@@ -0,0 +1,173 @@
+import atexit
+import logging
+import queue
+import threading
+
+from django.core.mail import get_connection
+from django.db import close_old_connections
+from django.test.signals import setting_changed
+
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+from authentic.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+class BaseEmailDispatcher:
+    def dispatch(self, email_class, request, context, to):
+        raise NotImplementedError
+
+    def prepare(self, email, to):
+        # Mirrors BaseEmailMessage.send without opening a connection, so a
+        # batch of messages can share one.
+        email.render()
+        email.to = list(to)
+        return email
+
+    def deliver(self, jobs):
+        messages = []
+        for email, to in jobs:
+            try:
+                messages.append(self.prepare(email, to))
+            except Exception:
+                logger.exception("Unable to render %s", type(email).__name__)
+        if not messages:
+            return
+        try:
+            with get_connection() as connection:
+                connection.send_messages(messages)
+        except Exception:
+            logger.exception("Unable to send %d email(s)", len(messages))
+            metrics.inc("authentic_emails_total", len(messages), outcome="failure")
+        else:
+            metrics.inc("authentic_emails_total", len(messages), outcome="success")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SyncEmailDispatcher(BaseEmailDispatcher):
+    def dispatch(self, email_class, request, context, to):
+        email_class(request, context).send(to)
+
+
+class LocmemEmailDispatcher(BaseEmailDispatcher):
+    def __init__(self):
+        self.pending = []
+
+    def dispatch(self, email_class, request, context, to):
+        self.pending.append((email_class(request, context), list(to)))
+
+    def flush(self):
+        jobs, self.pending = self.pending, []
+        self.deliver(jobs)
+
+
+class ThreadedEmailDispatcher(BaseEmailDispatcher):
+    BACKPRESSURE_POLICIES = ("block", "drop", "sync")
+
+    def __init__(self):
+        self.workers = settings.EMAIL_DISPATCH_WORKERS
+        self.batch_size = settings.EMAIL_DISPATCH_BATCH_SIZE
+        self.backpressure = settings.EMAIL_DISPATCH_BACKPRESSURE
+        self.timeout = settings.EMAIL_DISPATCH_TIMEOUT
+        assert self.backpressure in self.BACKPRESSURE_POLICIES
+        self.queue = queue.Queue(maxsize=settings.EMAIL_DISPATCH_QUEUE_SIZE)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def dispatch(self, email_class, request, context, to):
+        self._start()
+        job = (email_class(request, context), list(to))
+        try:
+            if self.backpressure == "block":
+                self.queue.put(job, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(job)
+        except queue.Full:
+            if self.backpressure == "sync":
+                self.deliver([job])
+            else:
+                logger.warning("Email queue is full, dropping message to %s", to)
+
+    def _start(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"authentic-email-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.close)
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                return
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            try:
+                self.deliver(batch)
+            finally:
+                close_old_connections()
+                for _ in range(len(batch) + stop):
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self.queue.put(None)
+        for thread in threads:
+            thread.join(self.timeout)
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = settings.EMAIL.dispatcher()
+    return _dispatcher
+
+
+def send_email(email_class, request, context, to):
+    get_dispatcher().dispatch(email_class, request, context, to)
+
+
+def reset_dispatcher(*args, **kwargs):
+    global _dispatcher
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        dispatcher, _dispatcher = _dispatcher, None
+        if dispatcher is not None:
+            dispatcher.close()
+
+
+setting_changed.connect(reset_dispatcher)
@@ -1,28 +1,50 @@
+from django.core.mail import EmailMultiAlternatives
 from templated_mail.mail import BaseEmailMessage
-from django.contrib.auth.tokens import default_token_generator
 from authentic import utils
 from authentic.conf import settings
+from authentic.utils import metrics, timing
+from authentic.utils.tokens import link_token_generator
 
 
-class ActivationEmail(BaseEmailMessage):
+class TimedDelivery(EmailMultiAlternatives):
+    # Sits below BaseEmailMessage in the MRO, so its send() only covers the
+    # delivery and not the rendering BaseEmailMessage.send() does first.
+    def send(self, *args, **kwargs):
+        with timing.phase("smtp"):
+            try:
+                sent = super().send(*args, **kwargs)
+            except Exception:
+                metrics.inc("authentic_emails_total", outcome="failure")
+                raise
+        metrics.inc("authentic_emails_total", outcome="success")
+        return sent
+
+
+class AuthenticEmailMessage(BaseEmailMessage, TimedDelivery):
+    def render(self):
+        with timing.phase("email_render"):
+            super().render()
+
+
+class ActivationEmail(AuthenticEmailMessage):
     template_name = "email/activation.html"
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         user = context.get("user")
         context["uid"] = utils.encode_uid(user.pk)
-        context["token"] = default_token_generator.make_token(user)
+        context["token"] = link_token_generator.make_token(user)
         context["url"] = settings.EMAIL_ACTIVATION_URL.format(**context)
         return context
 
 
-class RecoverPasswordEmail(BaseEmailMessage):
+class RecoverPasswordEmail(AuthenticEmailMessage):
     template_name = "email/recover_password.html"
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         user = context.get("user")
         context["uid"] = utils.encode_uid(user.pk)
-        context["token"] = default_token_generator.make_token(user)
+        context["token"] = link_token_generator.make_token(user)
         context["url"] = settings.CHANGE_PASSWORD_URL.format(**context)
         return context
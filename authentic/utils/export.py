@@ -0,0 +1,68 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.utils.text import compress_sequence
+
+from authentic.utils.reads import dumps
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class Echo:
+    # csv.writer target returning each line instead of buffering it.
+    def write(self, value):
+        return value
+
+
+def batches(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def ndjson_chunks(columns, rows, size: int):
+    for batch in batches(rows, size):
+        yield b"".join(dumps(row) + b"\n" for row in batch)
+
+
+def csv_chunks(columns, rows, size: int):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns).encode()
+    for batch in batches(rows, size):
+        lines = (writer.writerow([row[name] for name in columns]) for row in batch)
+        yield "".join(lines).encode()
+
+
+FORMATS = {"ndjson": ndjson_chunks, "csv": csv_chunks}
+
+
+def export_chunks(columns, rows, output: str, size: int, compress: bool = False):
+    """
+    ``rows`` (dicts keyed by ``columns``) encoded as ``output``, one bytes
+    chunk per ``size`` rows, gzipped as they are produced when ``compress``.
+    """
+    chunks = FORMATS[output](columns, rows, size)
+    return compress_sequence(chunks) if compress else chunks
+
+
+async def aiterate(chunks):
+    # Every chunk is produced in the thread holding the database cursor.
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+def export_response(chunks, output: str, compress: bool = False):
+    filename = f"users.{output}.gz" if compress else f"users.{output}"
+    response = StreamingHttpResponse(
+        chunks,
+        content_type="application/gzip" if compress else CONTENT_TYPES[output],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
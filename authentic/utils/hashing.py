@@ -0,0 +1,125 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from django.contrib.auth import hashers, password_validation
+from django.db import transaction
+from django.test.signals import setting_changed
+
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+from authentic.errors import ServiceUnavailable
+from authentic.utils import timing
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_process():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+class PasswordPool:
+    def __init__(self, kind: str, size: int = None, queue_depth: int = 0, timeout=None):
+        assert kind in ("thread", "process")
+        self.size = size or os.cpu_count() or 1
+        self.timeout = timeout
+        if kind == "process":
+            self.executor = ProcessPoolExecutor(self.size, initializer=_init_process)
+        else:
+            self.executor = ThreadPoolExecutor(
+                self.size, thread_name_prefix="authentic-password"
+            )
+        self.slots = threading.BoundedSemaphore(self.size + queue_depth)
+
+    def run(self, func, *args):
+        # Never queue indefinitely: once every worker is busy and the queue
+        # is full, the request fails fast instead of pinning the caller.
+        if not self.slots.acquire(blocking=False):
+            raise ServiceUnavailable()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(self.timeout)
+        except FuturesTimeoutError:
+            # Still queued: dropped. Already running: it finishes and frees
+            # its slot, the caller does not wait for it.
+            future.cancel()
+            raise ServiceUnavailable()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_pool():
+    global _pool
+    if _pool is None and settings.PASSWORD_POOL:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordPool(
+                    settings.PASSWORD_POOL,
+                    size=settings.PASSWORD_POOL_SIZE,
+                    queue_depth=settings.PASSWORD_POOL_QUEUE_DEPTH,
+                    timeout=settings.PASSWORD_POOL_TIMEOUT,
+                )
+    return _pool
+
+
+def run(func, *args):
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def make_password(password):
+    with timing.phase("hash"):
+        return run(hashers.make_password, password)
+
+
+def validate_password(password, user=None):
+    with timing.phase("validate_password"):
+        return run(password_validation.validate_password, password, user)
+
+
+def set_password(user, raw_password):
+    if get_pool() is None:
+        with timing.phase("hash"):
+            user.set_password(raw_password)
+        return
+    user.password = make_password(raw_password)
+    # Keeps AbstractBaseUser.save() notifying password validators.
+    user._password = raw_password
+
+
+def create_user(manager, password_hash: str, **fields):
+    """
+    ``manager.create_user(**fields)`` storing ``password_hash``, computed
+    beforehand on the pool, instead of hashing the password again. Custom
+    managers still normalize, default and complete the new user.
+    """
+    with transaction.atomic(using=manager.db):
+        # An unusable password costs no hashing.
+        user = manager.create_user(password=None, **fields)
+        user.password = password_hash
+        user.save(update_fields=["password"])
+    return user
+
+
+def reset_pool(*args, **kwargs):
+    global _pool
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        pool, _pool = _pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+setting_changed.connect(reset_pool)
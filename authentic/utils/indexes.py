@@ -0,0 +1,94 @@
+"""
+Indexes backing the filters, search and ordering of the user list.
+
+Projects whose USER_MODEL does not declare them can create them from one of
+their own migrations:
+
+    from django.db import migrations
+    from authentic.utils.indexes import create_user_indexes, drop_user_indexes
+
+    class Migration(migrations.Migration):
+        dependencies = [("accounts", "0001_initial")]
+        operations = [migrations.RunPython(create_user_indexes, drop_user_indexes)]
+
+Prefix search on PostgreSQL: a plain btree index serves range and LIKE
+'prefix%' predicates only when the column uses the "C" collation. Under a
+linguistic collation such as en_US.UTF-8, the search columns need an index
+built with text_pattern_ops (varchar_pattern_ops), for example
+``Index(fields=["email"], opclasses=["varchar_pattern_ops"], name=...)``, or
+a "C" collation. The indexes created here are plain btree indexes, and the
+check only verifies that one exists.
+"""
+
+from django.conf import settings as django_settings
+from django.db.models import Index
+
+from authentic.conf import settings
+from authentic.filters import DATE_FILTER_FIELD, has_field
+
+
+def user_index_fields(model) -> list:
+    """
+    The concrete fields of ``model`` the user list filters, searches or
+    orders by.
+    """
+    names = dict.fromkeys(
+        (
+            *settings.USER_ORDERING_FIELDS,
+            *settings.USER_SEARCH_FIELDS,
+            DATE_FILTER_FIELD,
+        )
+    )
+    fields = []
+    for name in names:
+        if not has_field(model, name):
+            continue
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        if field.concrete and field not in fields:
+            fields.append(field)
+    return fields
+
+
+def indexed_columns(connection, table: str) -> set:
+    # A composite index serves predicates on its leading column only.
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {
+        constraint["columns"][0]
+        for constraint in constraints.values()
+        if constraint["columns"]
+        and (constraint["index"] or constraint["unique"] or constraint["primary_key"])
+    }
+
+
+def missing_user_indexes(connection, model) -> list:
+    """
+    The fields of ``user_index_fields`` without an index in the database
+    behind ``connection``.
+    """
+    indexed = indexed_columns(connection, model._meta.db_table)
+    return [field for field in user_index_fields(model) if field.column not in indexed]
+
+
+def user_index(model, field) -> Index:
+    index = Index(fields=[field.name])
+    index.set_name_with_model(model)
+    return index
+
+
+def create_user_indexes(apps, schema_editor):
+    model = apps.get_model(django_settings.AUTH_USER_MODEL)
+    for field in missing_user_indexes(schema_editor.connection, model):
+        schema_editor.add_index(model, user_index(model, field))
+
+
+def drop_user_indexes(apps, schema_editor):
+    model = apps.get_model(django_settings.AUTH_USER_MODEL)
+    with schema_editor.connection.cursor() as cursor:
+        constraints = schema_editor.connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    for field in user_index_fields(model):
+        index = user_index(model, field)
+        if index.name in constraints:
+            schema_editor.remove_index(model, index)
@@ -0,0 +1,300 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.test.signals import setting_changed
+
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+
+_registry = None
+_registry_lock = threading.Lock()
+
+HELP = {
+    "authentic_logins_total": "Login attempts on /entrar/ by outcome.",
+    "authentic_refreshes_total": "Refresh attempts on /renovar/ by outcome.",
+    "authentic_verifications_total": "Verifications on /verificar/ by outcome.",
+    "authentic_registrations_total": "Accounts created on /contas/criar/.",
+    "authentic_emails_total": "Emails handed to the mail backend by outcome.",
+    "authentic_authentication_failures_total": (
+        "Tokens rejected by AuthenticJWTAuthentication, by error code."
+    ),
+    "authentic_request_seconds": "Latency of the authentication endpoints.",
+}
+
+
+def metric_key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    pairs = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{pairs}}}"
+
+
+class MemoryValues:
+    def __init__(self):
+        self.values = {}
+
+    def add(self, key: str, amount: float):
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def items(self):
+        return list(self.values.items())
+
+
+class MmapValues:
+    # One file per process, written only by that process: no cross-process
+    # locking, the exporter sums the files of every worker. An entry is the
+    # key length, the key padded to 8 bytes and a double.
+    initial_size = 64 * 1024
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offsets = {}
+        with open(path, "a+b") as f:
+            if f.seek(0, os.SEEK_END) < self.initial_size:
+                f.truncate(self.initial_size)
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used = struct.unpack_from("Q", self.map, 0)[0] or 8
+        for key, offset, _ in self.read(self.map):
+            self.offsets[key] = offset
+
+    @staticmethod
+    def read(buffer):
+        used = struct.unpack_from("Q", buffer, 0)[0] or 8
+        position = 8
+        while position < used:
+            (length,) = struct.unpack_from("I", buffer, position)
+            key = bytes(buffer[position + 4 : position + 4 + length]).decode()
+            position += 4 + length + (-(4 + length) % 8)
+            yield key, position, struct.unpack_from("d", buffer, position)[0]
+            position += 8
+
+    def allocate(self, key: str) -> int:
+        encoded = key.encode()
+        header = 4 + len(encoded)
+        size = header + (-header % 8) + 8
+        if self.used + size > len(self.map):
+            length = max(len(self.map) * 2, self.used + size)
+            self.map.close()
+            self.file.truncate(length)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        struct.pack_into(
+            f"I{len(encoded)}s", self.map, self.used, len(encoded), encoded
+        )
+        offset = self.used + size - 8
+        self.used += size
+        struct.pack_into("Q", self.map, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+    def add(self, key: str, amount: float):
+        offset = self.offsets.get(key)
+        if offset is None:
+            offset = self.allocate(key)
+        (value,) = struct.unpack_from("d", self.map, offset)
+        struct.pack_into("d", self.map, offset, value + amount)
+
+    def items(self):
+        return [(key, value) for key, _, value in self.read(self.map)]
+
+
+class Registry:
+    def __init__(self, directory=None, buckets=()):
+        self.pid = os.getpid()
+        self.directory = Path(directory) if directory else None
+        self.buckets = tuple(sorted(buckets))
+        # Only threads of this process contend for this lock.
+        self._lock = threading.Lock()
+        if self.directory is None:
+            self.values = MemoryValues()
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.values = MmapValues(self.directory / f"metrics-{self.pid}.db")
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = metric_key(name, labels)
+        with self._lock:
+            self.values.add(key, amount)
+
+    def observe(self, name: str, value: float, **labels):
+        index = bisect_left(self.buckets, value)
+        bucket = self.buckets[index] if index < len(self.buckets) else "+Inf"
+        # "le" goes last whatever the other labels are, export relies on it.
+        key = metric_key(f"{name}_bucket", labels)
+        if labels:
+            bucket_key = f'{key[:-1]},le="{bucket}"}}'
+        else:
+            bucket_key = f'{key}{{le="{bucket}"}}'
+        with self._lock:
+            self.values.add(bucket_key, 1)
+            self.values.add(metric_key(f"{name}_sum", labels), value)
+            self.values.add(metric_key(f"{name}_count", labels), 1)
+
+    def collect(self) -> dict:
+        if self.directory is None:
+            with self._lock:
+                return dict(self.values.items())
+        totals = {}
+        for path in sorted(self.directory.glob("metrics-*.db")):
+            with open(path, "rb") as f:
+                buffer = f.read()
+            if len(buffer) < 8:
+                continue
+            for key, _, value in MmapValues.read(buffer):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def export(self) -> str:
+        """
+        Renders the aggregated values in the Prometheus text format.
+        """
+        families = {}
+        for key, value in self.collect().items():
+            name, _, labels = key.partition("{")
+            family = name
+            if name.endswith(("_bucket", "_sum", "_count")):
+                family = name.rsplit("_", 1)[0]
+            series = families.setdefault(family, {})
+            series[name, labels.rstrip("}")] = value
+
+        lines = []
+        for family, series in sorted(families.items()):
+            histogram = any(name == f"{family}_count" for name, _ in series)
+            lines.append(f"# HELP {family} {HELP.get(family, family)}")
+            lines.append(f"# TYPE {family} {'histogram' if histogram else 'counter'}")
+            if histogram:
+                lines += self.histogram_lines(family, series)
+            else:
+                lines += [
+                    f"{name}{{{labels}}} {value:g}" if labels else f"{name} {value:g}"
+                    for (name, labels), value in sorted(series.items())
+                ]
+        return "\n".join(lines) + "\n"
+
+    def histogram_lines(self, family: str, series: dict) -> list:
+        # Observations are stored in their own bucket only, the cumulative
+        # counts are computed here rather than on every observation.
+        buckets = {}
+        for (name, labels), value in series.items():
+            if name.endswith("_bucket"):
+                labels, _, le = labels.rpartition('le="')
+                buckets.setdefault(labels.rstrip(","), {})[le.rstrip('"')] = value
+
+        lines = []
+        for labels in sorted({labels for _, labels in series}):
+            if 'le="' in labels:
+                continue
+            running = 0
+            for bucket in [*map(str, self.buckets), "+Inf"]:
+                running += buckets.get(labels, {}).get(bucket, 0)
+                pairs = ",".join(filter(None, [labels, f'le="{bucket}"']))
+                lines.append(f"{family}_bucket{{{pairs}}} {running:g}")
+            for suffix in ("sum", "count"):
+                value = series.get((f"{family}_{suffix}", labels), 0)
+                name = (
+                    f"{family}_{suffix}{{{labels}}}" if labels else f"{family}_{suffix}"
+                )
+                lines.append(f"{name} {value:g}")
+        return lines
+
+
+def mark_process_dead(pid: int, directory=None):
+    """
+    Folds the file of the exited process ``pid`` into the archive file of
+    ``directory`` (METRICS_DIR by default) and removes it, so restarted
+    workers do not leave one file each behind. Counters keep their totals.
+    Call it from the process manager, e.g. gunicorn's ``child_exit`` hook,
+    and only once the process is gone.
+    """
+    directory = Path(directory or settings.METRICS_DIR)
+    path = directory / f"metrics-{pid}.db"
+    try:
+        with open(path, "rb") as f:
+            buffer = f.read()
+    except FileNotFoundError:
+        return
+    if len(buffer) >= 8:
+        archive = MmapValues(directory / "metrics-archive.db")
+        try:
+            for key, _, value in MmapValues.read(buffer):
+                archive.add(key, value)
+        finally:
+            archive.map.close()
+            archive.file.close()
+    path.unlink()
+
+
+def get_registry():
+    global _registry
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                _registry = Registry(settings.METRICS_DIR, settings.METRICS_BUCKETS)
+    return _registry
+
+
+def inc(name: str, amount: float = 1, **labels):
+    if settings.METRICS:
+        get_registry().inc(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    if settings.METRICS:
+        get_registry().observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    if not settings.METRICS:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_registry().observe(name, time.perf_counter() - start, **labels)
+
+
+@contextmanager
+def track(counter: str, endpoint: str):
+    """
+    Counts the block in ``counter`` with a success or failure outcome, and
+    records its latency for ``endpoint``.
+    """
+    if not settings.METRICS:
+        yield
+        return
+    outcome = "failure"
+    start = time.perf_counter()
+    try:
+        yield
+        outcome = "success"
+    finally:
+        registry = get_registry()
+        registry.inc(counter, outcome=outcome)
+        registry.observe(
+            "authentic_request_seconds",
+            time.perf_counter() - start,
+            endpoint=endpoint,
+        )
+
+
+def error_code(exc) -> str:
+    codes = exc.get_codes()
+    if isinstance(codes, dict):
+        codes = codes.get("code", exc.default_code)
+    return codes if isinstance(codes, str) else exc.default_code
+
+
+def reset_registry(*args, **kwargs):
+    global _registry
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        _registry = None
+
+
+setting_changed.connect(reset_registry)
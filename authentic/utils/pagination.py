@@ -1,7 +1,122 @@
-from authentic.conf import settings
-from rest_framework.pagination import LimitOffsetPagination
+import hashlib
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.test.signals import setting_changed
+from authentic.conf import AUTHENTIC_SETTINGS_NAMESPACE, settings
+from authentic.filters import filtered_fields
+from authentic.utils.cache import build_cache
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+_count_cache = None
+
+
+def get_count_cache():
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = build_cache(
+            settings.PAGINATION_COUNT_CACHE_BACKEND,
+            prefix="authentic:count",
+            max_size=256,
+            ttl=settings.PAGINATION_COUNT_TTL,
+        )
+    return _count_cache
+
+
+def cached_count(queryset) -> int:
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    cache = get_count_cache()
+    generation = cache.get("generation", 0)
+    digest = hashlib.md5(f"{sql}{params}".encode(), usedforsecurity=False)
+    key = f"{generation}:{digest.hexdigest()}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count)
+    return count
+
+
+def estimate_count(queryset):
+    # Table statistics only describe the whole table, filtered querysets
+    # always need a real count.
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def invalidate_counts(sender, created=True, update_fields=None, **kwargs):
+    # Creations and deletions change every count, an update only the
+    # counts filtered on a column it may have changed. Saves limited to
+    # other columns (last_login on every login) keep the cache.
+    if settings.PAGINATION_COUNT == "exact":
+        return
+    if not created and update_fields is not None:
+        if filtered_fields().isdisjoint(update_fields):
+            return
+    cache = get_count_cache()
+    generation = cache.get("generation", 0)
+    cache.set("generation", generation + 1, ttl=settings.PAGINATION_COUNT_TTL * 10)
 
 
 class AuthenticPagination(LimitOffsetPagination):
-    default_limit = settings.PAGE_SIZE if settings.PAGE_SIZE >= 1 else 1
     max_limit = 100
+    count_is_approximate = False
+
+    def __init__(self):
+        self.default_limit = settings.PAGE_SIZE if settings.PAGE_SIZE >= 1 else 1
+
+    def get_count(self, queryset):
+        strategy = settings.PAGINATION_COUNT
+        if strategy == "estimated":
+            count = estimate_count(queryset)
+            if count is not None and count >= settings.PAGINATION_COUNT_ESTIMATE_MIN:
+                self.count_is_approximate = True
+                return count
+        if strategy in ("cached", "estimated"):
+            return cached_count(queryset)
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count_is_approximate:
+            response.data["count_approximate"] = True
+        return response
+
+
+class AuthenticCursorPagination(CursorPagination):
+    # Keyset pagination: every page is a "WHERE column > cursor LIMIT n"
+    # on an indexed column, no OFFSET scan and no COUNT(*).
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def __init__(self):
+        self.page_size = settings.PAGE_SIZE if settings.PAGE_SIZE >= 1 else 1
+        self.ordering = settings.PAGINATION_ORDERING
+
+
+def reset_count_cache(*args, **kwargs):
+    global _count_cache
+    if kwargs.get("setting") == AUTHENTIC_SETTINGS_NAMESPACE:
+        _count_cache = None
+
+
+setting_changed.connect(reset_count_cache)
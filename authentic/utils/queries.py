@@ -0,0 +1,102 @@
+import logging
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from authentic.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        # Transaction control depends on the surrounding atomic blocks (and on
+        # TestCase), only the statements doing actual work are counted.
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(using=None):
+    counter = QueryCounter()
+    aliases = [using] if using else connections
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        yield counter
+
+
+def check_budget(action: str, counter: QueryCounter):
+    budget = settings.QUERY_BUDGETS.get(action)
+    if budget is None or counter.count <= budget:
+        return
+
+    message = "%s ran %d queries, budget is %d:\n%s" % (
+        action,
+        counter.count,
+        budget,
+        "\n".join(counter.statements),
+    )
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_budget(action: str, using=None):
+    with count_queries(using) as counter:
+        yield counter
+    check_budget(action, counter)
+
+
+def get_view_action(request, view_func):
+    """
+    The UserViewSet or async user view action ``view_func`` serves, None for
+    any other view: QUERY_BUDGETS only describe authentic's own endpoints.
+    """
+    from authentic.async_views import AsyncUserView
+    from authentic.views import UserViewSet
+
+    viewset = getattr(view_func, "cls", None)
+    if isinstance(viewset, type) and issubclass(viewset, UserViewSet):
+        return view_func.actions.get(request.method.lower())
+    view_class = getattr(view_func, "view_class", None)
+    if isinstance(view_class, type) and issubclass(view_class, AsyncUserView):
+        # The detail view picks its action per method on dispatch.
+        actions = getattr(view_class, "actions", None)
+        if actions is not None:
+            return actions.get(request.method)
+        return view_class.action
+    return None
+
+
+class QueryBudgetMiddleware:
+    # Counts the queries run while serving a UserViewSet (or async view)
+    # action and checks them against AUTHENTIC["QUERY_BUDGETS"].
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            response = self.get_response(request)
+        action = getattr(request, "query_budget_action", None)
+        if action is not None:
+            check_budget(action, counter)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget_action = get_view_action(request, view_func)
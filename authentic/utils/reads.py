@@ -0,0 +1,121 @@
+import json
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fields whose to_representation() returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.EmailField,
+    serializers.BooleanField,
+    serializers.IntegerField,
+)
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=JSONEncoder().default)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+class JSONBytesResponse(HttpResponse):
+    def __init__(self, data, status=200):
+        super().__init__(dumps(data), status=status, content_type="application/json")
+
+
+class ReadPlan:
+    """
+    Serializes rows of ``.values(*columns)`` the way the serializer owning
+    ``fields`` serializes model instances, without building either.
+    """
+
+    def __init__(self, fields):
+        self.converters = []
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            convert = None
+            if type(field) not in PASSTHROUGH_FIELDS:
+                convert = field.to_representation
+            self.converters.append((name, convert))
+        self.columns = tuple(name for name, _ in self.converters)
+
+    def to_representation(self, row) -> dict:
+        data = {}
+        for name, convert in self.converters:
+            value = row[name]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def to_representation_instance(self, instance) -> dict:
+        return self.to_representation(
+            {name: getattr(instance, name) for name in self.columns}
+        )
+
+    def narrow(self, names):
+        plan = object.__new__(ReadPlan)
+        plan.converters = [item for item in self.converters if item[0] in names]
+        plan.columns = tuple(name for name, _ in plan.converters)
+        return plan
+
+
+@lru_cache(maxsize=None)
+def _read_plan(serializer_class, field_names):
+    fields = serializer_class().fields
+    model = serializer_class.Meta.model
+    for name, field in fields.items():
+        # Only plain model columns, anything computed, nested or related
+        # needs the serializer.
+        if field.source != name or isinstance(
+            field,
+            (
+                serializers.BaseSerializer,
+                serializers.RelatedField,
+                serializers.ManyRelatedField,
+                serializers.SerializerMethodField,
+            ),
+        ):
+            return None
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if model_field.is_relation or not model_field.concrete:
+            return None
+    return ReadPlan(fields)
+
+
+@lru_cache(maxsize=256)
+def _narrow_read_plan(plan, names):
+    return plan.narrow(names)
+
+
+def get_read_plan(serializer_class, field_names: tuple, only: tuple = None):
+    """
+    The ReadPlan of ``serializer_class``, None when it serializes more than
+    model columns. ``field_names`` keys the cache on the settings the
+    serializer fields depend on, ``only`` narrows the plan to those fields.
+    """
+    if not issubclass(serializer_class, serializers.ModelSerializer):
+        return None
+    plan = _read_plan(serializer_class, field_names)
+    if plan is None or only is None:
+        return plan
+    return _narrow_read_plan(plan, only)
+
+
+def values_queryset(queryset, plan):
+    # Cursor pagination reads the ordering columns from the last row.
+    ordering = [name.lstrip("-") for name in queryset.query.order_by]
+    extra = [name for name in ordering if name not in plan.columns]
+    return queryset.values(*plan.columns, *extra)
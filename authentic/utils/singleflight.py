@@ -0,0 +1,89 @@
+import threading
+import time
+
+from django.core.cache import caches
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+class SingleFlight:
+    # Concurrent callers with the same key share one execution of func. The
+    # result is kept for `window` seconds so late arrivals share it too.
+    # With a cache alias, the lock and the result are also shared between
+    # processes.
+    poll_interval = 0.01
+
+    def __init__(self, window: float, alias: str = None, prefix="authentic", timeout=5):
+        self.window = window
+        self.timeout = timeout
+        self.prefix = prefix
+        self.cache = caches[alias] if alias else None
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func):
+        with self._lock:
+            self._expire()
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                return func()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_shared(key, func)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._calls.pop(key, None)
+            raise
+        finally:
+            call.finished_at = time.monotonic()
+            call.done.set()
+        return call.result
+
+    def _expire(self):
+        deadline = time.monotonic() - self.window
+        for key, call in list(self._calls.items()):
+            if call.finished_at is not None and call.finished_at < deadline:
+                del self._calls[key]
+
+    def _run_shared(self, key: str, func):
+        if self.cache is None:
+            return func()
+
+        result_key = f"{self.prefix}:result:{key}"
+        lock_key = f"{self.prefix}:lock:{key}"
+        deadline = time.monotonic() + self.timeout
+        while True:
+            result = self.cache.get(result_key)
+            if result is not None:
+                return result
+            if self.cache.add(lock_key, 1, self.timeout):
+                break
+            if time.monotonic() >= deadline:
+                # The other worker is gone or too slow, do the work here.
+                return func()
+            time.sleep(self.poll_interval)
+
+        try:
+            result = self.cache.get(result_key)
+            if result is not None:
+                return result
+            result = func()
+            self.cache.set(result_key, result, self.window)
+            return result
+        finally:
+            self.cache.delete(lock_key)
@@ -0,0 +1,123 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from authentic.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_timings = ContextVar("authentic_timings", default=None)
+
+
+class Phase:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.timings.append((self.name, time.perf_counter() - self.start))
+
+
+class NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_PHASE = NullPhase()
+
+
+def phase(name: str):
+    # Outside a timed request this is one ContextVar lookup.
+    timings = _timings.get()
+    if timings is None:
+        return NULL_PHASE
+    return Phase(timings, name)
+
+
+def summarize(timings) -> dict:
+    totals = {}
+    for name, duration in timings:
+        totals[name] = totals.get(name, 0) + duration
+    return totals
+
+
+def server_timing(totals: dict) -> str:
+    return ", ".join(
+        f"{name};dur={duration * 1000:.2f}" for name, duration in totals.items()
+    )
+
+
+def log_timings(request, totals: dict):
+    logger.info(
+        "%s %s %s",
+        request.method,
+        request.path,
+        " ".join(
+            f"{name}={duration * 1000:.2f}ms" for name, duration in totals.items()
+        ),
+    )
+
+
+class ServerTimingMiddleware:
+    # Collects the phases timed while serving the request, then adds them
+    # as a Server-Timing header (SERVER_TIMING) and/or passes them to
+    # AUTHENTIC["TIMING"]["hook"].
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled():
+            return self.get_response(request)
+
+        token = _timings.set([])
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = _timings.get()
+            _timings.reset(token)
+        return self.process_timings(request, response, timings, start)
+
+    async def __acall__(self, request):
+        if not self.enabled():
+            return await self.get_response(request)
+
+        token = _timings.set([])
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = _timings.get()
+            _timings.reset(token)
+        return self.process_timings(request, response, timings, start)
+
+    def enabled(self) -> bool:
+        return settings.SERVER_TIMING or settings.TIMING.hook is not None
+
+    def process_timings(self, request, response, timings, start):
+        totals = summarize(timings)
+        totals["total"] = time.perf_counter() - start
+        if settings.TIMING.hook is not None:
+            settings.TIMING.hook(request, totals)
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = server_timing(totals)
+        return response
@@ -1,9 +1,25 @@
-from authentic.conf import settings
+from authentic.conf import ACTION_SETTING_KEYS, settings
 from rest_framework.response import Response
-from rest_framework import status, viewsets
+from rest_framework import status, views, viewsets
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
 from django.utils.timezone import now
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from authentic import utils
+from authentic.filters import filter_users
+from authentic.throttling import get_throttle_classes
+from authentic.utils import conditional, hashing, metrics
+from authentic.utils.bulk import bulk_users, id_chunks, pk_chunks
+from authentic.utils.export import FORMATS, export_chunks, export_response
+from authentic.serializers import UserSerializer, get_user_fields
+from authentic.utils.dispatch import send_email
+from authentic.utils.reads import (
+    JSONBytesResponse,
+    dumps,
+    get_read_plan,
+    values_queryset,
+)
 from typing import Any
 
 
@@ -11,30 +27,83 @@ User = settings.USER_MODEL
 
 
 class UserViewSet(viewsets.ModelViewSet):
-    pagination_class = settings.PAGINATION.limitoffset
     serializer_class = settings.SERIALIZERS.user
     permission_classes = settings.PERMISSIONS.user
     authentication_classes = settings.AUTHENTICATION.authentic
+    filter_backends = settings.FILTERS.user
     queryset = User.objects.all()
+    # Version of the requested user's cached renderings, read before the
+    # user is loaded, see get_cached_response.
+    response_version = None
+
+    @property
+    def pagination_class(self):
+        return getattr(settings.PAGINATION, settings.PAGINATION_STYLE)
 
     def get_queryset(self) -> Any:
         queryset = super().get_queryset()
         if self.action == "list":
-            return self.paginate_queryset(self.queryset)
+            queryset = queryset.order_by(settings.PAGINATION_ORDERING)
+        fields = self.get_requested_fields()
+        if fields is not None:
+            # Pagination reads the ordering column of the last row.
+            ordering = settings.PAGINATION_ORDERING.lstrip("-")
+            queryset = queryset.only(*fields, ordering)
         return queryset
 
+    def get_requested_fields(self):
+        """
+        The allowed fields named by ``?fields=`` on list, retrieve and
+        export, in their usual order, or None to serialize all of them.
+        """
+        if self.action not in ("list", "retrieve", "export"):
+            return None
+        if not issubclass(self.get_serializer_class(), UserSerializer):
+            return None
+        value = self.request.query_params.get("fields")
+        if not value:
+            return None
+
+        requested = {name.strip() for name in value.split(",")} - {""}
+        allowed = get_user_fields()
+        unknown = requested.difference(allowed)
+        if unknown:
+            message = settings.MESSAGES.errors.UNKNOWN_FIELDS_ERROR
+            raise ValidationError(
+                {"fields": [message.format(fields=", ".join(sorted(unknown)))]}
+            )
+        return tuple(name for name in allowed if name in requested)
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def initialize_request(self, request, *args, **kwargs):
+        request = super().initialize_request(request, *args, **kwargs)
+        # The action is only known once the request is initialized.
+        request.authenticators = self.get_authenticators()
+        return request
+
+    def get_authenticators(self):
+        authentication_classes = settings.ACTION_AUTHENTICATION.get(
+            getattr(self, "action", None), self.authentication_classes
+        )
+        return [auth() for auth in authentication_classes]
+
     def get_permissions(self):
-        if self.action == "register":
-            self.permission_classes = settings.PERMISSIONS.registration
-        if self.action == "activation":
-            self.permission_classes = settings.PERMISSIONS.activation
-        if self.action == "resend_activation":
-            self.permission_classes = settings.PERMISSIONS.resend_activation
-        if self.action == "recover_password":
-            self.permission_classes = settings.PERMISSIONS.recover_password
-        if self.action == "change_password":
-            self.permission_classes = settings.PERMISSIONS.change_password
-        return super().get_permissions()
+        permission_classes = settings.ACTION_PERMISSIONS.get(
+            self.action, self.permission_classes
+        )
+        return [permission() for permission in permission_classes]
+
+    def get_throttles(self):
+        throttle_classes = get_throttle_classes(
+            ACTION_SETTING_KEYS.get(self.action, self.action),
+            settings.ACTION_THROTTLES.get(self.action),
+        )
+        return [throttle() for throttle in throttle_classes]
 
     def get_http_methods_name(self):
         if self.action == "list":
@@ -42,38 +111,93 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def get_serializer_class(self):
         self.get_http_methods_name()
-        if self.action == "list":
-            return settings.SERIALIZERS.user
-        if self.action == "register":
-            if settings.USER_CREATE_PASSWORD_RETYPE:
-                return settings.SERIALIZERS.registration_retype
-            return settings.SERIALIZERS.registration
-        if self.action == "activation":
-            return settings.SERIALIZERS.activation
-        if self.action == "resend_activation":
-            return settings.SERIALIZERS.resend_activation
-        if self.action == "recover_password":
-            return settings.SERIALIZERS.recover_password
-        if self.action == "change_password":
-            if settings.CHANGE_PASSWORD_RETYPE:
-                return settings.SERIALIZERS.change_password_retype
-            return settings.SERIALIZERS.change_password
-        return self.serializer_class
+        return settings.ACTION_SERIALIZERS.get(self.action, self.serializer_class)
+
+    def get_read_plan(self):
+        if not settings.FAST_READS or self.request.accepted_renderer.format != "json":
+            return None
+        return get_read_plan(
+            self.get_serializer_class(),
+            get_user_fields(),
+            only=self.get_requested_fields(),
+        )
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(values_queryset(queryset, plan))
+        data = [plan.to_representation(row) for row in page]
+        return JSONBytesResponse(self.get_paginated_response(data).data)
+
+    def get_response_variant(self) -> str:
+        # Cached renderings are per requester role as well as per fieldset:
+        # a serializer may render the own account differently, and what
+        # staff see is never served to anyone else.
+        user = self.request.user
+        if str(user.pk) == str(self.kwargs["pk"]):
+            role = "self"
+        else:
+            role = "staff" if user.is_staff else "other"
+        return f"{role}:{','.join(self.get_requested_fields() or ())}"
+
+    def get_cached_response(self):
+        """
+        The cached rendering of the requested user, None when
+        USER_RESPONSE_CACHE is off or it is not cached. Object permissions
+        are checked against an unsaved instance carrying only the primary
+        key, enough for CurrentUserOrAdmin. Only renderings of the current
+        version of the user are served.
+        """
+        if not settings.USER_RESPONSE_CACHE:
+            return None
+        try:
+            pk = User._meta.pk.to_python(self.kwargs["pk"])
+        except DjangoValidationError:
+            return None
+        self.response_version = conditional.get_version(pk)
+        rendered = conditional.get_cached_response(
+            pk, self.get_response_variant(), self.response_version
+        )
+        if rendered is not None:
+            self.check_object_permissions(self.request, User(pk=pk))
+        return rendered
+
+    def render_user(self, user, plan=None):
+        if plan is not None:
+            data = plan.to_representation_instance(user)
+        else:
+            data = self.get_serializer(user).data
+        body = dumps(data)
+        if self.response_version is not None:
+            return conditional.cache_response(
+                user.pk, self.get_response_variant(), body, self.response_version
+            )
+        return conditional.RenderedUser(body)
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return super().retrieve(request, *args, **kwargs)
+        rendered = self.get_cached_response()
+        if rendered is None:
+            rendered = self.render_user(self.get_object(), self.get_read_plan())
+        return rendered.respond(request)
 
     @action(["post"], detail=False, url_path="criar")
     def register(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save(*args, **kwargs)
-        user.is_active = False
-        user.save()
+        user = serializer.save(*args, is_active=False, **kwargs)
+        metrics.inc("authentic_registrations_total")
 
         context = {
             "user": user,
         }
         to = [utils.get_user_email(user)]
         if settings.EMAIL_ACTIVATION:
-            settings.EMAIL.activation(self.request, context).send(to)
+            send_email(settings.EMAIL.activation, self.request, context, to)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(["post"], detail=False, url_path="ativacao")
@@ -89,30 +213,113 @@ class UserViewSet(viewsets.ModelViewSet):
     def resend_activation(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = User.objects.get(email=serializer.data["email"])
+        user = serializer.user
         context = {"user": user}
         to = [utils.get_user_email(user)]
         if settings.EMAIL_ACTIVATION:
-            settings.EMAIL.activation(self.request, context).send(to)
+            send_email(settings.EMAIL.activation, self.request, context, to)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(["post"], detail=False, url_path="recuperar/senha")
     def recover_password(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = User.objects.get(email=serializer.data["email"])
+        user = serializer.user
         context = {"user": user}
         to = [utils.get_user_email(user)]
         if settings.EMAIL_RECOVER_PASSWORD:
-            settings.EMAIL.recover_password(self.request, context).send(to)
+            send_email(settings.EMAIL.recover_password, self.request, context, to)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(["post"], detail=False, url_path="recuperar/senha/trocar")
     def change_password(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.user.set_password(serializer.data["new_password"])
+        hashing.set_password(serializer.user, serializer.data["new_password"])
         if hasattr(serializer.user, "last_login"):
             serializer.user.last_login = now()
         serializer.user.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(["post"], detail=False, url_path="lote")
+    def bulk(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(self.run_bulk(serializer.validated_data))
+
+    def run_bulk(self, data) -> dict:
+        """
+        Activates, deactivates or deletes the users named by ``ids`` or
+        matched by ``filter`` (the user list filters) as chunked set-based
+        queries, see ``authentic.utils.bulk``.
+        """
+        # Admins never lock themselves out.
+        queryset = User.objects.exclude(pk=self.request.user.pk)
+        chunk_size = settings.BULK_CHUNK_SIZE
+        if "ids" in data:
+            chunks = id_chunks(data["ids"], chunk_size)
+        else:
+            try:
+                queryset = filter_users(queryset, data["filter"])
+            except ValidationError as exc:
+                raise ValidationError({"filter": exc.detail})
+            chunks = pk_chunks(queryset, chunk_size)
+        return bulk_users(queryset, data["operation"], chunks)
+
+    @action(["get"], detail=False, url_path="exportar")
+    def export(self, request, *args, **kwargs):
+        output, compress = self.get_export_format()
+        chunks = self.get_export_chunks(output, compress)
+        return export_response(chunks, output, compress)
+
+    def get_export_format(self):
+        params = self.request.query_params
+        output = params.get("output", "ndjson")
+        compress = params.get("compress") or None
+        for param, valid in (
+            ("output", output in FORMATS),
+            ("compress", compress in (None, "gzip")),
+        ):
+            if not valid:
+                message = settings.MESSAGES.errors.INVALID_FILTER_ERROR
+                raise ValidationError({param: [message.format(param=param)]})
+        return output, compress == "gzip"
+
+    def get_export_chunks(self, output: str, compress: bool):
+        """
+        Every user matching the list filters, with the allowed fields or
+        ``?fields=``, read through a server-side cursor in chunks of
+        EXPORT_CHUNK_SIZE rows: no COUNT(*), no OFFSET and memory bounded by
+        one chunk whatever the size of the table.
+        """
+        queryset = filter_users(User.objects.order_by("pk"), self.request.query_params)
+        size = settings.EXPORT_CHUNK_SIZE
+        fields = self.get_requested_fields()
+        plan = get_read_plan(
+            self.get_serializer_class(), get_user_fields(), only=fields
+        )
+        if plan is not None:
+            values = queryset.values(*plan.columns).iterator(chunk_size=size)
+            rows = (plan.to_representation(row) for row in values)
+            return export_chunks(plan.columns, rows, output, size, compress)
+
+        # The columns are the fields the serializer outputs, whichever
+        # serializer ACTION_SERIALIZERS maps the export to.
+        serializer = self.get_serializer()
+        columns = [
+            name for name, field in serializer.fields.items() if not field.write_only
+        ]
+        users = queryset.iterator(chunk_size=size)
+        rows = (serializer.to_representation(user) for user in users)
+        return export_chunks(columns, rows, output, size, compress)
+
+
+class MetricsView(views.APIView):
+    permission_classes = settings.PERMISSIONS.metrics
+    authentication_classes = settings.AUTHENTICATION.authentic
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metrics.get_registry().export(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -0,0 +1,42 @@
+import os
+import time
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testproject.settings")
+
+    import django
+
+    django.setup()
+
+    from django.test.utils import setup_databases, setup_test_environment
+
+    setup_test_environment()
+    return setup_databases(verbosity=0, interactive=False)
+
+
+def throughput(func, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+def report(title: str, rows: list):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name.ljust(width)}  {value:>12,.0f} ops/s")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def grow_table(User, size: int):
+    start = User.objects.count()
+    User.objects.bulk_create(
+        (User(username=f"user{start + index}") for index in range(size - start)),
+        batch_size=5000,
+    )
@@ -0,0 +1,79 @@
+"""
+Concurrent logins against the sync and the async view stacks, both served
+through Django's ASGI handler.
+
+The MD5 hasher is used by default so the numbers reflect the cost of the
+stack (thread hops, ORM calls) rather than PBKDF2; pass --real-hasher to
+keep the project hashers.
+
+    python -m benchmarks.bench_async [requests] [concurrency] [--real-hasher]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks import percentile, setup
+
+STACKS = (("sync", "testproject.urls"), ("async", "testproject.async_urls"))
+
+
+async def login(client, semaphore, latencies):
+    async with semaphore:
+        start = time.perf_counter()
+        response = await client.post(
+            "/entrar/", data={"username": "bench", "password": "s3cure!Passw0rd"}
+        )
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+
+
+async def run(requests: int, concurrency: int) -> dict:
+    from django.test import AsyncClient
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(login(AsyncClient(), semaphore, latencies) for _ in range(requests))
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def main(requests: int = 500, concurrency: int = 50, real_hasher: bool = False):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+
+    overrides = {}
+    if not real_hasher:
+        overrides["PASSWORD_HASHERS"] = [
+            "django.contrib.auth.hashers.MD5PasswordHasher"
+        ]
+
+    with override_settings(**overrides):
+        get_user_model().objects.create_user(
+            username="bench", password="s3cure!Passw0rd"
+        )
+        print(f"login: {requests} requests, {concurrency} concurrent clients")
+        for name, urlconf in STACKS:
+            with override_settings(ROOT_URLCONF=urlconf):
+                result = asyncio.run(run(requests, concurrency))
+            print(
+                f"  {name:<6} {result['rps']:>8.1f} req/s"
+                f"  p50={result['p50']:.1f}ms p95={result['p95']:.1f}ms"
+                f" p99={result['p99']:.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    main(*map(int, args), real_hasher="--real-hasher" in sys.argv)
@@ -0,0 +1,55 @@
+"""
+Compares AuthenticJWTAuthentication.authenticate throughput with and
+without the validated-token and user caches.
+
+    python -m benchmarks.bench_authenticate [iterations]
+"""
+
+import sys
+
+from benchmarks import report, setup, throughput
+
+
+def main(number: int = 5000):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from authentic.authentication.authenticator import AuthenticJWTAuthentication
+
+    user = get_user_model().objects.create_user(username="bench", password="bench")
+    token = str(AccessToken.for_user(user))
+
+    factory = RequestFactory()
+    valid = factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    stale = factory.get("/")
+    stale.COOKIES["access"] = token[:-4] + "AAAA"
+
+    rows = []
+    for name, overrides in (
+        ("uncached", {}),
+        ("token cache", {"TOKEN_CACHE": True}),
+        ("token + user cache", {"TOKEN_CACHE": True, "USER_CACHE": True}),
+    ):
+        with override_settings(AUTHENTIC=overrides):
+            authenticator = AuthenticJWTAuthentication()
+            rows.append(
+                (
+                    f"{name} (valid)",
+                    throughput(lambda: authenticator.authenticate(valid), number),
+                )
+            )
+            rows.append(
+                (
+                    f"{name} (stale cookie)",
+                    throughput(lambda: authenticator.authenticate(stale), number),
+                )
+            )
+
+    report("authenticate()", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
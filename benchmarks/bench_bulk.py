@@ -0,0 +1,73 @@
+"""
+Updating and deleting users one request at a time (PATCH and DELETE
+/contas/<pk>/: a read, the object permission check and a save() or delete()
+per user, timed on a sample and projected) against deactivating and deleting
+the whole table with POST /contas/lote/.
+
+    python -m benchmarks.bench_bulk [users] [sample]
+"""
+
+import sys
+import time
+
+from benchmarks import grow_table, setup
+
+
+def main(users: int = 100000, sample: int = 1000):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    User = get_user_model()
+    admin = User.objects.create_user(username="bench", is_staff=True)
+    grow_table(User, users + 1)
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(admin)}"}
+    client = Client()
+
+    def per_row(method, pks, **kwargs):
+        start = time.perf_counter()
+        for pk in pks:
+            response = method(f"/contas/{pk}/", **kwargs, **headers)
+            assert response.status_code in (200, 204), response.status_code
+        return sample / (time.perf_counter() - start)
+
+    def bulk(operation):
+        start = time.perf_counter()
+        response = client.post(
+            "/contas/lote/",
+            data={"operation": operation, "filter": {"search": "user"}},
+            content_type="application/json",
+            **headers,
+        )
+        assert response.status_code == 200, response.content
+        elapsed = time.perf_counter() - start
+        return response.json()["affected"] / elapsed, elapsed
+
+    rows = []
+    pks = list(User.objects.exclude(pk=admin.pk).values_list("pk", flat=True))
+    rate = per_row(
+        client.patch,
+        pks[:sample],
+        data={"is_active": False},
+        content_type="application/json",
+    )
+    rows.append(("PATCH per row", rate, users / rate))
+    User.objects.update(is_active=True)
+    rate, elapsed = bulk("deactivate")
+    rows.append(("deactivate bulk", rate, elapsed))
+
+    rate = per_row(client.delete, pks[:sample])
+    rows.append(("DELETE per row", rate, users / rate))
+    rate, elapsed = bulk("delete")
+    rows.append(("delete bulk", rate, elapsed))
+
+    print(f"{users:,} users, per row timed on {sample:,}")
+    print(f"  {'path':<20} {'users/s':>10} {'seconds':>9}")
+    for name, rate, seconds in rows:
+        print(f"  {name:<20} {rate:>10,.0f} {seconds:>9,.1f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,48 @@
+"""
+GET /contas/exportar/ as NDJSON, CSV and gzipped NDJSON: rows per second
+and peak memory allocated while streaming, which stays flat as the table
+grows.
+
+    python -m benchmarks.bench_export [users...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks import grow_table, setup
+
+
+def main(*sizes: int):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    User = get_user_model()
+    admin = User.objects.create_user(username="bench", is_staff=True)
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(admin)}"}
+    client = Client()
+
+    print(f"  {'users':>8} {'format':<12} {'rows/s':>10} {'peak KiB':>9}")
+    for size in sizes or (10000, 100000):
+        grow_table(User, size)
+        for name, query in (
+            ("ndjson", "output=ndjson"),
+            ("csv", "output=csv"),
+            ("ndjson.gz", "output=ndjson&compress=gzip"),
+        ):
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = client.get(f"/contas/exportar/?{query}", **headers)
+            for _ in response.streaming_content:
+                pass
+            rows = size / (time.perf_counter() - start)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {size:>8,} {name:<12} {rows:>10,.0f} {peak / 1024:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
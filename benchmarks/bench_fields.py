@@ -0,0 +1,57 @@
+"""
+Payload size and latency of GET /contas/?limit=100 with every allowed field
+and with ?fields=id,username, through the serializer and through the
+values() fast path.
+
+testproject uses django.contrib.auth's User, so rows are made wide by
+filling its text columns to their maximum length. A custom USER_MODEL with
+more columns widens the gap further.
+
+    python -m benchmarks.bench_fields [requests]
+"""
+
+import sys
+import time
+
+from benchmarks import setup
+
+PAGE = 100
+
+
+def main(requests: int = 200):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    User = get_user_model()
+    user = User.objects.create_user(username="bench", is_staff=True)
+    User.objects.bulk_create(
+        User(
+            username=f"wide{index}".ljust(150, "u"),
+            email=f"wide{index}@{'e' * 230}.com",
+            first_name="f" * 150,
+            last_name="l" * 150,
+        )
+        for index in range(1000)
+    )
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    client = Client()
+
+    print(f"  {'path':<12} {'fields':<12} {'bytes/page':>11} {'ms/request':>11}")
+    for name, fast in (("serializer", False), ("values", True)):
+        for fields in ("", "id,username"):
+            url = f"/contas/?limit={PAGE}&fields={fields}"
+            with override_settings(AUTHENTIC={"FAST_READS": fast}):
+                size = len(client.get(url, **headers).content)
+                start = time.perf_counter()
+                for _ in range(requests):
+                    response = client.get(url, **headers)
+                    assert response.status_code == 200, response.content
+                elapsed = (time.perf_counter() - start) / requests * 1000
+            print(f"  {name:<12} {fields or 'all':<12} {size:>11,} {elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
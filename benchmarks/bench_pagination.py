@@ -0,0 +1,57 @@
+"""
+User list latency against table size for each count strategy, plus the
+cursor pagination for reference.
+
+On SQLite the "estimated" strategy falls back to the cached count, run it
+against PostgreSQL or MySQL to see the statistics based estimate.
+
+    python -m benchmarks.bench_pagination [requests] [sizes...]
+"""
+
+import sys
+import time
+
+from benchmarks import grow_table, setup
+
+STRATEGIES = (
+    ("exact", {"PAGINATION_COUNT": "exact"}),
+    ("cached", {"PAGINATION_COUNT": "cached"}),
+    ("estimated", {"PAGINATION_COUNT": "estimated"}),
+    ("cursor", {"PAGINATION_STYLE": "cursor"}),
+)
+
+
+def latency(client, url, headers, requests: int) -> float:
+    client.get(url, **headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, **headers)
+        assert response.status_code == 200, response.status_code
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main(requests: int = 50, *sizes: int):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    User = get_user_model()
+    user = User.objects.create_user(username="bench")
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    client = Client()
+
+    print("GET /contas/ mean latency (ms)")
+    print("  " + "rows".rjust(9) + "".join(name.rjust(12) for name, _ in STRATEGIES))
+    for size in sizes or (1_000, 10_000, 100_000):
+        grow_table(User, size)
+        row = []
+        for _, overrides in STRATEGIES:
+            with override_settings(AUTHENTIC=overrides):
+                row.append(latency(client, "/contas/", headers, requests))
+        print(f"  {size:>9,}" + "".join(f"{value:>12.2f}" for value in row))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""
+GET /contas/?limit=100 through the serializer and through the values()
+fast path (FAST_READS): rows serialized per second and peak memory
+allocated per page, plus GET /contas/<pk>/ requests per second.
+
+    python -m benchmarks.bench_reads [requests]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks import grow_table, setup
+
+PAGE = 100
+
+
+def main(requests: int = 200):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from authentic.utils import reads
+
+    User = get_user_model()
+    user = User.objects.create_user(username="bench", is_staff=True)
+    grow_table(User, 1000)
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    client = Client()
+
+    def get(url):
+        response = client.get(url, **headers)
+        assert response.status_code == 200, response.status_code
+
+    print(f"orjson {'installed' if reads.orjson else 'not installed'}")
+    print(f"  {'path':<12} {'rows/s':>10} {'KiB/page':>9} {'detail req/s':>13}")
+    for name, fast in (("serializer", False), ("values", True)):
+        with override_settings(AUTHENTIC={"FAST_READS": fast}):
+            get(f"/contas/?limit={PAGE}")
+            start = time.perf_counter()
+            for _ in range(requests):
+                get(f"/contas/?limit={PAGE}")
+            rows = requests * PAGE / (time.perf_counter() - start)
+
+            tracemalloc.start()
+            get(f"/contas/?limit={PAGE}")
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            for _ in range(requests):
+                get(f"/contas/{user.pk}/")
+            detail = requests / (time.perf_counter() - start)
+
+        print(f"  {name:<12} {rows:>10,.0f} {peak / 1024:>9,.0f} {detail:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
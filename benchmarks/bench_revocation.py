@@ -0,0 +1,83 @@
+"""
+Cost of the revocation check on every authenticated request, with a large
+number of revoked tokens in the database store. Also reports the raw
+RevocationList.is_revoked() rate and the time to load the Bloom filter.
+
+    python -m benchmarks.bench_revocation [revoked] [iterations]
+"""
+
+import sys
+import time
+import uuid
+
+from benchmarks import report, setup, throughput
+
+DATABASE_STORE = "authentic.authentication.revocation.DatabaseRevocationStore"
+
+
+def main(revoked: int = 1000000, number: int = 5000):
+    setup()
+
+    from datetime import timedelta
+
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory, override_settings
+    from django.utils.timezone import now
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from authentic.authentication.authenticator import AuthenticJWTAuthentication
+    from authentic.authentication.revocation import get_revocations
+    from authentic.models import RevokedToken
+
+    expires_at = now() + timedelta(days=1)
+    for start in range(0, revoked, 10000):
+        RevokedToken.objects.bulk_create(
+            RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at)
+            for _ in range(min(10000, revoked - start))
+        )
+
+    user = get_user_model().objects.create_user(username="bench", password="bench")
+    token = AccessToken.for_user(user)
+    request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    rows = []
+    for name, overrides in (
+        ("no revocation", {"TOKEN_CACHE": True, "USER_CACHE": True}),
+        (
+            f"{revoked:,} revoked",
+            {
+                "TOKEN_CACHE": True,
+                "USER_CACHE": True,
+                "TOKEN_REVOCATION": True,
+                "TOKEN_REVOCATION_SYNC_INTERVAL": 3600,
+                "REVOCATION": {"store": DATABASE_STORE},
+            },
+        ),
+    ):
+        with override_settings(AUTHENTIC=overrides):
+            if "TOKEN_REVOCATION" in overrides:
+                start = time.perf_counter()
+                revocations = get_revocations()
+                revocations.sync()
+                print(f"Bloom filter loaded in {time.perf_counter() - start:.2f}s")
+                rows.append(
+                    (
+                        "is_revoked()",
+                        throughput(
+                            lambda: revocations.is_revoked(token["jti"]), number
+                        ),
+                    )
+                )
+            authenticator = AuthenticJWTAuthentication()
+            rows.append(
+                (
+                    f"authenticate(), {name}",
+                    throughput(lambda: authenticator.authenticate(request), number),
+                )
+            )
+
+    report("Revocation check", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
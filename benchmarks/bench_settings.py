@@ -0,0 +1,131 @@
+"""
+Per-request settings overhead of UserViewSet: the compiled snapshot with
+per-action dispatch tables against the previous ObjDict lookups and
+``if self.action == ...`` chains, reproduced below for comparison.
+
+    python -m benchmarks.bench_settings [iterations]
+"""
+
+import sys
+from types import SimpleNamespace
+
+from benchmarks import report, setup, throughput
+
+ACTIONS = (
+    "list",
+    "retrieve",
+    "register",
+    "activation",
+    "resend_activation",
+    "recover_password",
+    "change_password",
+)
+
+
+def legacy_objdict():
+    from django.utils.module_loading import import_string
+
+    class ObjDict(dict):
+        def __getattribute__(self, item):
+            try:
+                val = self[item]
+                if isinstance(val, str):
+                    val = import_string(val)
+                elif isinstance(val, (list, tuple)):
+                    val = [import_string(v) if isinstance(v, str) else v for v in val]
+                self[item] = val
+            except KeyError:
+                val = super().__getattribute__(item)
+            return val
+
+    return ObjDict
+
+
+def legacy_dispatch(settings, action):
+    SERIALIZERS = settings.SERIALIZERS
+    PERMISSIONS = settings.PERMISSIONS
+    permission_classes = PERMISSIONS.user
+    if action == "register":
+        permission_classes = PERMISSIONS.registration
+    if action == "activation":
+        permission_classes = PERMISSIONS.activation
+    if action == "resend_activation":
+        permission_classes = PERMISSIONS.resend_activation
+    if action == "recover_password":
+        permission_classes = PERMISSIONS.recover_password
+    if action == "change_password":
+        permission_classes = PERMISSIONS.change_password
+
+    if action == "list":
+        serializer_class = SERIALIZERS.user
+    elif action == "register":
+        if settings.USER_CREATE_PASSWORD_RETYPE:
+            serializer_class = SERIALIZERS.registration_retype
+        else:
+            serializer_class = SERIALIZERS.registration
+    elif action == "activation":
+        serializer_class = SERIALIZERS.activation
+    elif action == "resend_activation":
+        serializer_class = SERIALIZERS.resend_activation
+    elif action == "recover_password":
+        serializer_class = SERIALIZERS.recover_password
+    elif action == "change_password":
+        if settings.CHANGE_PASSWORD_RETYPE:
+            serializer_class = SERIALIZERS.change_password_retype
+        else:
+            serializer_class = SERIALIZERS.change_password
+    else:
+        serializer_class = SERIALIZERS.user
+    return permission_classes, serializer_class
+
+
+def compiled_dispatch(settings, view, action):
+    # Same lookups as UserViewSet.get_permissions/get_serializer_class.
+    return (
+        settings.ACTION_PERMISSIONS.get(action, view.permission_classes),
+        settings.ACTION_SERIALIZERS.get(action, view.serializer_class),
+    )
+
+
+def main(number: int = 100_000):
+    setup()
+
+    from django.utils.functional import SimpleLazyObject
+
+    from authentic.conf import default_settings, settings
+    from authentic.views import UserViewSet
+
+    ObjDict = legacy_objdict()
+    legacy = SimpleLazyObject(
+        lambda: SimpleNamespace(
+            SERIALIZERS=ObjDict(default_settings["SERIALIZERS"]),
+            PERMISSIONS=ObjDict(default_settings["PERMISSIONS"]),
+            USER_CREATE_PASSWORD_RETYPE=settings.USER_CREATE_PASSWORD_RETYPE,
+            CHANGE_PASSWORD_RETYPE=settings.CHANGE_PASSWORD_RETYPE,
+        )
+    )
+
+    rows = []
+    for action in ACTIONS:
+        rows.append(
+            (
+                f"{action} (before)",
+                throughput(
+                    lambda: legacy_dispatch(legacy, action),
+                    number,
+                ),
+            )
+        )
+        rows.append(
+            (
+                f"{action} (compiled)",
+                throughput(
+                    lambda: compiled_dispatch(settings, UserViewSet, action), number
+                ),
+            )
+        )
+    report("serializer + permission selection per request", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
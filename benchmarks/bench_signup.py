@@ -0,0 +1,82 @@
+"""
+Signup throughput against the number of password pool workers.
+
+Each round fires concurrent POST /contas/criar/ requests from a thread per
+simulated WSGI worker, with hashing and validation running inline and on
+thread/process pools sized from one core up to os.cpu_count().
+
+    python -m benchmarks.bench_signup [requests] [concurrency]
+"""
+
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup
+
+counter = itertools.count()
+
+
+def signup(client):
+    n = next(counter)
+    response = client.post(
+        "/contas/criar/",
+        data={
+            "username": f"bench{n}",
+            "email": f"bench{n}@bench.com",
+            "password": "s3cure!Passw0rd",
+            "re_password": "s3cure!Passw0rd",
+        },
+    )
+    return response.status_code
+
+
+def run(requests: int, concurrency: int) -> dict:
+    from django.test import Client
+
+    statuses = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        clients = [Client() for _ in range(requests)]
+        statuses = list(executor.map(signup, clients))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": statuses.count(201) / elapsed,
+        "rejected": statuses.count(503),
+        "errors": len(statuses) - statuses.count(201) - statuses.count(503),
+    }
+
+
+def main(requests: int = 16, concurrency: int = 8):
+    setup()
+
+    from django.test import override_settings
+
+    print(f"signup: {requests} requests, {concurrency} concurrent clients")
+    rounds = [("inline", {})]
+    for cores in sorted({1, os.cpu_count() or 1}):
+        for kind in ("thread", "process"):
+            rounds.append(
+                (
+                    f"{kind} pool, {cores} core(s)",
+                    {
+                        "PASSWORD_POOL": kind,
+                        "PASSWORD_POOL_SIZE": cores,
+                        "PASSWORD_POOL_QUEUE_DEPTH": concurrency,
+                    },
+                )
+            )
+
+    for name, overrides in rounds:
+        with override_settings(AUTHENTIC=overrides):
+            result = run(requests, concurrency)
+        print(
+            f"  {name:<24} {result['rps']:>8.2f} signups/s"
+            f"  rejected={result['rejected']} errors={result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,64 @@
+"""
+Cold start cost of the app: time to ``django.setup()`` and time to serve the
+first requests, with and without ``AUTHENTIC["WARM_UP"]``. Every run happens
+in a fresh interpreter so nothing is shared between measurements.
+
+    python -m benchmarks.bench_startup [runs]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+SCRIPT = """
+import json, os, sys, time
+
+start = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testproject.settings")
+
+from django.conf import settings
+
+settings.AUTHENTIC = {"WARM_UP": %(warm_up)r}
+settings.ALLOWED_HOSTS = ["testserver"]
+
+import django
+
+django.setup()
+from django.test import Client
+
+setup = time.perf_counter()
+client = Client()
+assert client.get("/contas/").status_code == 401
+assert client.post("/contas/criar/", {}).status_code == 400
+first = time.perf_counter()
+client.get("/contas/")
+client.post("/contas/criar/", {})
+second = time.perf_counter()
+print(json.dumps([setup - start, first - setup, second - first]))
+"""
+
+
+def measure(warm_up: bool, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", SCRIPT % {"warm_up": warm_up}],
+            stderr=subprocess.DEVNULL,
+        )
+        samples.append(json.loads(output))
+    return [statistics.median(column) * 1000 for column in zip(*samples)]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"Startup, median of {runs} runs (ms)")
+    print(f"  {'':8}  {'setup':>8}  {'first':>8}  {'second':>8}")
+    for warm_up in (False, True):
+        name = "warm_up" if warm_up else "lazy"
+        setup, first, second = measure(warm_up, runs)
+        print(f"  {name:8}  {setup:8.1f}  {first:8.1f}  {second:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
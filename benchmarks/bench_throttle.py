@@ -0,0 +1,53 @@
+"""
+Simulated credential stuffing against POST /entrar/: one client cycling
+through usernames with wrong passwords, with and without the built-in
+throttles. CPU time is reported per window of requests, with throttling it
+drops to the cost of a rejected request once the buckets are empty.
+
+    python -m benchmarks.bench_throttle [requests] [window]
+"""
+
+import logging
+import sys
+import time
+
+from benchmarks import setup
+
+THROTTLED = {"THROTTLE_RATES": {"ip": "20/min", "login": "5/min"}}
+
+
+def attack(client, requests: int, window: int) -> list:
+    rows = []
+    for start in range(0, requests, window):
+        statuses = []
+        cpu = time.process_time()
+        for n in range(start, start + window):
+            response = client.post(
+                "/entrar/", {"username": f"victim{n % 10}", "password": f"guess{n}"}
+            )
+            statuses.append(response.status_code)
+        cpu = time.process_time() - cpu
+        rows.append((start, cpu * 1000 / window, statuses.count(429)))
+    return rows
+
+
+def main(requests: int = 200, window: int = 20):
+    setup()
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+
+    for n in range(10):
+        get_user_model().objects.create_user(username=f"victim{n}", password="secret")
+
+    for name, overrides in (("unthrottled", {}), ("throttled", THROTTLED)):
+        with override_settings(AUTHENTIC=overrides):
+            print(name)
+            print(f"  {'requests':>10}  {'cpu ms/req':>10}  {'rejected':>8}")
+            for start, cpu, rejected in attack(Client(), requests, window):
+                print(f"  {start:>10}  {cpu:>10.2f}  {rejected:>8}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
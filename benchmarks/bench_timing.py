@@ -0,0 +1,35 @@
+"""
+Cost of a timing.phase() block outside a timed request (the default) and
+inside one, against an empty block.
+
+    python -m benchmarks.bench_timing [iterations]
+"""
+
+import sys
+
+from benchmarks import report, setup, throughput
+
+
+def main(number: int = 1000000):
+    setup()
+
+    from authentic.utils import timing
+
+    def bare():
+        pass
+
+    def phase():
+        with timing.phase("bench"):
+            pass
+
+    rows = [("no timer", throughput(bare, number))]
+    rows.append(("phase(), disabled", throughput(phase, number)))
+    token = timing._timings.set([])
+    rows.append(("phase(), enabled", throughput(phase, number)))
+    timing._timings.reset(token)
+
+    report("timing.phase()", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
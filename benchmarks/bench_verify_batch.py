@@ -0,0 +1,55 @@
+"""
+Tokens verified per second through /verificar/ (one token per request) and
+through /verificar/lote/ (one batch per request), with and without the
+validated-token cache. Every token is verified several times, as a gateway
+would.
+
+    python -m benchmarks.bench_verify_batch [tokens] [rounds]
+"""
+
+import json
+import sys
+import time
+
+from benchmarks import report, setup
+
+
+def main(tokens: int = 200, rounds: int = 10):
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user = get_user_model().objects.create_user(username="bench", password="bench")
+    raw_tokens = [str(AccessToken.for_user(user)) for _ in range(tokens)]
+    batch = json.dumps({"tokens": raw_tokens})
+    client = Client()
+
+    def single():
+        for raw_token in raw_tokens:
+            response = client.post("/verificar/", {"token": raw_token})
+            assert response.status_code == 200, response.content
+
+    def batched():
+        response = client.post(
+            "/verificar/lote/", batch, content_type="application/json"
+        )
+        assert response.status_code == 200, response.content
+
+    rows = []
+    for name, overrides in (("uncached", {}), ("token cache", {"TOKEN_CACHE": True})):
+        with override_settings(AUTHENTIC=overrides):
+            for path, func in (("/verificar/", single), ("/verificar/lote/", batched)):
+                func()
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    func()
+                rate = tokens * rounds / (time.perf_counter() - start)
+                rows.append((f"{path} {name}", rate))
+
+    report(f"Tokens verified per second ({tokens} tokens, {rounds} rounds)", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
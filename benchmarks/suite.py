@@ -0,0 +1,224 @@
+"""
+Benchmark suite for every endpoint, run in-process against testproject.
+
+Each endpoint is driven by a thread per concurrent client for every
+combination of user-table size and concurrency. Latency percentiles,
+throughput and queries per request are printed, and compared against a
+baseline file when one exists:
+
+    python -m benchmarks.suite --save              # record the baseline
+    python -m benchmarks.suite --threshold 0.2     # compare, exit 1 on regression
+
+The MD5 hasher is used unless --real-hasher is given, so the numbers reflect
+authentic and not PBKDF2. Baselines are machine specific, record one on the
+machine that runs the comparison.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks import grow_table, percentile, setup
+
+BASELINE = Path(__file__).with_name("baseline.json")
+PASSWORD = "s3cure!Passw0rd"
+
+counter = itertools.count()
+
+
+class Endpoints:
+    def __init__(self):
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from authentic.utils import encode_uid
+        from authentic.utils.tokens import link_token_generator
+
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username=f"bench{next(counter)}", password=PASSWORD, is_staff=True
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.refresh = str(refresh)
+        self.access = str(refresh.access_token)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {self.access}"}
+        self.activation_data = {
+            "uid": encode_uid(self.user.pk),
+            "token": link_token_generator.make_token(self.user),
+        }
+
+    def login(self, client):
+        data = {"username": self.user.username, "password": PASSWORD}
+        return client.post("/entrar/", data), 200
+
+    def verify(self, client):
+        return client.post("/verificar/", {"token": self.access}), 200
+
+    def refresh_token(self, client):
+        return client.post("/renovar/", {"refresh": self.refresh}), 200
+
+    def register(self, client):
+        n = next(counter)
+        data = {
+            "username": f"signup{n}",
+            "email": f"signup{n}@bench.com",
+            "password": PASSWORD,
+            "re_password": PASSWORD,
+        }
+        return client.post("/contas/criar/", data), 201
+
+    def activation(self, client):
+        return client.post("/contas/ativacao/", self.activation_data), 204
+
+    def list(self, client):
+        return client.get("/contas/", **self.headers), 200
+
+    def retrieve(self, client):
+        return client.get(f"/contas/{self.user.pk}/", **self.headers), 200
+
+    names = {
+        "entrar": "login",
+        "verificar": "verify",
+        "renovar": "refresh_token",
+        "criar": "register",
+        "ativacao": "activation",
+        "list": "list",
+        "retrieve": "retrieve",
+    }
+
+
+def measure(request, requests: int, concurrency: int) -> dict:
+    from django.test import Client
+
+    from authentic.utils.queries import count_queries
+
+    def worker(count):
+        client = Client()
+        samples = []
+        for _ in range(count):
+            with count_queries() as queries:
+                start = time.perf_counter()
+                response, expected = request(client)
+                elapsed = time.perf_counter() - start
+            assert response.status_code == expected, response.content
+            samples.append((elapsed, queries.count))
+        return samples
+
+    request(Client())
+    counts = [requests // concurrency] * concurrency
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        samples = sum(executor.map(worker, counts), [])
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in samples]
+    return {
+        "rps": len(samples) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "queries": statistics.mean(queries for _, queries in samples),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["p95"] > base["p95"] * (1 + threshold):
+            regressions.append(f"{key}: p95 {base['p95']:.2f} -> {result['p95']:.2f}ms")
+        if result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{key}: {base['rps']:.0f} -> {result['rps']:.0f} req/s")
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{key}: {base['queries']:g} -> {result['queries']:g} queries/request"
+            )
+    return regressions
+
+
+def use_file_database():
+    # Threads writing to SQLite's shared in-memory test database fail with
+    # "table is locked" instead of waiting, a file database waits.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testproject.settings")
+    from django.conf import settings
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"] == "django.db.backends.sqlite3":
+        path = Path(tempfile.gettempdir(), "authentic-benchmarks.sqlite3")
+        database.setdefault("TEST", {})["NAME"] = str(path)
+        path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoints", nargs="+", choices=Endpoints.names)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 10000])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--real-hasher", action="store_true")
+    args = parser.parse_args()
+
+    use_file_database()
+    setup()
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+
+    overrides = {}
+    if not args.real_hasher:
+        overrides["PASSWORD_HASHERS"] = [
+            "django.contrib.auth.hashers.MD5PasswordHasher"
+        ]
+
+    results = {}
+    with override_settings(**overrides):
+        print(
+            f"  {'endpoint':<10} {'users':>7} {'conc':>4} {'req/s':>9}"
+            f" {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>7}"
+        )
+        for size in args.sizes:
+            grow_table(get_user_model(), size)
+            endpoints = Endpoints()
+            for concurrency, name in itertools.product(
+                args.concurrency, args.endpoints or Endpoints.names
+            ):
+                request = getattr(endpoints, Endpoints.names[name])
+                result = measure(request, args.requests, concurrency)
+                results[f"{name}@{size}x{concurrency}"] = result
+                print(
+                    f"  {name:<10} {size:>7} {concurrency:>4} {result['rps']:>9.1f}"
+                    f" {result['p50']:>8.2f} {result['p95']:>8.2f}"
+                    f" {result['p99']:>8.2f} {result['queries']:>7g}"
+                )
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+from django.urls import path, include
+
+urlpatterns = [
+    path("", include("authentic.async_urls")),
+    path("", include("authentic.authentication.async_urls")),
+]
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "authentic.utils.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -46,6 +47,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "authentic.utils.queries.QueryBudgetMiddleware",
 ]
 
 ROOT_URLCONF = "testproject.urls"
@@ -111,4 +113,9 @@ EMAIL_USE_SSL = False
 
 AUTHENTIC = {
     "USER_CREATE_PASSWORD_RETYPE": True,
+    "QUERY_BUDGET_RAISE": True,
 }
+
+# The stock auth.User has no index on email and date_joined, the test
+# database is thrown away so the user list indexes are not created.
+SILENCED_SYSTEM_CHECKS = ["authentic.W001"]
@@ -0,0 +1,125 @@
+from unittest import mock
+
+from bs4 import BeautifulSoup
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import UserManager
+from django.contrib.auth.signals import user_login_failed
+from django.core import mail
+from django.db.models import UUIDField
+from django.test import AsyncClient, TestCase, override_settings
+from authentic.conf import settings
+
+User = get_user_model()
+create_user = UserManager.create_user
+
+
+def managed_create_user(manager, username, email=None, password=None, **fields):
+    fields.setdefault("first_name", "Managed")
+    return create_user(manager, username, email, password, **fields)
+
+
+@override_settings(ROOT_URLCONF="testproject.async_urls")
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.context = {
+            "username": "asynccase",
+            "email": "asynccase@testcase.com",
+            "password": "testando@123",
+        }
+
+    async def register_and_activate(self):
+        settings.USER_CREATE_PASSWORD_RETYPE = False
+        response = await self.client.post("/contas/criar/", data=self.context)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["username"], "asynccase")
+
+        soup = BeautifulSoup(mail.outbox[0].body, "html.parser")
+        token, uid = soup.find("a").get("href").split("/")[-1:-3:-1]
+        response = await self.client.post(
+            "/contas/ativacao/", data={"uid": uid, "token": token}
+        )
+        self.assertEqual(response.status_code, 204)
+
+    async def test_login_sets_cookies_and_authenticates(self):
+        await self.register_and_activate()
+
+        response = await self.client.post(
+            "/entrar/",
+            data={"username": "asynccase", "password": "testando@123"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.cookies)
+        self.assertIn("refresh", response.cookies)
+
+        response = await self.client.get("/contas/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["username"], "asynccase")
+
+        response = await self.client.post("/renovar/")
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.client.post("/verificar/")
+        self.assertEqual(response.status_code, 200)
+
+    async def test_wrong_credentials_and_anonymous_access(self):
+        await self.register_and_activate()
+
+        response = await self.client.post(
+            "/entrar/", data={"username": "asynccase", "password": "wrong"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.client.get("/contas/")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_failed_login_is_signaled(self):
+        await self.register_and_activate()
+        received = []
+
+        def receiver(sender, credentials, request, **kwargs):
+            received.append(credentials)
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        for username in ("asynccase", "nobody"):
+            response = await self.client.post(
+                "/entrar/", data={"username": username, "password": "wrong"}
+            )
+            self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            received,
+            [
+                {"username": "asynccase", "password": "********************"},
+                {"username": "nobody", "password": "********************"},
+            ],
+        )
+
+    @mock.patch.object(UserManager, "create_user", managed_create_user)
+    async def test_register_goes_through_the_manager(self):
+        settings.USER_CREATE_PASSWORD_RETYPE = False
+        response = await self.client.post("/contas/criar/", data=self.context)
+        self.assertEqual(response.status_code, 201)
+
+        user = await User.objects.aget(username="asynccase")
+        self.assertEqual(user.first_name, "Managed")
+        self.assertFalse(user.is_active)
+        self.assertTrue(await user.acheck_password("testando@123"))
+
+    async def test_malformed_pk_is_not_found(self):
+        await self.register_and_activate()
+        await self.client.post(
+            "/entrar/", data={"username": "asynccase", "password": "testando@123"}
+        )
+        # The detail lookup behaves like a UUIDField primary key: a
+        # malformed value raises ValidationError, not ValueError.
+        get_prep_value = User._meta.pk.get_prep_value
+
+        def prep(value):
+            if value == "not-a-uuid":
+                return UUIDField().get_prep_value(value)
+            return get_prep_value(value)
+
+        with mock.patch.object(User._meta.pk, "get_prep_value", prep):
+            response = await self.client.get("/contas/not-a-uuid/")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,212 @@
+import time
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import Client, RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from authentic.authentication import authenticator, cache
+from authentic.authentication.authenticator import AuthenticJWTAuthentication
+from authentic.authentication.cache import token_cache_stats, user_cache_stats
+from authentic.utils.singleflight import SingleFlight
+
+User = get_user_model()
+
+
+@override_settings(AUTHENTIC={"USER_CACHE": True})
+class UserCacheTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="cached", email="cached@testcase.com", password="testando@123"
+        )
+        token = AccessToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.url = f"/contas/{self.user.pk}/"
+
+    def test_authenticated_user_is_served_from_cache(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_cache_stats()["hits"], 1)
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(self.url, **self.headers)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(AUTHENTIC={"USER_CACHE": True, "USER_CACHE_BACKEND": "default"})
+    def test_deactivation_from_another_process_invalidates_shared_cache(self):
+        self.addCleanup(caches["default"].clear)
+        self.client.get(self.url, **self.headers)
+
+        # A process that never authenticated anyone, e.g. a shell.
+        cache._user_cache = None
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivation_invalidates_cache_keyed_by_another_field(self):
+        # simplejwt modules keep the api_settings they imported, the field is
+        # patched on each of them instead of overriding SIMPLE_JWT.
+        with ExitStack() as stack:
+            for module in (authenticator, cache, tokens):
+                stack.enter_context(
+                    mock.patch.object(module.api_settings, "USER_ID_FIELD", "username")
+                )
+            self.assert_deactivation_invalidates_cache()
+
+    def assert_deactivation_invalidates_cache(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(token["user_id"], "cached")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.client.get(self.url, **headers)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url, **headers)
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(AUTHENTIC={"TOKEN_CACHE": True})
+class TokenCacheTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="tokens", email="tokens@testcase.com", password="testando@123"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    def test_valid_token_is_decoded_once(self):
+        authenticator = AuthenticJWTAuthentication()
+        first = authenticator.get_validated_token(self.token)
+        second = authenticator.get_validated_token(self.token)
+        self.assertIs(first, second)
+        self.assertEqual(token_cache_stats()["valid"]["hits"], 1)
+
+    def test_invalid_token_is_negatively_cached(self):
+        authenticator = AuthenticJWTAuthentication()
+        request = RequestFactory().get("/")
+        request.COOKIES["access"] = self.token[:-4] + "AAAA"
+
+        self.assertIsNone(authenticator.authenticate(request))
+        self.assertIsNone(authenticator.authenticate(request))
+        self.assertEqual(token_cache_stats()["invalid"]["hits"], 1)
+
+
+@override_settings(AUTHENTIC={"REFRESH_COALESCING": True})
+class RefreshCoalescingTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            username="tabs", email="tabs@testcase.com", password="testando@123"
+        )
+        self.refresh = str(RefreshToken.for_user(user))
+        self.minted = 0
+        validate = TokenRefreshSerializer.validate
+
+        def slow_validate(serializer, attrs):
+            self.minted += 1
+            time.sleep(0.1)
+            return validate(serializer, attrs)
+
+        patcher = mock.patch.object(TokenRefreshSerializer, "validate", slow_validate)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def refresh_from_tabs(self, tabs: int) -> set:
+        def refresh(_):
+            client = Client()
+            client.cookies["refresh"] = self.refresh
+            response = client.post("/renovar/")
+            self.assertEqual(response.status_code, 200)
+            return response.json()["access"]
+
+        with ThreadPoolExecutor(tabs) as executor:
+            return set(executor.map(refresh, range(tabs)))
+
+    def test_parallel_refreshes_mint_one_token(self):
+        self.assertEqual(len(self.refresh_from_tabs(8)), 1)
+        self.assertEqual(self.minted, 1)
+
+    @override_settings(
+        AUTHENTIC={
+            "REFRESH_COALESCING": True,
+            "REFRESH_COALESCING_CACHE_BACKEND": "default",
+        }
+    )
+    def test_workers_share_the_result(self):
+        workers = [
+            SingleFlight(10, alias="default", prefix="authentic:workers")
+            for _ in range(4)
+        ]
+
+        def refresh(worker):
+            return worker.do("jti", lambda: self.minted_token())
+
+        with ThreadPoolExecutor(len(workers)) as executor:
+            self.assertEqual(len(set(executor.map(refresh, workers))), 1)
+        self.assertEqual(self.minted, 1)
+        self.assertEqual(len(self.refresh_from_tabs(4)), 1)
+        self.assertEqual(self.minted, 2)
+
+    def minted_token(self):
+        self.minted += 1
+        time.sleep(0.1)
+        return str(self.minted)
+
+
+class TokenBatchVerifyTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="gateway", password="x1y2z3w4")
+        self.token = AccessToken.for_user(self.user)
+
+    def verify(self, tokens):
+        return self.client.post(
+            "/verificar/lote/", {"tokens": tokens}, content_type="application/json"
+        )
+
+    @override_settings(AUTHENTIC={"TOKEN_CACHE": True})
+    def test_verdicts_follow_the_tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        tokens = [str(self.token), "garbage", str(refresh), str(self.token)]
+        response = self.verify(tokens)
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 4)
+        self.assertEqual(
+            results[0],
+            {
+                "valid": True,
+                "token_type": "access",
+                "sub": self.user.pk,
+                "exp": self.token["exp"],
+            },
+        )
+        self.assertEqual(results[3], results[0])
+        # Refresh tokens are not accepted in place of access tokens.
+        for result in results[1:3]:
+            self.assertFalse(result["valid"])
+            self.assertEqual(result["code"], "token_not_valid")
+        # The repeated token is decoded once.
+        self.assertEqual(token_cache_stats()["valid"]["misses"], 3)
+
+    @override_settings(AUTHENTIC={"VERIFY_BATCH_MAX_SIZE": 2})
+    def test_batch_size_is_limited(self):
+        self.assertEqual(self.verify([str(self.token)] * 3).status_code, 400)
+        self.assertEqual(self.verify([]).status_code, 400)
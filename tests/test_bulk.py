@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import AsyncClient, Client, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentic.authentication import cache
+from authentic.authentication.cache import cache_user, get_cached_user
+from authentic.utils import bulk
+
+User = get_user_model()
+
+
+@override_settings(AUTHENTIC={"BULK_CHUNK_SIZE": 4, "USER_CACHE": True})
+class UserBulkTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f"bulk{index:02}", email=f"bulk{index:02}@testcase.com")
+            for index in range(10)
+        )
+        cls.admin = User.objects.create_user(username="admin", is_staff=True)
+
+    def setUp(self):
+        self.client = Client()
+
+    def post(self, data, user=None):
+        token = AccessToken.for_user(user or self.admin)
+        return self.client.post(
+            "/contas/lote/",
+            data=data,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+    def test_deactivate_by_ids(self):
+        users = list(User.objects.filter(username__startswith="bulk"))
+        cache_user(users[0].pk, users[0])
+
+        ids = [user.pk for user in users[:9]] + [self.admin.pk]
+        response = self.post({"operation": "deactivate", "ids": ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["affected"], 9)
+        self.assertEqual(
+            response.json()["chunks"],
+            [
+                {"chunk": 0, "processed": 4, "affected": 4},
+                {"chunk": 1, "processed": 8, "affected": 4},
+                {"chunk": 2, "processed": 10, "affected": 1},
+            ],
+        )
+        self.assertEqual(User.objects.filter(is_active=False).count(), 9)
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+        self.assertIsNone(get_cached_user(users[0].pk))
+
+        response = self.post({"operation": "activate", "ids": ids[:2]})
+        self.assertEqual(response.json()["affected"], 2)
+
+    def test_cache_keyed_by_another_field(self):
+        user = User.objects.get(username="bulk00")
+        cache_user("bulk00", user)
+        with mock.patch.object(bulk.api_settings, "USER_ID_FIELD", "username"):
+            self.post({"operation": "deactivate", "ids": [user.pk]})
+        self.assertIsNone(get_cached_user("bulk00"))
+
+    @override_settings(AUTHENTIC={"USER_CACHE": True, "USER_CACHE_BACKEND": "default"})
+    def test_job_outside_the_request_cycle_invalidates_shared_cache(self):
+        self.addCleanup(caches["default"].clear)
+        user = User.objects.get(username="bulk00")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+        url = f"/contas/{user.pk}/"
+        self.assertEqual(self.client.get(url, **headers).status_code, 200)
+
+        # A management command or worker that never authenticated anyone.
+        cache._user_cache = None
+        bulk.bulk_users(User.objects.all(), "deactivate", [[user.pk]])
+
+        self.assertEqual(self.client.get(url, **headers).status_code, 401)
+
+    def test_delete_by_filter(self):
+        response = self.post({"operation": "delete", "filter": {"search": "bulk0"}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["affected"], 10)
+        self.assertEqual(len(response.json()["chunks"]), 3)
+        self.assertEqual(
+            list(User.objects.values_list("username", flat=True)), ["admin"]
+        )
+
+    def test_rejected_requests(self):
+        user = User.objects.get(username="bulk00")
+        response = self.post({"operation": "delete", "ids": [user.pk]}, user=user)
+        self.assertEqual(response.status_code, 403)
+
+        for data, field in (
+            ({"operation": "delete"}, "non_field_errors"),
+            ({"operation": "delete", "ids": [1], "filter": {"search": "b"}}, None),
+            ({"operation": "delete", "ids": ["x"]}, "ids"),
+            ({"operation": "delete", "filter": {"password": "x"}}, "filter"),
+            ({"operation": "delete", "filter": {"is_active": "maybe"}}, "filter"),
+            ({"operation": "purge", "ids": [1]}, "operation"),
+        ):
+            response = self.post(data)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(field or "non_field_errors", response.json())
+        self.assertEqual(User.objects.count(), 11)
+
+    @override_settings(ROOT_URLCONF="testproject.async_urls")
+    async def test_async_bulk(self):
+        token = AccessToken.for_user(self.admin)
+        response = await AsyncClient().post(
+            "/contas/lote/",
+            data={"operation": "deactivate", "filter": {"is_active": "true"}},
+            content_type="application/json",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["affected"], 10)
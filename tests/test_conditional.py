@@ -0,0 +1,148 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    AsyncClient,
+    Client,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentic.checks import check_response_cache
+from authentic.views import UserViewSet
+
+User = get_user_model()
+
+
+class ConditionalRetrieveTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="polled", email="polled@testcase.com"
+        )
+        cls.other = User.objects.create_user(username="other")
+        cls.admin = User.objects.create_user(username="admin", is_staff=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.url = f"/contas/{self.user.pk}/"
+
+    def headers(self, user, **extra):
+        return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}", **extra}
+
+    def test_etag(self):
+        response = self.client.get(self.url, **self.headers(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag = response["ETag"]
+
+        headers = self.headers(self.user, HTTP_IF_NONE_MATCH=etag)
+        response = self.client.get(self.url, **headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    @override_settings(AUTHENTIC={"USER_RESPONSE_CACHE": True, "USER_CACHE": True})
+    def test_cached_responses(self):
+        response = self.client.get(self.url, **self.headers(self.user))
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, **self.headers(self.user))
+            self.assertEqual(response.json()["username"], "polled")
+            response = self.client.get(
+                self.url, **self.headers(self.user, HTTP_IF_NONE_MATCH=etag)
+            )
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(
+                self.url,
+                **self.headers(self.user, HTTP_IF_MODIFIED_SINCE=last_modified),
+            )
+            self.assertEqual(response.status_code, 304)
+
+        self.user.first_name = "Changed"
+        self.user.save()
+        response = self.client.get(
+            self.url, **self.headers(self.user, HTTP_IF_NONE_MATCH=etag)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["first_name"], "Changed")
+
+    @override_settings(AUTHENTIC={"USER_RESPONSE_CACHE": True})
+    def test_save_racing_a_rendering(self):
+        get_object = UserViewSet.get_object
+
+        def racing_get_object(viewset):
+            user = get_object(viewset)
+            # Saved after the GET loaded the user, before it is cached.
+            User.objects.get(pk=user.pk).save()
+            User.objects.filter(pk=user.pk).update(first_name="Racing")
+            return user
+
+        with mock.patch.object(UserViewSet, "get_object", racing_get_object):
+            response = self.client.get(self.url, **self.headers(self.user))
+        self.assertEqual(response.json()["first_name"], "")
+
+        response = self.client.get(self.url, **self.headers(self.user))
+        self.assertEqual(response.json()["first_name"], "Racing")
+
+    @override_settings(AUTHENTIC={"USER_RESPONSE_CACHE": True})
+    def test_cached_responses_follow_the_permissions(self):
+        response = self.client.get(self.url, **self.headers(self.user))
+        etag = response["ETag"]
+
+        for user, status in ((self.other, 403), (self.admin, 304)):
+            response = self.client.get(
+                self.url, **self.headers(user, HTTP_IF_NONE_MATCH=etag)
+            )
+            self.assertEqual(response.status_code, status)
+
+        self.user.delete()
+        response = self.client.get(self.url, **self.headers(self.admin))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        ROOT_URLCONF="testproject.async_urls",
+        AUTHENTIC={"USER_RESPONSE_CACHE": True},
+    )
+    async def test_async_detail(self):
+        client = AsyncClient()
+        authorization = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        response = await client.get(self.url, headers=authorization)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        for user, status in ((self.user, 304), (self.other, 403)):
+            headers = {
+                "Authorization": f"Bearer {AccessToken.for_user(user)}",
+                "If-None-Match": etag,
+            }
+            response = await client.get(self.url, headers=headers)
+            self.assertEqual(response.status_code, status)
+
+
+class ResponseCacheCheckTestCase(SimpleTestCase):
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual(check_response_cache(), [])
+        for backend in (None, "default"):
+            with override_settings(
+                AUTHENTIC={
+                    "USER_RESPONSE_CACHE": True,
+                    "USER_RESPONSE_CACHE_BACKEND": backend,
+                }
+            ):
+                self.assertEqual(
+                    [warning.id for warning in check_response_cache()],
+                    ["authentic.W003"],
+                )
+        with override_settings(
+            AUTHENTIC={
+                "USER_RESPONSE_CACHE": True,
+                "USER_RESPONSE_CACHE_BACKEND": "default",
+            },
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}
+            },
+        ):
+            self.assertEqual(check_response_cache(), [])
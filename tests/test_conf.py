@@ -0,0 +1,108 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth.hashers import get_hashers
+from django.template import engines
+from django.template.loader import get_template
+from django.template.loaders import app_directories
+from django.test import SimpleTestCase, override_settings
+from django.urls import clear_url_caches, get_resolver
+from authentic.apps import warm_up
+from authentic.conf import Settings, settings
+from authentic.serializers import (
+    UserCreatePasswordRetypeSerializer,
+    UserCreateSerializer,
+    UserSerializer,
+)
+
+
+class SettingsSnapshotTestCase(SimpleTestCase):
+    def test_snapshot_is_compiled_and_read_only(self):
+        self.assertTrue(settings.compiled)
+        self.assertIs(
+            settings.ACTION_SERIALIZERS["activation"], settings.SERIALIZERS.activation
+        )
+        with self.assertRaises(TypeError):
+            settings.SERIALIZERS["user"] = "authentic.serializers.UserSerializer"
+
+    def test_rebuild_is_published_at_once(self):
+        previous = settings._wrapped
+        seen = {}
+        compile = Settings.compile
+
+        def read_from_another_thread(snapshot):
+            if snapshot.compiled or seen:
+                return compile(snapshot)
+            seen["building"] = settings.PAGE_SIZE
+            thread = threading.Thread(
+                target=lambda: seen.update(
+                    wrapped=settings._wrapped, other=settings.PAGE_SIZE
+                )
+            )
+            thread.start()
+            thread.join()
+            return compile(snapshot)
+
+        with mock.patch.object(Settings, "compile", read_from_another_thread):
+            with override_settings(AUTHENTIC={"PAGE_SIZE": 7}):
+                self.assertEqual(settings.PAGE_SIZE, 7)
+                self.assertTrue(settings.compiled)
+        self.assertEqual(seen["building"], 7)
+        self.assertIs(seen["wrapped"], previous)
+        self.assertEqual(seen["other"], previous.PAGE_SIZE)
+
+    def test_assignment_swaps_snapshot(self):
+        snapshot = settings._wrapped
+        previous = settings.USER_CREATE_PASSWORD_RETYPE
+        try:
+            settings.USER_CREATE_PASSWORD_RETYPE = False
+            self.assertIsNot(settings._wrapped, snapshot)
+            self.assertIs(settings.ACTION_SERIALIZERS["register"], UserCreateSerializer)
+        finally:
+            settings.USER_CREATE_PASSWORD_RETYPE = previous
+
+    @override_settings(
+        AUTHENTIC={
+            "USER_CREATE_PASSWORD_RETYPE": True,
+            "PERMISSIONS": {"activation": ["authentic.permissions.CurrentUserOrAdmin"]},
+        }
+    )
+    def test_setting_changed_compiles_overrides(self):
+        from authentic.permissions import CurrentUserOrAdmin
+
+        self.assertIs(
+            settings.ACTION_SERIALIZERS["register"], UserCreatePasswordRetypeSerializer
+        )
+        self.assertEqual(
+            settings.ACTION_PERMISSIONS["activation"], [CurrentUserOrAdmin]
+        )
+
+    @override_settings(AUTHENTIC={"USER_MODEL_FIELDS_HIDDEN": ["password", "email"]})
+    def test_user_fields_follow_settings(self):
+        fields = UserSerializer().fields
+        self.assertNotIn("email", fields)
+        self.assertTrue(all(field.read_only for field in fields.values()))
+
+    def test_warm_up(self):
+        loader = engines["django"].engine.template_loaders[0]
+        clear_url_caches()
+        get_hashers.cache_clear()
+        loader.reset()
+
+        warm_up()
+
+        self.assertIn("url_patterns", get_resolver().__dict__)
+        self.assertEqual(get_hashers.cache_info().currsize, 1)
+        template_names = [
+            email_class.template_name
+            for email_class in settings.EMAIL.values()
+            if getattr(email_class, "template_name", None)
+        ]
+        self.assertTrue(template_names)
+        # The first email renders its template without reading it again.
+        with mock.patch.object(
+            app_directories.Loader, "get_contents", side_effect=AssertionError
+        ):
+            for template_name in template_names:
+                self.assertIn(template_name, loader.get_template_cache)
+                get_template(template_name)
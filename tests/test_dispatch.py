@@ -0,0 +1,46 @@
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from authentic.utils.dispatch import get_dispatcher
+
+
+class EmailDispatchTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.context = {
+            "username": "dispatch",
+            "email": "dispatch@testcase.com",
+            "password": "testando@123",
+            "re_password": "testando@123",
+        }
+
+    @override_settings(
+        AUTHENTIC={
+            "EMAIL": {"dispatcher": "authentic.utils.dispatch.LocmemEmailDispatcher"}
+        }
+    )
+    def test_locmem_dispatcher_defers_rendering(self):
+        response = self.client.post("/contas/criar/", data=self.context)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+
+        dispatcher = get_dispatcher()
+        email, to = dispatcher.pending[0]
+        self.assertIsNone(email.html)
+        self.assertEqual(to, [self.context["email"]])
+
+        dispatcher.flush()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("/contas/ativacao/", mail.outbox[0].body)
+
+    @override_settings(
+        AUTHENTIC={
+            "EMAIL": {"dispatcher": "authentic.utils.dispatch.ThreadedEmailDispatcher"}
+        }
+    )
+    def test_threaded_dispatcher_sends_from_workers(self):
+        response = self.client.post("/contas/criar/", data=self.context)
+        self.assertEqual(response.status_code, 201)
+
+        get_dispatcher().flush()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.context["email"]])
@@ -0,0 +1,104 @@
+import csv
+import gzip
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, Client, TestCase, override_settings
+from rest_framework import serializers
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+class ComputedSerializer(serializers.ModelSerializer):
+    display = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ("id", "username", "password", "display")
+        extra_kwargs = {"password": {"write_only": True}}
+
+    def get_display(self, user):
+        return user.username.upper()
+
+
+@override_settings(AUTHENTIC={"EXPORT_CHUNK_SIZE": 3})
+class UserExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f"export{index}", email=f"export{index}@testcase.com")
+            for index in range(7)
+        )
+        cls.admin = User.objects.create_user(username="admin", is_staff=True)
+
+    def setUp(self):
+        self.client = Client()
+
+    def get(self, query="", user=None):
+        token = AccessToken.for_user(user or self.admin)
+        return self.client.get(
+            f"/contas/exportar/?{query}", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+    def content(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_ndjson(self):
+        response = self.get()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["username"], "export0")
+        self.assertNotIn("password", rows[0])
+
+        list_row = self.client.get(
+            "/contas/?limit=1",
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin)}",
+        ).json()["results"][0]
+        self.assertEqual(rows[0], list_row)
+
+    def test_csv_with_gzip_filters_and_fields(self):
+        response = self.get("output=csv&compress=gzip&search=export&fields=email,id")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn("users.csv.gz", response["Content-Disposition"])
+        text = gzip.decompress(self.content(response)).decode()
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[0], ["id", "email"])
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1][1], "export0@testcase.com")
+
+    def test_rejected_requests(self):
+        user = User.objects.get(username="export0")
+        self.assertEqual(self.get(user=user).status_code, 403)
+        for query in ("output=xml", "compress=zip", "fields=password"):
+            self.assertEqual(self.get(query).status_code, 400)
+
+    @override_settings(
+        AUTHENTIC={
+            "EXPORT_CHUNK_SIZE": 3,
+            "SERIALIZERS": {"user": "tests.test_export.ComputedSerializer"},
+        }
+    )
+    def test_serializer_columns(self):
+        # Computed fields go through the serializer, the CSV header is
+        # what it outputs.
+        text = self.content(self.get("output=csv&search=export")).decode()
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[0], ["id", "username", "display"])
+        self.assertEqual(rows[1][1:], ["export0", "EXPORT0"])
+        self.assertEqual(len(rows), 8)
+
+    @override_settings(ROOT_URLCONF="testproject.async_urls")
+    async def test_async_export(self):
+        token = AccessToken.for_user(self.admin)
+        response = await AsyncClient().get(
+            "/contas/exportar/?search=export",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 7)
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentic.checks import check_user_indexes
+from authentic.filters import prefix_upper_bound
+from authentic.utils.indexes import create_user_indexes, drop_user_indexes
+
+User = get_user_model()
+
+
+class UserFilterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(
+                username=username,
+                email=f"{username}@testcase.com",
+                is_active=index % 2 == 0,
+                date_joined=datetime(2024, 1, index + 1, tzinfo=timezone.utc),
+            )
+            for index, username in enumerate(
+                ("ana", "andre", "anz", "ao", "bruno", "Ana")
+            )
+        )
+        cls.user = User.objects.get(username="ana")
+        cls.user.is_staff = True
+        cls.user.save()
+
+    def setUp(self):
+        self.client = Client()
+        token = AccessToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def usernames(self, query):
+        response = self.client.get(f"/contas/?{query}", **self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [user["username"] for user in response.json()["results"]]
+
+    def test_filters(self):
+        self.assertEqual(self.usernames("is_active=false"), ["andre", "ao", "Ana"])
+        self.assertEqual(
+            self.usernames(
+                "date_joined_after=2024-01-02&date_joined_before=2024-01-04"
+            ),
+            ["andre", "anz"],
+        )
+        self.assertEqual(self.usernames("search=an"), ["ana", "andre", "anz"])
+        self.assertEqual(self.usernames("search=andre@"), ["andre"])
+
+    def test_prefix_search_is_a_range_and_a_prefix_match(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.usernames("search=an")
+        select = queries.captured_queries[-1]["sql"]
+        self.assertIn(""""username" < 'ao'""", select)
+        self.assertIn(""""username" LIKE 'an%'""", select)
+        self.assertEqual(prefix_upper_bound("a\U0010ffff"), "b")
+        self.assertIsNone(prefix_upper_bound("\U0010ffff"))
+
+    def test_ordering(self):
+        self.assertEqual(
+            self.usernames("ordering=-date_joined&is_active=true"),
+            ["bruno", "anz", "ana"],
+        )
+        with override_settings(AUTHENTIC={"PAGINATION_STYLE": "cursor"}):
+            # The cursor reads username from the last row, it is loaded
+            # along with the sparse fieldset instead of once per row.
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    "/contas/?ordering=username&limit=2&fields=email", **self.headers
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 2)
+            self.assertEqual(
+                [user["email"] for user in response.json()["results"]],
+                ["Ana@testcase.com", "ana@testcase.com"],
+            )
+
+    def test_rejected_parameters(self):
+        for query, param in (
+            ("ordering=password", "ordering"),
+            ("ordering=last_name", "ordering"),
+            ("is_active=maybe", "is_active"),
+            ("date_joined_after=yesterday", "date_joined_after"),
+        ):
+            response = self.client.get(f"/contas/?{query}", **self.headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(param, response.json())
+
+
+class UserIndexesTestCase(TransactionTestCase):
+    def test_check_and_helper_migration(self):
+        warnings = check_user_indexes(databases=["default"])
+        self.assertEqual(
+            sorted(warning.msg.split()[0] for warning in warnings),
+            ["auth.User.date_joined", "auth.User.email"],
+        )
+
+        with connection.schema_editor() as schema_editor:
+            create_user_indexes(apps, schema_editor)
+        try:
+            self.assertEqual(check_user_indexes(databases=["default"]), [])
+        finally:
+            with connection.schema_editor() as schema_editor:
+                drop_user_indexes(apps, schema_editor)
+        self.assertEqual(len(check_user_indexes(databases=["default"])), 2)
+        self.assertEqual(check_user_indexes(databases=None), [])
@@ -0,0 +1,86 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import UserManager
+from django.test import Client, TestCase, override_settings
+from authentic.errors import ServiceUnavailable
+from authentic.utils import hashing
+
+User = get_user_model()
+
+
+def slow(password):
+    time.sleep(0.2)
+
+
+create_user = UserManager.create_user
+
+
+def managed_create_user(manager, username, email=None, password=None, **fields):
+    # A custom manager completing the users it creates.
+    fields.setdefault("first_name", "Managed")
+    return create_user(manager, username, email, password, **fields)
+
+
+@override_settings(AUTHENTIC={"PASSWORD_POOL": "thread", "PASSWORD_POOL_SIZE": 1})
+class PasswordPoolTestCase(TestCase):
+    def test_register_hashes_on_pool(self):
+        context = {
+            "username": "pooled",
+            "email": "pooled@testcase.com",
+            "password": "testando@123",
+            "re_password": "testando@123",
+        }
+        response = Client().post("/contas/criar/", data=context)
+        self.assertEqual(response.status_code, 201)
+
+        user = User.objects.get(username="pooled")
+        self.assertTrue(user.check_password("testando@123"))
+
+    @mock.patch.object(UserManager, "create_user", managed_create_user)
+    def test_register_goes_through_the_manager(self):
+        context = {
+            "username": "managed",
+            "email": "managed@TESTCASE.com",
+            "password": "testando@123",
+            "re_password": "testando@123",
+        }
+        response = Client().post("/contas/criar/", data=context)
+        self.assertEqual(response.status_code, 201)
+
+        user = User.objects.get(username="managed")
+        self.assertEqual(user.first_name, "Managed")
+        self.assertEqual(user.email, "managed@testcase.com")
+        self.assertFalse(user.is_active)
+        self.assertTrue(user.check_password("testando@123"))
+
+    def test_saturated_pool_fails_fast(self):
+        pool = hashing.get_pool()
+        pool.slots.acquire()
+        try:
+            with self.assertRaises(ServiceUnavailable):
+                hashing.make_password("testando@123")
+        finally:
+            pool.slots.release()
+
+    @override_settings(
+        AUTHENTIC={
+            "PASSWORD_POOL": "thread",
+            "PASSWORD_POOL_SIZE": 1,
+            "PASSWORD_POOL_TIMEOUT": 0.01,
+        }
+    )
+    def test_timeout_is_a_503(self):
+        release = threading.Event()
+        try:
+            with self.assertRaises(ServiceUnavailable):
+                hashing.run(release.wait)
+        finally:
+            release.set()
+
+        context = {"username": "slow", "password": "testando@123"}
+        with mock.patch.object(hashing.hashers, "make_password", side_effect=slow):
+            response = Client().post("/contas/criar/", data=context)
+        self.assertEqual(response.status_code, 503)
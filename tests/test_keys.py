@@ -0,0 +1,154 @@
+import unittest
+
+import jwt
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, TestCase, override_settings
+from jwt.algorithms import has_crypto
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentic.authentication.keys import get_token_backend
+
+User = get_user_model()
+
+OLD_KEY = {"kid": "2024-01", "algorithm": "HS256", "signing_key": "old-secret"}
+NEW_KEY = {"kid": "2024-07", "algorithm": "HS256", "signing_key": "new-secret"}
+
+
+class KeyRotationTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="rotated", password="x1y2z3w4")
+        self.url = f"/contas/{self.user.pk}/"
+
+    def get(self, token):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_rotation(self):
+        # Tokens are signed when they are turned into strings.
+        legacy_token = str(AccessToken.for_user(self.user))
+        with override_settings(AUTHENTIC={"SIGNING_KEYS": [OLD_KEY]}):
+            old_token = str(AccessToken.for_user(self.user))
+        self.assertEqual(jwt.get_unverified_header(old_token)["kid"], "2024-01")
+
+        # The new key signs, the old one still verifies what it signed.
+        with override_settings(
+            AUTHENTIC={"SIGNING_KEYS": [NEW_KEY, {**OLD_KEY, "sign": False}]}
+        ):
+            new_token = str(AccessToken.for_user(self.user))
+            self.assertEqual(jwt.get_unverified_header(new_token)["kid"], "2024-07")
+            for token in (legacy_token, old_token, new_token):
+                self.assertEqual(self.get(token).status_code, 200)
+
+        # Once the old key is retired, its tokens are rejected.
+        with override_settings(AUTHENTIC={"SIGNING_KEYS": [NEW_KEY]}):
+            self.assertEqual(self.get(old_token).status_code, 401)
+            self.assertEqual(self.get(new_token).status_code, 200)
+
+    def test_unkeyed_tokens_can_be_retired(self):
+        legacy_token = str(AccessToken.for_user(self.user))
+        with override_settings(
+            AUTHENTIC={"SIGNING_KEYS": [NEW_KEY], "LEGACY_UNKEYED_TOKENS": False}
+        ):
+            self.assertEqual(self.get(legacy_token).status_code, 401)
+            new_token = str(AccessToken.for_user(self.user))
+            self.assertEqual(self.get(new_token).status_code, 200)
+
+    def test_key_algorithm_is_enforced(self):
+        with override_settings(AUTHENTIC={"SIGNING_KEYS": [OLD_KEY]}):
+            payload = dict(AccessToken.for_user(self.user).payload)
+            forged = jwt.encode(
+                payload, "old-secret", algorithm="HS512", headers={"kid": "2024-01"}
+            )
+            unknown = jwt.encode(
+                payload, "old-secret", algorithm="HS256", headers={"kid": "other"}
+            )
+            self.assertEqual(self.get(forged).status_code, 401)
+            self.assertEqual(self.get(unknown).status_code, 401)
+
+    def test_invalid_configuration(self):
+        for keys in (
+            [{**OLD_KEY, "sign": False}],
+            [OLD_KEY, OLD_KEY],
+            [{**OLD_KEY, "algorithm": "none"}],
+        ):
+            with override_settings(AUTHENTIC={"SIGNING_KEYS": keys}):
+                with self.assertRaises(ImproperlyConfigured):
+                    get_token_backend()
+
+    def test_jwks_never_publishes_secrets(self):
+        with override_settings(AUTHENTIC={"SIGNING_KEYS": [OLD_KEY]}):
+            response = self.client.get("/.well-known/jwks.json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"keys": []})
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+
+@unittest.skipUnless(has_crypto, "cryptography is not installed")
+class AsymmetricKeysTestCase(TestCase):
+    def setUp(self):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+        def pem(private_key):
+            return private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ).decode()
+
+        self.keys = [
+            {
+                "kid": "rsa",
+                "algorithm": "RS256",
+                "signing_key": pem(rsa.generate_private_key(65537, 2048)),
+            },
+            {
+                "kid": "ec",
+                "algorithm": "ES256",
+                "signing_key": pem(ec.generate_private_key(ec.SECP256R1())),
+            },
+            {
+                "kid": "ed",
+                "algorithm": "EdDSA",
+                "signing_key": pem(ed25519.Ed25519PrivateKey.generate()),
+            },
+        ]
+        self.client = Client()
+        self.user = User.objects.create_user(username="signed", password="x1y2z3w4")
+
+    def test_tokens_verify_with_the_published_keys(self):
+        for key in self.keys:
+            # The key under test signs, the others are only published.
+            keys = [key] + [
+                {**other, "sign": False} for other in self.keys if other is not key
+            ]
+            with override_settings(AUTHENTIC={"SIGNING_KEYS": keys}):
+                token = str(AccessToken.for_user(self.user))
+                response = self.client.get(
+                    f"/contas/{self.user.pk}/", HTTP_AUTHORIZATION=f"Bearer {token}"
+                )
+                self.assertEqual(response.status_code, 200)
+
+                response = self.client.get("/.well-known/jwks.json")
+                jwks = jwt.PyJWKSet.from_dict(response.json())
+                self.assertEqual(len(jwks.keys), 3)
+                public_key = jwks[key["kid"]]
+                payload = jwt.decode(token, public_key.key, [key["algorithm"]])
+                self.assertEqual(payload["user_id"], self.user.pk)
+
+    def test_jwks_caching(self):
+        with override_settings(AUTHENTIC={"SIGNING_KEYS": self.keys}):
+            response = self.client.get("/.well-known/jwks.json")
+            self.assertIn("max-age=3600", response["Cache-Control"])
+            etag = response["ETag"]
+            for if_none_match, status_code in (
+                (etag, 304),
+                (f'"other", W/{etag}', 304),
+                ("*", 304),
+                ('"other"', 200),
+            ):
+                response = self.client.get(
+                    "/.well-known/jwks.json", HTTP_IF_NONE_MATCH=if_none_match
+                )
+                self.assertEqual(response.status_code, status_code, if_none_match)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.test import TestCase, override_settings
+
+from authentic.serializers import UidTokenActivationSerializer
+from authentic.utils import decode_pk, encode_uid
+from authentic.utils.tokens import link_token_generator
+
+User = get_user_model()
+
+
+class LinkTokenTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="linked", password="x1y2z3w4", is_active=False
+        )
+        self.uid = encode_uid(self.user.pk)
+
+    def is_valid(self, token, uid=None):
+        serializer = UidTokenActivationSerializer(
+            data={"uid": uid or self.uid, "token": token}
+        )
+        return serializer.is_valid(), serializer.errors
+
+    def test_valid_link(self):
+        token = link_token_generator.make_token(self.user)
+        self.assertEqual(len(token.split("-")), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.is_valid(token), (True, {}))
+
+    def test_rejected_without_query(self):
+        token = link_token_generator.make_token(self.user)
+        ts_b36, digest, _ = token.split("-")
+        other_uid = encode_uid(self.user.pk + 1)
+        later = datetime.now() + timedelta(days=30)
+
+        with self.assertNumQueries(0):
+            for link_token, uid in (
+                (f"{ts_b36}-{digest}-{'0' * 20}", None),
+                (token, other_uid),
+                ("garbage", None),
+                (token, "!!"),
+            ):
+                self.assertFalse(self.is_valid(link_token, uid)[0])
+            with mock.patch.object(default_token_generator, "_now", return_value=later):
+                self.assertIn("token", self.is_valid(token)[1])
+
+    def test_links_sent_before_the_mac(self):
+        token = default_token_generator.make_token(self.user)
+        self.assertTrue(self.is_valid(token)[0])
+        with override_settings(AUTHENTIC={"LEGACY_LINK_TOKENS": False}):
+            with self.assertNumQueries(0):
+                self.assertFalse(self.is_valid(token)[0])
+
+    def test_decode_pk_follows_the_pk_field(self):
+        self.assertEqual(decode_pk(encode_uid(42), User), 42)
+        with self.assertRaises(ValueError):
+            decode_pk(encode_uid("not-a-number"), User)
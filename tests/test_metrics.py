@@ -0,0 +1,132 @@
+import multiprocessing
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authentic.utils import metrics
+from authentic.utils.metrics import Registry
+from authentic.views import MetricsView
+
+User = get_user_model()
+
+
+def increment(directory):
+    registry = Registry(directory, buckets=(0.1, 1))
+    for _ in range(100):
+        registry.inc("authentic_logins_total", outcome="success")
+    registry.observe("authentic_request_seconds", 0.5, endpoint="entrar")
+
+
+class RegistryTestCase(TestCase):
+    def test_export(self):
+        registry = Registry(buckets=(0.1, 1))
+        registry.inc("authentic_logins_total", outcome="success")
+        registry.inc("authentic_logins_total", outcome="failure")
+        registry.inc("authentic_logins_total", outcome="success")
+        registry.observe("authentic_request_seconds", 0.05, endpoint="entrar")
+        registry.observe("authentic_request_seconds", 2, endpoint="entrar")
+
+        lines = registry.export().splitlines()
+        self.assertIn("# TYPE authentic_logins_total counter", lines)
+        self.assertIn('authentic_logins_total{outcome="success"} 2', lines)
+        self.assertIn('authentic_logins_total{outcome="failure"} 1', lines)
+        self.assertIn("# TYPE authentic_request_seconds histogram", lines)
+        for bucket, count in (("0.1", 1), ("1", 1), ("+Inf", 2)):
+            self.assertIn(
+                'authentic_request_seconds_bucket{endpoint="entrar",'
+                f'le="{bucket}"}} {count}',
+                lines,
+            )
+        self.assertIn('authentic_request_seconds_sum{endpoint="entrar"} 2.05', lines)
+        self.assertIn('authentic_request_seconds_count{endpoint="entrar"} 2', lines)
+
+    def test_aggregates_worker_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            context = multiprocessing.get_context("fork")
+            workers = [
+                context.Process(target=increment, args=(directory,)) for _ in range(3)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            lines = Registry(directory, buckets=(0.1, 1)).export().splitlines()
+        self.assertIn('authentic_logins_total{outcome="success"} 300', lines)
+        self.assertIn(
+            'authentic_request_seconds_bucket{endpoint="entrar",le="1"} 3', lines
+        )
+
+    def test_dead_processes_are_archived(self):
+        with tempfile.TemporaryDirectory() as directory:
+            context = multiprocessing.get_context("fork")
+            for _ in range(3):
+                worker = context.Process(target=increment, args=(directory,))
+                worker.start()
+                worker.join()
+                metrics.mark_process_dead(worker.pid, directory)
+            metrics.mark_process_dead(worker.pid, directory)
+
+            files = [path.name for path in Path(directory).iterdir()]
+            lines = Registry(directory, buckets=(0.1, 1)).export().splitlines()
+        self.assertEqual(files, ["metrics-archive.db"])
+        self.assertIn('authentic_logins_total{outcome="success"} 300', lines)
+        self.assertIn('authentic_request_seconds_count{endpoint="entrar"} 3', lines)
+
+    def test_file_grows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            registry = Registry(directory)
+            for n in range(2000):
+                registry.inc("authentic_test_total", code=f"code-{n}")
+            totals = Registry(directory).collect()
+        self.assertEqual(len(totals), 2000)
+        self.assertEqual(totals['authentic_test_total{code="code-1999"}'], 1)
+
+
+@override_settings(AUTHENTIC={"METRICS": True})
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="metered", password="x1y2z3w4")
+
+    def test_counts_logins(self):
+        self.client.post("/entrar/", {"username": "metered", "password": "x1y2z3w4"})
+        self.client.post("/entrar/", {"username": "metered", "password": "wrong"})
+        totals = metrics.get_registry().collect()
+        self.assertEqual(totals['authentic_logins_total{outcome="success"}'], 1)
+        self.assertEqual(totals['authentic_logins_total{outcome="failure"}'], 1)
+        self.assertEqual(
+            totals['authentic_request_seconds_count{endpoint="entrar"}'], 2
+        )
+
+    def test_counts_swallowed_authentication_failures(self):
+        self.client.get("/contas/", HTTP_AUTHORIZATION="Bearer invalid")
+        totals = metrics.get_registry().collect()
+        self.assertEqual(
+            totals['authentic_authentication_failures_total{code="token_not_valid"}'],
+            1,
+        )
+
+    def test_endpoint_is_admin_only(self):
+        metrics.inc("authentic_logins_total", outcome="success")
+        factory = APIRequestFactory()
+        view = MetricsView.as_view()
+
+        request = factory.get("/metricas/")
+        force_authenticate(request, self.user)
+        self.assertEqual(view(request).status_code, 403)
+
+        self.user.is_staff = True
+        request = factory.get("/metricas/")
+        force_authenticate(request, self.user)
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'authentic_logins_total{outcome="success"} 1', response.content)
+
+    def test_disabled(self):
+        with override_settings(AUTHENTIC={"METRICS": False}):
+            metrics.inc("authentic_logins_total", outcome="success")
+        self.assertEqual(metrics.get_registry().collect(), {})
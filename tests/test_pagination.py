@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from authentic.conf import settings
+
+User = get_user_model()
+
+
+class PaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f"page{index:02}", email=f"page{index:02}@testcase.com")
+            for index in range(25)
+        )
+        cls.user = User.objects.get(username="page00")
+
+    def setUp(self):
+        self.client = Client()
+        token = AccessToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def tearDown(self):
+        settings.PAGINATION_STYLE = "limitoffset"
+
+    def test_limit_offset_pages_are_not_paginated_twice(self):
+        response = self.client.get("/contas/?limit=10&offset=10", **self.headers)
+        self.assertEqual(response.status_code, 200)
+        usernames = [user["username"] for user in response.json()["results"]]
+        self.assertEqual(usernames, [f"page{index:02}" for index in range(10, 20)])
+
+    def test_cursor_pages_walk_the_whole_table(self):
+        settings.PAGINATION_STYLE = "cursor"
+        usernames = []
+        url = "/contas/?limit=10"
+        while url:
+            response = self.client.get(url, **self.headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.json())
+            usernames += [user["username"] for user in response.json()["results"]]
+            url = response.json()["next"]
+
+        self.assertEqual(usernames, [f"page{index:02}" for index in range(25)])
+
+    @override_settings(AUTHENTIC={"PAGINATION_COUNT": "cached"})
+    def test_cached_count_is_invalidated_on_create(self):
+        response = self.client.get("/contas/", **self.headers)
+        self.assertEqual(response.json()["count"], 25)
+
+        # Only the authenticated user and the page itself, no COUNT(*).
+        with self.assertNumQueries(2):
+            response = self.client.get("/contas/", **self.headers)
+        self.assertEqual(response.json()["count"], 25)
+
+        User.objects.create_user(username="page25")
+        response = self.client.get("/contas/", **self.headers)
+        self.assertEqual(response.json()["count"], 26)
+        self.assertNotIn("count_approximate", response.json())
+
+    @override_settings(AUTHENTIC={"PAGINATION_COUNT": "cached"})
+    def test_cached_count_is_invalidated_on_filtered_updates(self):
+        response = self.client.get("/contas/?is_active=true", **self.headers)
+        self.assertEqual(response.json()["count"], 25)
+
+        user = User.objects.get(username="page01")
+        user.is_active = False
+        user.save()
+        response = self.client.get("/contas/?is_active=true", **self.headers)
+        self.assertEqual(response.json()["count"], 24)
+
+        user.last_login = user.date_joined
+        user.save(update_fields=["last_login"])
+        with self.assertNumQueries(2):
+            response = self.client.get("/contas/?is_active=true", **self.headers)
+        self.assertEqual(response.json()["count"], 24)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, RequestFactory, TestCase, override_settings
+from rest_framework import viewsets
+from rest_framework_simplejwt.tokens import AccessToken
+from authentic.async_views import AsyncUserDetailView, AsyncUserListView
+from authentic.conf import settings
+from authentic.utils.queries import (
+    QueryBudgetExceeded,
+    get_view_action,
+    query_budget,
+)
+from authentic.views import UserViewSet
+
+User = get_user_model()
+
+
+class QueryBudgetTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="budget", email="budget@testcase.com", password="testando@123"
+        )
+        token = AccessToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_user_endpoints_stay_within_budget(self):
+        url = f"/contas/{self.user.pk}/"
+        # QueryBudgetMiddleware raises in the test project when over budget.
+        self.assertEqual(self.client.get("/contas/", **self.headers).status_code, 200)
+        self.assertEqual(self.client.get(url, **self.headers).status_code, 200)
+        response = self.client.delete(url, **self.headers)
+        self.assertEqual(response.status_code, 204)
+
+    def test_account_endpoints_run_one_lookup_and_one_write(self):
+        settings.USER_CREATE_PASSWORD_RETYPE = False
+        data = {
+            "username": "newbudget",
+            "email": "newbudget@testcase.com",
+            "password": "testando@123",
+        }
+        with query_budget("register") as counter:
+            response = self.client.post("/contas/criar/", data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(counter.count, 2)
+
+        for url in ("/contas/ativacao/reenviar/", "/contas/recuperar/senha/"):
+            with query_budget(url) as counter:
+                response = self.client.post(url, {"email": data["email"]})
+            self.assertEqual(response.status_code, 204)
+            self.assertEqual(counter.count, 1)
+
+    @override_settings(
+        AUTHENTIC={"QUERY_BUDGETS": {"list": 1}, "QUERY_BUDGET_RAISE": True}
+    )
+    def test_exceeding_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/contas/", **self.headers)
+
+        with self.settings(AUTHENTIC={"QUERY_BUDGETS": {"list": 1}}):
+            with self.assertLogs("authentic.utils.queries", "WARNING"):
+                with query_budget("list"):
+                    User.objects.count()
+                    User.objects.count()
+
+    def test_only_authentic_views_have_budgets(self):
+        class ProjectViewSet(viewsets.ViewSet):
+            def list(self, request):
+                pass
+
+        request = RequestFactory().get("/")
+        for view_func, action in (
+            (UserViewSet.as_view({"get": "list"}), "list"),
+            (AsyncUserListView.as_view(), "list"),
+            (AsyncUserDetailView.as_view(), "retrieve"),
+            (ProjectViewSet.as_view({"get": "list"}), None),
+        ):
+            self.assertEqual(get_view_action(request, view_func), action)
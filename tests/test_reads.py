@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from rest_framework import serializers
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentic.serializers import UserSerializer
+from authentic.utils import reads
+from authentic.utils.reads import get_read_plan
+
+User = get_user_model()
+
+
+class FastReadsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(
+                username=f"read{index:02}",
+                email=f"read{index:02}@testcase.com",
+                first_name="Zoë",
+                last_login=now() if index % 2 else None,
+            )
+            for index in range(15)
+        )
+        cls.user = User.objects.get(username="read00")
+        cls.user.is_staff = True
+        cls.user.save()
+
+    def setUp(self):
+        self.client = Client()
+        token = AccessToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def get(self, url, fast):
+        with override_settings(AUTHENTIC={"FAST_READS": fast}):
+            response = self.client.get(url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_same_output_as_the_serializer(self):
+        for url in (
+            "/contas/?limit=10&offset=5",
+            f"/contas/{self.user.pk}/",
+            f"/contas/{User.objects.get(username='read01').pk}/",
+        ):
+            self.assertEqual(self.get(url, fast=True), self.get(url, fast=False))
+
+    def test_cursor_pagination(self):
+        with override_settings(
+            AUTHENTIC={"FAST_READS": True, "PAGINATION_STYLE": "cursor"}
+        ):
+            usernames = []
+            url = "/contas/?limit=4"
+            while url:
+                response = self.client.get(url, **self.headers).json()
+                usernames += [user["username"] for user in response["results"]]
+                url = response["next"]
+        self.assertEqual(len(usernames), 15)
+
+    def test_without_orjson(self):
+        fast = self.get("/contas/", fast=True)
+        with mock.patch.object(reads, "orjson", None):
+            self.assertEqual(self.get("/contas/", fast=True), fast)
+
+    def test_computed_fields_use_the_serializer(self):
+        class ComputedSerializer(serializers.ModelSerializer):
+            display = serializers.SerializerMethodField()
+
+            class Meta:
+                model = User
+                fields = ("username", "display")
+
+            def get_display(self, user):
+                return user.username.upper()
+
+        self.assertIsNotNone(get_read_plan(UserSerializer, ("username",)))
+        self.assertIsNone(get_read_plan(ComputedSerializer, ("username",)))
+
+
+class SparseFieldsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="sparse", email="sparse@testcase.com", is_staff=True
+        )
+
+    def setUp(self):
+        self.client = Client()
+        token = AccessToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_fields_shrink_the_payload_and_the_query(self):
+        for fast in (False, True):
+            with override_settings(AUTHENTIC={"FAST_READS": fast}):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(
+                        "/contas/?fields=username,id", **self.headers
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json()["results"],
+                    [{"id": self.user.pk, "username": "sparse"}],
+                )
+                select = queries.captured_queries[-1]["sql"]
+                self.assertNotIn("email", select)
+
+                response = self.client.get(
+                    f"/contas/{self.user.pk}/?fields=email", **self.headers
+                )
+                self.assertEqual(response.json(), {"email": "sparse@testcase.com"})
+
+    def test_only_allowed_fields(self):
+        response = self.client.get("/contas/?fields=username,password", **self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["fields"][0])
@@ -0,0 +1,101 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentic.authentication.revocation import (
+    BloomFilter,
+    CacheRevocationStore,
+    DatabaseRevocationStore,
+    RevocationList,
+)
+from authentic.checks import check_revocation_cache
+from authentic.models import RevokedToken
+
+User = get_user_model()
+
+
+class BloomFilterTestCase(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for index in range(1000):
+            bloom.add(f"revoked-{index}")
+        self.assertTrue(all(f"revoked-{index}" in bloom for index in range(1000)))
+        false_positives = sum(f"valid-{index}" in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class RevocationCacheCheckTestCase(SimpleTestCase):
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual(check_revocation_cache(), [])
+        with override_settings(AUTHENTIC={"TOKEN_REVOCATION": True}):
+            self.assertEqual(
+                [warning.id for warning in check_revocation_cache()],
+                ["authentic.W002"],
+            )
+        shared = {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}
+        with override_settings(
+            AUTHENTIC={"TOKEN_REVOCATION": True},
+            CACHES={"default": shared},
+        ):
+            self.assertEqual(check_revocation_cache(), [])
+        database_store = "authentic.authentication.revocation.DatabaseRevocationStore"
+        with override_settings(
+            AUTHENTIC={
+                "TOKEN_REVOCATION": True,
+                "REVOCATION": {"store": database_store},
+            }
+        ):
+            self.assertEqual(check_revocation_cache(), [])
+
+
+@override_settings(AUTHENTIC={"TOKEN_REVOCATION": True})
+class RevocationTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="revoked", email="revoked@testcase.com", password="testando@123"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {self.refresh.access_token}"}
+        self.url = f"/contas/{self.user.pk}/"
+
+    def logout(self):
+        self.client.cookies["refresh"] = str(self.refresh)
+        response = self.client.get("/sair/", **self.headers)
+        self.assertEqual(response.status_code, 204)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        self.assertEqual(self.client.get(self.url, **self.headers).status_code, 200)
+        self.logout()
+
+        self.assertEqual(self.client.get(self.url, **self.headers).status_code, 401)
+        response = self.client.post("/renovar/", {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(
+        AUTHENTIC={
+            "TOKEN_REVOCATION": True,
+            "REVOCATION": {
+                "store": "authentic.authentication.revocation.DatabaseRevocationStore"
+            },
+        }
+    )
+    def test_database_store_is_shared(self):
+        self.logout()
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+        # Another process starts from the store.
+        revocations = RevocationList(DatabaseRevocationStore(), 100, 0.001)
+        self.assertTrue(revocations.is_revoked(self.refresh["jti"]))
+        self.assertFalse(
+            revocations.is_revoked(RefreshToken.for_user(self.user)["jti"])
+        )
+
+    def test_entries_expire_with_the_token(self):
+        store = CacheRevocationStore(prefix="authentic:revoked:expiry")
+        store.revoke("expired", time.time() - 1)
+        store.revoke("live", time.time() + 60)
+        self.assertFalse(store.is_revoked("expired"))
+        entries, cursor = store.changes(None)
+        self.assertEqual(entries, ["live"])
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+from authentic.throttling import take_token
+
+User = get_user_model()
+
+
+class RejectAll(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+
+class ThrottlingTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        User.objects.create_user(
+            username="throttled",
+            email="throttled@testcase.com",
+            password="testando@123",
+        )
+
+    @override_settings(AUTHENTIC={"THROTTLE_RATES": {"login": "2/min"}})
+    def test_login_is_rejected_before_hashing(self):
+        credentials = {"username": "throttled", "password": "wrong"}
+        # AbstractBaseUser.check_password looks the hasher up in its own
+        # module.
+        with mock.patch(
+            "django.contrib.auth.base_user.check_password", wraps=check_password
+        ) as check:
+            for _ in range(2):
+                response = self.client.post("/entrar/", credentials)
+                self.assertEqual(response.status_code, 401)
+            self.assertEqual(check.call_count, 2)
+
+            with self.assertNumQueries(0):
+                response = self.client.post("/entrar/", credentials)
+            self.assertEqual(check.call_count, 2)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+        credentials["username"] = "someone-else"
+        self.assertEqual(self.client.post("/entrar/", credentials).status_code, 401)
+
+    @override_settings(
+        AUTHENTIC={
+            "THROTTLE_RATES": {"email": "1/hour"},
+            "THROTTLE_CACHE_BACKEND": "default",
+        }
+    )
+    def test_email_endpoints_share_the_email_bucket(self):
+        data = {"email": "throttled@testcase.com"}
+        response = self.client.post("/contas/recuperar/senha/", data)
+        self.assertEqual(response.status_code, 204)
+
+        data = {"email": "Throttled@testcase.com"}
+        with self.assertNumQueries(0):
+            response = self.client.post("/contas/ativacao/reenviar/", data)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(AUTHENTIC={})
+    def test_bucket_refills(self):
+        with mock.patch("authentic.throttling.time.time", return_value=1000):
+            self.assertIsNone(take_token("refill", 2, 60))
+            self.assertIsNone(take_token("refill", 2, 60))
+            self.assertEqual(take_token("refill", 2, 60), 30)
+        with mock.patch("authentic.throttling.time.time", return_value=1030):
+            self.assertIsNone(take_token("refill", 2, 60))
+            self.assertIsNotNone(take_token("refill", 2, 60))
+
+    @override_settings(
+        REST_FRAMEWORK={"DEFAULT_THROTTLE_CLASSES": ["tests.test_throttling.RejectAll"]}
+    )
+    def test_global_throttles_still_apply(self):
+        user = User.objects.get(username="throttled")
+        token = AccessToken.for_user(user)
+        credentials = {"username": "throttled", "password": "testando@123"}
+        self.assertEqual(self.client.post("/entrar/", credentials).status_code, 429)
+        response = self.client.get(
+            f"/contas/{user.pk}/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        self.assertEqual(response.status_code, 429)
+
+        # Configured entries replace them.
+        with override_settings(AUTHENTIC={"THROTTLES": {"login": []}}):
+            self.assertEqual(self.client.post("/entrar/", credentials).status_code, 200)
@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from authentic.utils import timing
+
+
+class ServerTimingTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.data = {
+            "username": "timed",
+            "email": "timed@testcase.com",
+            "password": "testando@123",
+            "re_password": "testando@123",
+        }
+
+    @override_settings(AUTHENTIC={"USER_CREATE_PASSWORD_RETYPE": True})
+    def test_disabled_by_default(self):
+        response = self.client.post("/contas/criar/", self.data)
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Server-Timing", response)
+        self.assertIs(timing.phase("hash"), timing.NULL_PHASE)
+
+    @override_settings(
+        AUTHENTIC={"USER_CREATE_PASSWORD_RETYPE": True, "SERVER_TIMING": True}
+    )
+    def test_register_phases(self):
+        response = self.client.post("/contas/criar/", self.data)
+        self.assertEqual(response.status_code, 201)
+        phases = [
+            metric.split(";")[0] for metric in response["Server-Timing"].split(", ")
+        ]
+        for name in ("validate_password", "create_user", "email_render", "smtp"):
+            self.assertIn(name, phases)
+        self.assertEqual(phases[-1], "total")
+
+    def test_hook(self):
+        hook = mock.Mock()
+        with override_settings(AUTHENTIC={"TIMING": {"hook": hook}}):
+            response = self.client.post("/entrar/", {"username": "x", "password": "y"})
+        self.assertEqual(response.status_code, 401)
+        request, totals = hook.call_args.args
+        self.assertEqual(request.path, "/entrar/")
+        self.assertIn("authenticate", totals)